@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Compliance run time (compliance.py) for N generated EOS configs x M rules:
+in-process versus the process pool.
+
+    python3 benchmarks/bench_compliance.py --devices 1000 --rules 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import compliance
+from bench_config_diff import generate_config
+
+BASE_RULES = compliance.load_rules()
+
+
+def generate_configs(devices, lines):
+    base = generate_config(lines)
+    extra = ["snmp-server community public rw", "ntp server 10.0.0.1", "no aaa root",
+             "management api http-commands\n   no shutdown", "spanning-tree mode rstp"]
+    rng = random.Random(3)
+    return {f"leaf{n}": base.replace("hostname r1", f"hostname leaf{n}") + "\n"
+            + "\n".join(line for line in extra if rng.random() < 0.5)
+            for n in range(devices)}
+
+
+def generate_rules(count):
+    """The shipped rules plus generated anchored, unanchored and section-scoped ones."""
+    specs = [rule.to_dict() for rule in BASE_RULES]
+    n = 0
+    while len(specs) < count:
+        kind = n % 4
+        if kind == 0:
+            specs.append({"id": f"gen-{n}", "forbid": rf"^ip route 10\.{n % 256}\.0\.0/16 "})
+        elif kind == 1:
+            specs.append({"id": f"gen-{n}", "require": rf"^logging host 10\.0\.{n % 256}\.1$"})
+        elif kind == 2:
+            specs.append({"id": f"gen-{n}", "section_match": r"^interface Ethernet\d", "forbid": rf"^mtu {1000 + n}$"})
+        else:
+            specs.append({"id": f"gen-{n}", "section": "router bgp 65000",
+                          "forbid": rf"remote-as {64000 + n}$"})
+        n += 1
+    return compliance.compile_rules(specs[:count])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=1000, help="Lines per config")
+    parser.add_argument("--workers", type=int, default=compliance.MAX_WORKERS)
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    configs = generate_configs(args.devices, args.lines)
+    rules = generate_rules(args.rules)
+    print(f"{args.devices} configs x {len(rules)} rules, {args.lines} lines each, {args.workers} workers")
+    if not args.skip_serial:
+        serial, results = timed(compliance.run_compliance, configs, rules, max_workers=1)
+        print(f"in-process:   {serial:7.2f}s")
+    pooled, results = timed(compliance.run_compliance, configs, rules, max_workers=args.workers)
+    print(f"process pool: {pooled:7.2f}s")
+    failed = sum(1 for r in results for status in r["status"].values() if status == compliance.FAIL)
+    print(f"{failed} failed checks out of {len(results) * len(rules)}")
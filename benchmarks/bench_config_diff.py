@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare the section-aware diff (config_diff.py) with the flat difflib.ndiff
+path /config_diff used before, on generated EOS configs.
+
+    python3 benchmarks/bench_config_diff.py --lines 1000 5000 10000 20000
+"""
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config_diff import diff_configs, format_diff
+
+
+def generate_config(lines, seed=1):
+    """EOS-style config of roughly the given number of lines (interfaces + BGP)."""
+    rng = random.Random(seed)
+    out = ["hostname r1", "!"]
+    i = 0
+    while len(out) < lines * 0.8:
+        out += [f"interface Ethernet{i}",
+                f"   description uplink-{i}",
+                f"   ip address 10.{i // 256 % 256}.{i % 256}.1/30",
+                f"   ipv6 address 2001:db8::{i:x}/127",
+                f"   mtu {rng.choice([1500, 9000])}",
+                "!"]
+        i += 1
+    out.append("router bgp 65000")
+    j = 0
+    while len(out) < lines:
+        out += [f"   neighbor 10.255.{j // 256 % 256}.{j % 256} remote-as {65001 + j}",
+                f"   neighbor 10.255.{j // 256 % 256}.{j % 256} description peer-{j}"]
+        j += 1
+    return "\n".join(out)
+
+
+def mutate(config, changes, seed=2):
+    """Change `changes` random indented lines."""
+    rng = random.Random(seed)
+    lines = config.splitlines()
+    candidates = [n for n, line in enumerate(lines) if line.startswith("   ")]
+    for n in rng.sample(candidates, min(changes, len(candidates))):
+        lines[n] = lines[n] + " changed"
+    return "\n".join(lines)
+
+
+def legacy_ndiff(golden, running):
+    """The pre-config_diff implementation from netapp/app.py."""
+    strip = lambda text: [l.strip() for l in text.splitlines() if l.strip() and not l.strip().startswith(("!", "#"))]
+    return [l for l in difflib.ndiff(strip(golden), strip(running)) if l.startswith(("- ", "+ "))]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 5000, 10000, 20000])
+    parser.add_argument("--changes", type=int, default=500, help="Lines changed in the running config")
+    parser.add_argument("--skip-ndiff-above", type=int, default=20000,
+                        help="Don't run ndiff on configs larger than this (it can take minutes)")
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'changes':>8} {'tree diff':>12} {'ndiff':>12} {'speedup':>9}")
+    for size in args.lines:
+        golden = generate_config(size)
+        running = mutate(golden, args.changes)
+        tree_time, changes = timed(lambda g, r: format_diff(diff_configs(g, r)), golden, running)
+        if size <= args.skip_ndiff_above:
+            ndiff_time, _ = timed(legacy_ndiff, golden, running)
+            ndiff_text, speedup = f"{ndiff_time * 1000:10.1f}ms", f"{ndiff_time / tree_time:8.1f}x"
+        else:
+            ndiff_text, speedup = f"{'skipped':>12}", f"{'-':>9}"
+        print(f"{size:>8} {args.changes:>8} {tree_time * 1000:10.1f}ms {ndiff_text} {speedup}")
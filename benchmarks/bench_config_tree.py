@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Parse time of config_tree.py on generated EOS configs, and section lookups
+through its indexes against the linear scan of a flat line list.
+
+    python3 benchmarks/bench_config_tree.py --lines 1000 5000 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config_tree
+from bench_config_diff import generate_config
+
+
+def linear_children(lines, section):
+    """What a flat list of lines needs: scan to the section, then collect its indented lines."""
+    out = []
+    inside = False
+    for line in lines:
+        if inside:
+            if not line.startswith(" "):
+                break
+            out.append(line.strip())
+        elif line == section:
+            inside = True
+    return out
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8} {'parse':>10} {'cached':>10} {'lookups':>8} {'indexed':>10} {'linear':>10}")
+    for size in args.lines:
+        config = generate_config(size)
+        lines = config.splitlines()
+        parse = best_of(lambda: config_tree.parse(config, cache=False), args.repeat)
+        config_tree.parse(config)
+        cached = best_of(lambda: config_tree.parse(config), args.repeat)
+
+        tree = config_tree.parse(config)
+        interfaces = [s.line for s in tree.find("interface")]
+        targets = [interfaces[i * len(interfaces) // args.lookups] for i in range(args.lookups)]
+        indexed = best_of(lambda: [tree.children(t) for t in targets] + [tree.find("router bgp 65000 > neighbor")],
+                          args.repeat)
+        linear = best_of(lambda: [linear_children(lines, t) for t in targets]
+                         + [[l for l in linear_children(lines, "router bgp 65000") if l.startswith("neighbor")]], 1)
+        print(f"{size:>8} {parse * 1000:8.1f}ms {cached * 1000:8.3f}ms {args.lookups:>8} "
+              f"{indexed * 1000:8.2f}ms {linear * 1000:8.1f}ms")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Cost of instrumentation.py spans: an empty block, a span while
+instrumentation is off (the default), and a span while recording, plus a
+small parse with and without recording to put the numbers in context.
+
+    python3 benchmarks/bench_instrumentation.py --iterations 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrumentation
+import parsers
+
+OUTPUT = "\n".join(f"Ethernet{i:<9} 10.0.{i}.1/30           up           up                 1500" for i in range(1, 9))
+
+
+def per_call(fn, iterations):
+    start = time.perf_counter()
+    fn(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def empty(iterations):
+    for _ in range(iterations):
+        pass
+
+
+def spans(iterations):
+    span = instrumentation.span
+    for _ in range(iterations):
+        with span("command", device="10.0.0.1", command="show ip interface brief"):
+            pass
+
+
+def parses(iterations):
+    for _ in range(iterations):
+        parsers.parse("show ip interface brief", OUTPUT, cache=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    registry = instrumentation.REGISTRY
+    baseline = per_call(empty, args.iterations)
+    rows = [("empty loop", baseline)]
+    registry.enabled = False
+    rows.append(("span, instrumentation off", per_call(spans, args.iterations)))
+    registry.enabled = True
+    rows.append(("span, recording", per_call(spans, args.iterations)))
+    registry.enabled = False
+    parse_iterations = max(1, args.iterations // 20)
+    rows.append(("parse 8 rows, off", per_call(parses, parse_iterations)))
+    registry.enabled = True
+    rows.append(("parse 8 rows, recording", per_call(parses, parse_iterations)))
+    registry.enabled = False
+
+    print(f"{'case':<28} {'ns/call':>10}")
+    for name, ns in rows:
+        print(f"{name:<28} {ns:10.0f}")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of parsers.py on generated EOS show output: the built-in
+compiled parsers, the cached path (same output parsed again) and, where
+ntc-templates has the command, a TextFSM template loaded per call (what
+netmiko's use_textfsm=True does) versus compiled once.
+
+    python3 benchmarks/bench_parsers.py --rows 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import parsers
+
+
+def ip_interface_brief(rows):
+    out = ["                                                                      Address",
+           "Interface         IP Address            Status       Protocol           MTU    Owner",
+           "----------------- --------------------- ------------ -------------- ---------- -------"]
+    for i in range(rows):
+        out.append(f"Ethernet{i + 1:<9} 10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}/31"
+                   f"{'':>8} up           up                 1500")
+    return "\n".join(out)
+
+
+def ip_route(rows):
+    out = ["VRF: default", "Codes: C - connected, S - static, O - OSPF, B E - eBGP", "",
+           "Gateway of last resort is not set", ""]
+    for i in range(rows):
+        prefix = f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}/32"
+        if i % 4 == 0:
+            out.append(f" C        {prefix} is directly connected, Ethernet{i % 48 + 1}")
+        elif i % 4 == 3:
+            out.append(f" B E      {prefix} [200/0] via 172.16.0.1, Ethernet1")
+            out.append(f"                              via 172.16.0.3, Ethernet2")
+        else:
+            out.append(f" O        {prefix} [110/{i % 100}] via 172.16.{i % 256}.1, Ethernet{i % 48 + 1}")
+    return "\n".join(out)
+
+
+def ospf_neighbor(rows):
+    out = ["Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface"]
+    for i in range(rows):
+        addr = f"{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+        out.append(f"10.{addr}        1        default  1   FULL/DR                00:00:35    172.{addr}"
+                   f"        Ethernet{i % 48 + 1}")
+    return "\n".join(out)
+
+
+COMMANDS = {
+    "show ip interface brief": ip_interface_brief,
+    "show ip route": ip_route,
+    "show ip ospf neighbor": ospf_neighbor,
+}
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def textfsm_uncompiled(command, output):
+    """Template file read and compiled on every call."""
+    path = os.path.join(parsers.NTC_TEMPLATE_DIR, f"{parsers.PLATFORM}_{command.replace(' ', '_')}.textfsm")
+    with open(path) as f:
+        return parsers.textfsm.TextFSM(f).ParseText(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-textfsm", action="store_true", help="Skip the TextFSM comparison")
+    args = parser.parse_args()
+    use_textfsm = not args.no_textfsm and parsers.textfsm is not None and parsers.NTC_TEMPLATE_DIR is not None
+
+    print(f"{'command':<26} {'rows':>7} {'MB':>6} {'built-in':>12} {'rows/s':>10} {'cached':>10}"
+          + (f" {'textfsm':>12} {'per call':>12}" if use_textfsm else ""))
+    for command, generate in COMMANDS.items():
+        for rows in args.rows:
+            output = generate(rows)
+            parsers.CACHE.clear()
+            builtin = best_of(lambda: parsers.parse(command, output, cache=None), args.repeat)
+            parsers.parse(command, output)
+            cached = best_of(lambda: parsers.parse(command, output), args.repeat)
+            line = (f"{command:<26} {rows:>7} {len(output) / 1e6:6.2f} {builtin * 1000:10.1f}ms "
+                    f"{rows / builtin:10.0f} {cached * 1000:8.2f}ms")
+            if use_textfsm:
+                compiled = best_of(lambda: parsers.parse_textfsm(command, output), args.repeat)
+                per_call = best_of(lambda: textfsm_uncompiled(command, output), args.repeat)
+                line += f" {compiled * 1000:10.1f}ms {per_call * 1000:10.1f}ms"
+            print(line)
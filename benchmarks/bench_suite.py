@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Fleet-size benchmark suite: drives ping_test, dynamic_ipam, check_cpu,
+config_diff and bulk template rendering against simulated devices and
+records wall time, throughput, peak RSS and per-device latency percentiles.
+
+Devices answer from memory after a configurable delay (SSH connect and per
+command for the netmiko scripts, per request for SNMP), so the numbers show
+how each entry point scales with fleet size rather than lab conditions.
+With --ssh, ping_test and dynamic_ipam open real netmiko SSH sessions to
+device_simulator instead. Every run happens in a fresh child process so peak RSS is per run.
+
+    python3 benchmarks/bench_suite.py                         # 8, 100, 1000 devices
+    python3 benchmarks/bench_suite.py --devices 100 --only ping_test check_cpu
+    python3 benchmarks/bench_suite.py --ssh --only ping_test dynamic_ipam
+    python3 benchmarks/bench_suite.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEVICE_COUNTS = [8, 100, 1000]
+CONNECT_LATENCY = 0.05  # Seconds to open a simulated SSH session
+COMMAND_LATENCY = 0.02  # Seconds per simulated CLI command or SNMP request
+TOLERANCE = 0.20        # --compare flags runs this much slower than the baseline
+
+
+# ------------------------------------------------------------
+# Simulated devices
+# ------------------------------------------------------------
+class SimulatedSession:
+    """Stands in for a netmiko connection: canned EOS output after a fixed delay per command."""
+
+    def __init__(self, host, hostname, interfaces, latency):
+        self.host = host
+        self.hostname = hostname
+        self.interfaces = interfaces
+        self.latency = latency
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def find_prompt(self):
+        self._wait()
+        return f"{self.hostname}#"
+
+    def enable(self):
+        pass
+
+    def send_command(self, command, **kwargs):
+        self._wait()
+        if command.startswith("ping"):
+            return "5 packets transmitted, 5 received, 0% packet loss\nSuccess rate is 100 percent (5/5)"
+        octet = sum(map(int, self.host.split(".")[2:])) % 250
+        if command == "show ip interface brief":
+            rows = [f"Ethernet{i:<10} 10.{octet}.{i}.1/30           up           up                 1500"
+                    for i in range(1, self.interfaces + 1)]
+            return ("Interface         IP Address            Status       Protocol           MTU    Owner\n"
+                    "----------------- --------------------- ------------ -------------- ---------- -------\n"
+                    + "\n".join(rows))
+        if command == "show ipv6 interface brief":
+            rows = [f"   Et{i:<13} up            1500      2001:db8:{octet:x}:{i:x}::1/64          up            config"
+                    for i in range(1, self.interfaces + 1)]
+            return "   Interface       Status        MTU       IPv6 Address                     Addr State    Addr Source\n" \
+                   + "\n".join(rows)
+        if command.startswith("show interfaces description"):
+            return "Lo0                            up             up                 router-id"
+        return ""
+
+    def disconnect(self):
+        pass
+
+
+def simulated_connect(latency, connect_latency, interfaces=8):
+    """A ConnectHandler replacement opening SimulatedSessions."""
+    def connect(**params):
+        if connect_latency:
+            time.sleep(connect_latency)
+        host = params["host"]
+        return SimulatedSession(host, f"r{host.replace('.', '-')}", interfaces, latency)
+    return connect
+
+
+def fleet(count):
+    return [{"ip": f"10.{100 + n // 65536}.{n // 256 % 256}.{n % 256}", "hostname": f"r{n}",
+             "username": "admin", "password": "admin", "site": f"site{n % 10}"} for n in range(count)]
+
+
+@contextlib.contextmanager
+def device_connections(count, options):
+    """
+    ConnectHandler stand-in for fleet(count): in-memory sessions, or with
+    --ssh real netmiko sessions to a device_simulator serving every device.
+    """
+    if not options.ssh:
+        yield simulated_connect(options.latency, options.connect_latency)
+        return
+    import netmiko
+    from device_simulator import DeviceSimulator
+    with DeviceSimulator(count, latency=options.latency, connect_latency=options.connect_latency) as simulator:
+        ports = {device["ip"]: virtual.ssh_port for device, virtual in zip(fleet(count), simulator.devices)}
+
+        def connect(**params):
+            return netmiko.ConnectHandler(**dict(params, host=simulator.address, port=ports[params["host"]]))
+        yield connect
+
+
+@contextlib.contextmanager
+def patched(module, **attrs):
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def timed_calls(fn, latencies):
+    """Wrap fn so each call's duration is appended to latencies."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+# ------------------------------------------------------------
+# Scenarios: each returns the per-device latencies and an error count
+# ------------------------------------------------------------
+def bench_ping_test(count, options, workdir):
+    import ping_test
+    latencies = []
+    with device_connections(count, options) as connect, \
+            patched(ping_test, ConnectHandler=connect,
+                    run_ping_on_device=timed_calls(ping_test.run_ping_on_device, latencies)):
+        results = [line for lines in ping_test.run_fleet(fleet(count)) for line in lines]
+    return latencies, sum(1 for line in results if "Success" not in line)
+
+
+def bench_dynamic_ipam(count, options, workdir):
+    import dynamic_ipam
+    latencies, failed = [], []
+    devices = [{"host": d["ip"], "hostname": d["hostname"], "username": d["username"], "password": d["password"]}
+               for d in fleet(count)]
+    collect = timed_calls(dynamic_ipam.collect_device_rows, latencies)
+
+    def collect_device_rows(dev, pool=None):
+        rows = collect(dev, pool)
+        if rows is None:
+            failed.append(dev["host"])
+        return rows
+
+    with device_connections(count, options) as connect, \
+            patched(dynamic_ipam, ConnectHandler=connect, read_device_passwords=lambda: devices,
+                    collect_device_rows=collect_device_rows,
+                    OUTPUT_FILE=os.path.join(workdir, "dynamic_ipam.csv"),
+                    STATE_FILE=os.path.join(workdir, "dynamic_ipam_state.json"),
+                    IPAM_DB=os.path.join(workdir, "ipam.db")):
+        dynamic_ipam.collect_ipam()
+    return latencies, len(failed)
+
+
+def bench_check_cpu(count, options, workdir):
+    import check_cpu
+    import snmp_poller
+    mib = {f"{check_cpu.CPU_OID}.{core}": (snmp_poller.INTEGER, 10 + core) for core in range(1, 5)}
+    port, stop = snmp_poller.run_simulator_in_thread(mib, latency=options.latency)
+    try:
+        results = check_cpu.poll_cpu_usage([{"ip": "127.0.0.1", "community": "public", "port": port}
+                                            for _ in range(count)])
+    finally:
+        stop()
+    return [r["latency"] for r in results], sum(1 for r in results if r["avg"] is None)
+
+
+def bench_config_diff(count, options, workdir):
+    from bench_config_diff import generate_config, mutate
+    from config_diff import diff_configs, format_diff
+    golden = generate_config(options.config_lines)
+    latencies = []
+    for n in range(count):
+        ours = golden.replace("hostname r1", f"hostname r{n}")
+        running = mutate(ours, changes=10, seed=n)
+        start = time.perf_counter()
+        format_diff(diff_configs(ours, running))
+        latencies.append(time.perf_counter() - start)
+    return latencies, 0
+
+
+def bench_render(count, options, workdir):
+    import bulk_render
+    devices = [{"hostname": d["hostname"], "template": "core_router",
+                "interfaces": [{"name": f"Ethernet{i}", "ip": f"10.{n % 250}.{i}.1/30"} for i in range(1, 9)]}
+               for n, d in enumerate(fleet(count))]
+    results = list(bulk_render.render_all(devices, cache_dir=os.path.join(workdir, "jinja_cache")))
+    return [r["seconds"] for r in results], sum(1 for r in results if r["error"])
+
+
+SCENARIOS = {
+    "ping_test": bench_ping_test,
+    "dynamic_ipam": bench_dynamic_ipam,
+    "check_cpu": bench_check_cpu,
+    "config_diff": bench_config_diff,
+    "render": bench_render,
+}
+
+
+# ------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------
+def percentile(values, pct):
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _child(name, count, options, conn):
+    try:
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            latencies, errors = SCENARIOS[name](count, options, workdir)
+            wall = time.perf_counter() - start
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+        conn.send({
+            "benchmark": name, "devices": count, "wall_s": round(wall, 4),
+            "throughput": round(count / wall, 2) if wall else None,
+            "peak_rss_mb": round(rss_kb / 1024, 1), "errors": errors,
+            "latency_ms": {f"p{p}": round(percentile(latencies, p) * 1000, 3) for p in (50, 90, 99)}
+                          | {"max": round(max(latencies, default=0) * 1000, 3)},
+        })
+    except Exception as e:
+        conn.send({"benchmark": name, "devices": count, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_one(name, count, options):
+    """Run one scenario in a fresh process; returns its result dict."""
+    ctx = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(name, count, options, child))
+    proc.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {"benchmark": name, "devices": count, "error": f"worker exited with {proc.exitcode}"}
+    proc.join()
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {"created": datetime.now().isoformat(timespec="seconds"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Print wall-time changes against a baseline run. Returns the regressed (benchmark, devices) pairs."""
+    old = {(r["benchmark"], r["devices"]): r for r in baseline["results"] if "wall_s" in r}
+    regressions = []
+    print(f"\nAgainst {baseline['environment'].get('commit')} ({baseline['environment'].get('created')}):")
+    for r in results:
+        before = old.get((r["benchmark"], r["devices"]))
+        if before is None or "wall_s" not in r:
+            continue
+        change = r["wall_s"] / before["wall_s"] - 1 if before["wall_s"] else 0.0
+        flag = ""
+        if change > tolerance:
+            flag = "  ⚠️ regression"
+            regressions.append((r["benchmark"], r["devices"]))
+        print(f"   {r['benchmark']:<14} {r['devices']:>6} {before['wall_s']:9.3f}s -> {r['wall_s']:9.3f}s "
+              f"{change:+7.1%}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=DEVICE_COUNTS)
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=COMMAND_LATENCY,
+                        help=f"Seconds per simulated command/request (default {COMMAND_LATENCY})")
+    parser.add_argument("--connect-latency", type=float, default=CONNECT_LATENCY,
+                        help=f"Seconds to open a simulated SSH session (default {CONNECT_LATENCY})")
+    parser.add_argument("--ssh", action="store_true",
+                        help="Drive ping_test and dynamic_ipam through netmiko against device_simulator SSH servers")
+    parser.add_argument("--config-lines", type=int, default=1000, help="Lines per config for config_diff")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier result file to compare wall times against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"Slowdown reported as a regression (default {TOLERANCE * 100:.0f}%%)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'benchmark':<14} {'devices':>7} {'wall':>10} {'dev/s':>10} {'RSS MB':>8} "
+          f"{'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>6}")
+    for name in args.only:
+        for count in args.devices:
+            r = run_one(name, count, args)
+            results.append(r)
+            if "error" in r:
+                print(f"{name:<14} {count:>7}  ❌ {r['error']}")
+                continue
+            lat = r["latency_ms"]
+            print(f"{name:<14} {count:>7} {r['wall_s']:9.3f}s {r['throughput']:10.1f} {r['peak_rss_mb']:8.1f} "
+                  f"{lat['p50']:9.2f} {lat['p90']:9.2f} {lat['p99']:9.2f} {r['errors']:>6}")
+
+    params = {"latency": args.latency, "connect_latency": args.connect_latency, "config_lines": args.config_lines,
+              "ssh": args.ssh}
+    document = {"environment": environment(), "params": params, "results": results}
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"\n📄 Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print(f"⚠️ Baseline was run with {baseline.get('params')}")
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(BASE_DIR, "netapp", "templates")
+CACHE_DIR = os.path.join(BASE_DIR, "netapp", ".jinja_cache")  # Compiled template bytecode, kept across runs
+
+MAX_WORKERS = os.cpu_count() or 4
+CHUNK_SIZE = 16  # Devices handed to a worker process at a time
+POOL_THRESHOLD = 64  # Smaller batches render in-process; starting workers would cost more than rendering
+
+
+# ------------------------------------------------------------
+# Templates
+# ------------------------------------------------------------
+def make_env(template_dir=TEMPLATE_DIR, cache_dir=CACHE_DIR):
+    """Jinja2 environment whose compiled templates persist in cache_dir between runs and processes."""
+    os.makedirs(cache_dir, exist_ok=True)
+    return Environment(loader=FileSystemLoader(template_dir),
+                       bytecode_cache=FileSystemBytecodeCache(cache_dir),
+                       auto_reload=True)
+
+
+def template_name(name):
+    """'core_router' or 'core_router.j2' -> 'core_router.j2'"""
+    name = str(name).strip()
+    return name if name.endswith(".j2") else name + ".j2"
+
+
+def precompile(env, names):
+    """Compile every template once so worker processes only load bytecode."""
+    for name in set(names):
+        env.get_template(name)
+
+
+# ------------------------------------------------------------
+# Device variable files
+# ------------------------------------------------------------
+_INDEX = re.compile(r"^\d+$")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _set_path(record, path, value):
+    """record['interfaces.0.ip'] style assignment into nested dicts/lists."""
+    parts = [int(p) if _INDEX.match(p) else p for p in path.split(".")]
+    target = record
+    for part, following in zip(parts, parts[1:]):
+        empty = [] if isinstance(following, int) else {}
+        if isinstance(target, list):
+            target.extend([None] * (part + 1 - len(target)))
+            if target[part] is None:
+                target[part] = empty
+        else:
+            target.setdefault(part, empty)
+        target = target[part]
+    last = parts[-1]
+    if isinstance(target, list):
+        target.extend([None] * (last + 1 - len(target)))
+    target[last] = value
+
+
+def _compact(value):
+    """Drop the gaps left by sparse list columns (e.g. only interfaces.0 and interfaces.2 set)."""
+    if isinstance(value, list):
+        return [_compact(v) for v in value if v is not None]
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in value.items()}
+    return value
+
+
+def load_device_vars(path):
+    """
+    Device variable records from YAML (a list, or {'devices': [...]}) or CSV.
+    CSV columns may use dotted paths for nested values, e.g.
+    hostname,template,interfaces.0.name,interfaces.0.ip,bgp_neighbors.0.ip
+    Empty CSV cells are left out.
+    """
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            devices = []
+            for row in csv.DictReader(f):
+                record = {}
+                for column, value in row.items():
+                    if column and value not in (None, ""):
+                        _set_path(record, column.strip(), value.strip())
+                devices.append(_compact(record))
+            return devices
+        data = yaml.safe_load(f) or []
+    return data["devices"] if isinstance(data, dict) else data
+
+
+# ------------------------------------------------------------
+# Rendering
+# ------------------------------------------------------------
+_worker_env = None
+
+
+def _init_worker(template_dir, cache_dir):
+    global _worker_env
+    _worker_env = make_env(template_dir, cache_dir)
+
+
+def safe_filename(name):
+    """
+    name reduced to a bare file name for the ZIP: last path component only,
+    characters outside [A-Za-z0-9_.-] replaced, no leading dots
+    ('../../etc/passwd' -> 'passwd', 'r1 core' -> 'r1_core').
+    """
+    name = _UNSAFE.sub("_", os.path.basename(name.replace("\\", "/"))).lstrip(".")
+    return name or "device"
+
+
+def render_device(device, env=None, default_template=None):
+    """
+    Render one device's variables. Returns a dict with hostname, template,
+    filename, config (None on error), seconds and error.
+    """
+    env = env or _worker_env
+    hostname = str(device.get("hostname") or device.get("device_name") or "device")
+    name = template_name(device.get("template") or default_template or "")
+    result = {"hostname": hostname, "template": name, "filename": f"{safe_filename(hostname)}.cfg",
+              "config": None, "seconds": 0.0, "error": None}
+    started = time.perf_counter()
+    try:
+        result["config"] = env.get_template(name).render(device)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def _render_in_worker(args):
+    return render_device(*args)
+
+
+def render_all(devices, default_template=None, max_workers=MAX_WORKERS,
+               template_dir=TEMPLATE_DIR, cache_dir=CACHE_DIR):
+    """
+    Render every device, on a process pool for batches of POOL_THRESHOLD or
+    more. Templates are precompiled into the bytecode cache first; results
+    are yielded in input order.
+    """
+    env = make_env(template_dir, cache_dir)
+    names = [template_name(d.get("template") or default_template or "") for d in devices]
+    try:
+        precompile(env, names)
+    except Exception:
+        pass  # Reported per device by render_device
+
+    if max_workers <= 1 or len(devices) < POOL_THRESHOLD:
+        for device in devices:
+            yield render_device(device, env, default_template)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(template_dir, cache_dir)) as executor:
+        yield from executor.map(_render_in_worker, ((d, None, default_template) for d in devices),
+                                chunksize=CHUNK_SIZE)
+
+
+# ------------------------------------------------------------
+# ZIP output
+# ------------------------------------------------------------
+class _ZipStream(io.RawIOBase):
+    """Write-only sink that lets zipfile build an archive we can hand out in pieces."""
+
+    def __init__(self):
+        self._chunks = []
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._written += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._written
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(results):
+    """
+    Yield a ZIP archive chunk by chunk: one <hostname>.cfg per rendered device
+    plus timing.csv (hostname, template, ms, error) at the end.
+    """
+    sink = _ZipStream()
+    timing = io.StringIO()
+    writer = csv.writer(timing)
+    writer.writerow(["hostname", "template", "render_ms", "error"])
+    seen = {}
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for result in results:
+            writer.writerow([result["hostname"], result["template"], f"{result['seconds'] * 1000:.3f}",
+                             result["error"] or ""])
+            if result["config"] is not None:
+                filename = safe_filename(result["filename"])
+                seen[filename] = seen.get(filename, 0) + 1
+                if seen[filename] > 1:
+                    filename = f"{filename[:-4]}_{seen[filename]}.cfg"
+                archive.writestr(filename, result["config"])
+                yield sink.take()
+        archive.writestr("timing.csv", timing.getvalue())
+    yield sink.take()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render configs for many devices from a CSV/YAML variables file")
+    parser.add_argument("devices", help="CSV or YAML file with one record per device")
+    parser.add_argument("-t", "--template", help="Template for records without a 'template' field (e.g. core_router)")
+    parser.add_argument("-o", "--output", default="rendered_configs.zip", help="ZIP file to write")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Render processes (default {MAX_WORKERS})")
+    args = parser.parse_args()
+
+    devices = load_device_vars(args.devices)
+    started = time.perf_counter()
+    results = []
+
+    def collect():
+        for result in render_all(devices, args.template, args.workers):
+            results.append(result)
+            yield result
+
+    with open(args.output, "wb") as f:
+        for chunk in stream_zip(collect()):
+            f.write(chunk)
+    elapsed = time.perf_counter() - started
+
+    failed = [r for r in results if r["error"]]
+    for r in failed:
+        print(f"❌ {r['hostname']} ({r['template']}): {r['error']}")
+    render_ms = sorted(r["seconds"] * 1000 for r in results)
+    if render_ms:
+        print(f"⏱️  render time per device: median {render_ms[len(render_ms) // 2]:.2f} ms, "
+              f"max {render_ms[-1]:.2f} ms")
+    print(f"📦 {len(results) - len(failed)}/{len(results)} configs written to {args.output} in {elapsed:.2f}s")
+    sys.exit(1 if failed else 0)
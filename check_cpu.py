@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
-import subprocess
+import argparse
+import asyncio
 import statistics
 import sys
 from datetime import datetime
 
+try:
+    from . import cpu_monitor, instrumentation, snmp_poller
+except ImportError:
+    import cpu_monitor
+    import instrumentation
+    import snmp_poller
+
 # Config
 DEVICES = [
     {"ip": "10.0.100.2", "community": "public"},
@@ -17,42 +25,58 @@ DEVICES = [
 ]
 THRESHOLD = 50  # CPU threshold in %
 
+# SNMP request settings
+SNMP_TIMEOUT = 1.0  # Seconds per request
+SNMP_RETRIES = 2    # Extra attempts after a timeout
+
 # OID for CPU usage per core
 CPU_OID = ".1.3.6.1.2.1.25.3.3.1.2"
 
-def get_cpu_usage(ip, community):
-    """Run snmpwalk and return average CPU usage."""
-    try:
-        result = subprocess.check_output(
-            ["snmpwalk", "-v2c", "-c", community, ip, CPU_OID],
-            stderr=subprocess.DEVNULL
-        ).decode()
-
-        if not result.strip():
-            return None
+def poll_cpu_usage(devices, timeout=SNMP_TIMEOUT, retries=SNMP_RETRIES):
+    """
+    Poll CPU_OID on all devices concurrently with GETBULK.
+    Returns one dict per device (in order) with ip, avg (None on failure),
+    cores, latency in seconds and error.
+    """
+    results = asyncio.run(snmp_poller.poll_walk(devices, CPU_OID, timeout, retries))
+    for result in results:
+        result["cores"] = result.pop("values")
+        result["avg"] = statistics.mean(result["cores"]) if result["cores"] else None
+    return results
 
-        # Extract CPU values (last column of each line)
-        values = [int(line.split()[-1]) for line in result.strip().split("\n")]
-        return statistics.mean(values)
-
-    except subprocess.CalledProcessError:
-        return None
+def get_cpu_usage(ip, community, port=snmp_poller.SNMP_PORT):
+    """Poll a single device and return average CPU usage (None on failure)."""
+    return poll_cpu_usage([{"ip": ip, "community": community, "port": port}])[0]["avg"]
 
 def main():
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    for device in DEVICES:
-        ip = device["ip"]
-        community = device["community"]
-
-        avg_cpu = get_cpu_usage(ip, community)
+    for result in poll_cpu_usage(DEVICES):
+        ip = result["ip"]
+        avg_cpu = result["avg"]
+        latency_ms = result["latency"] * 1000
 
         if avg_cpu is None:
-            print(f"[{now}] ERROR: Unable to fetch CPU usage from {ip}")
+            print(f"[{now}] ERROR: Unable to fetch CPU usage from {ip} ({result['error'] or 'no data'}, {latency_ms:.1f} ms)")
             continue
 
+        print(f"[{now}] {ip}: CPU {avg_cpu:.2f}% (polled in {latency_ms:.1f} ms)")
         if avg_cpu > THRESHOLD:
             print(f"[{now}] ALERT: CPU usage on {ip} is HIGH ({avg_cpu:.2f}% > {THRESHOLD}%)")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="SNMP CPU check for all DEVICES")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep polling and serve rolling CPU stats over HTTP")
+    parser.add_argument("--interval", type=float, default=cpu_monitor.INTERVAL,
+                        help=f"Seconds between polls in daemon mode (default {cpu_monitor.INTERVAL})")
+    parser.add_argument("--port", type=int, default=cpu_monitor.API_PORT,
+                        help=f"Stats API port in daemon mode (default {cpu_monitor.API_PORT})")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
 
+    with instrumentation.recording(args.metrics, args.metrics_port):
+        if args.daemon:
+            cpu_monitor.run_daemon(DEVICES, poll_cpu_usage, interval=args.interval,
+                                   threshold=THRESHOLD, port=args.port)
+        else:
+            main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import yaml
+
+try:
+    from . import config_tree, drift_scan, golden_store
+except ImportError:
+    import config_tree
+    import drift_scan
+    import golden_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_FILE = os.path.join(BASE_DIR, "compliance_rules.yaml")
+GOLDEN_CONFIG_FOLDER = golden_store.GOLDEN_CONFIG_FOLDER
+
+MAX_WORKERS = os.cpu_count() or 4
+FETCH_WORKERS = 64   # Running configs pulled at the same time
+POOL_THRESHOLD = 64  # Fewer configs are checked in-process; starting workers would cost more
+
+# Per-rule result values
+PASS = "pass"
+FAIL = "fail"
+NA = "n/a"
+MAX_DETAILS = 5  # Offending lines/sections kept per failed rule
+
+# '^word ' / '^word\s' / '^word$': the rule can only match lines whose first word is `word`
+_KEYWORD = re.compile(r"^\^([A-Za-z][\w-]*)(?: |\\s|\$)")
+
+
+# ------------------------------------------------------------
+# Rules
+# ------------------------------------------------------------
+class Rule:
+    """One compliance check with its regexes compiled once."""
+
+    __slots__ = ("id", "description", "severity", "kind", "pattern", "section", "section_match", "when", "keyword")
+
+    def __init__(self, spec):
+        self.id = spec.get("id")
+        if not self.id:
+            raise ValueError(f"Rule without id: {spec}")
+        kinds = [k for k in ("require", "forbid") if spec.get(k)]
+        if len(kinds) != 1:
+            raise ValueError(f"Rule {self.id}: needs exactly one of 'require' or 'forbid'")
+        self.kind = kinds[0]
+        self.description = spec.get("description", "")
+        self.severity = spec.get("severity", "medium")
+        self.section = spec.get("section")
+        try:
+            # MULTILINE: ^ and $ anchor on each line of a joined block (see _hits)
+            self.pattern = re.compile(spec[self.kind], re.MULTILINE)
+            self.when = re.compile(spec["when"], re.MULTILINE) if spec.get("when") else None
+            self.section_match = re.compile(spec["section_match"]) if spec.get("section_match") else None
+        except re.error as e:
+            raise ValueError(f"Rule {self.id}: invalid regex: {e}") from None
+        if self.when is not None and not self.scoped:
+            raise ValueError(f"Rule {self.id}: 'when' needs a 'section' or 'section_match'")
+        match = _KEYWORD.match(spec[self.kind])
+        self.keyword = match.group(1) if match and "|" not in spec[self.kind] else None
+
+    @property
+    def scoped(self):
+        return bool(self.section) or self.section_match is not None
+
+    @property
+    def scope_key(self):
+        return self.section, self.section_match.pattern if self.section_match is not None else None
+
+    def sections(self, tree):
+        """
+        Sections in scope: tree.find(section) (whole words), narrowed to those
+        whose line matches section_match. section_match alone looks at the
+        top-level sections, by first word when the regex is anchored on one.
+        """
+        if self.section:
+            nodes = tree.find(self.section)
+        else:
+            match = _KEYWORD.match(self.section_match.pattern)
+            nodes = tree.find(match.group(1)) if match and "|" not in self.section_match.pattern else tree.sections()
+        if self.section_match is None:
+            return nodes
+        search = self.section_match.search
+        return [n for n in nodes if search(n.line)]
+
+    def to_dict(self):
+        spec = {"id": self.id, "description": self.description, "severity": self.severity,
+                self.kind: self.pattern.pattern}
+        if self.section:
+            spec["section"] = self.section
+        if self.section_match is not None:
+            spec["section_match"] = self.section_match.pattern
+        if self.when is not None:
+            spec["when"] = self.when.pattern
+        return spec
+
+
+def load_rules(path=RULES_FILE):
+    """Rules from a YAML list (see compliance_rules.yaml). Raises ValueError on a bad rule."""
+    with open(path) as f:
+        specs = yaml.safe_load(f) or []
+    return compile_rules(specs)
+
+
+def compile_rules(specs):
+    rules = [spec if isinstance(spec, Rule) else Rule(spec) for spec in specs]
+    seen = set()
+    for rule in rules:
+        if rule.id in seen:
+            raise ValueError(f"Duplicate rule id {rule.id}")
+        seen.add(rule.id)
+    return rules
+
+
+# ------------------------------------------------------------
+# Evaluation
+# ------------------------------------------------------------
+def _subtree_lines(node, out):
+    for child in node.children:
+        out.append(child.line)
+        if child.children:
+            _subtree_lines(child, out)
+    return out
+
+
+class _Scope:
+    """Blocks of lines (whole config, or one per section) joined into one text for single-pass searches."""
+
+    __slots__ = ("names", "starts", "text")
+
+    def __init__(self, blocks):
+        self.names = []
+        self.starts = []
+        parts = []
+        pos = 0
+        for name, lines in blocks:
+            block = "\n".join(lines)
+            self.names.append(name)
+            self.starts.append(pos)
+            parts.append(block)
+            pos += len(block) + 1
+        self.text = "\n".join(parts)
+
+    def subset(self, indexes):
+        return _Scope((self.names[i], self._lines(i)) for i in sorted(indexes))
+
+    def _lines(self, i):
+        end = self.starts[i + 1] - 1 if i + 1 < len(self.starts) else len(self.text)
+        block = self.text[self.starts[i]:end]
+        return block.split("\n") if block else []
+
+    def hits(self, pattern, limit=None, one_per_block=False):
+        """
+        (block index, line) for lines matching pattern, found by searching the
+        joined text rather than line by line. A match that runs past the end
+        of its line is re-checked against that line alone. one_per_block skips
+        to the next block after a hit.
+        """
+        hits = []
+        text, starts = self.text, self.starts
+        search = pattern.search
+        size = len(text)
+        pos = 0
+        while pos <= size and (limit is None or len(hits) < limit):
+            m = search(text, pos)
+            if m is None:
+                break
+            start = text.rfind("\n", 0, m.start()) + 1
+            end = text.find("\n", m.start())
+            if end < 0:
+                end = size
+            line = text[start:end]
+            if m.end() <= end or search(line):
+                block = bisect_right(starts, start) - 1
+                hits.append((block, line))
+                if one_per_block:
+                    end = starts[block + 1] - 1 if block + 1 < len(starts) else size
+            pos = end + 1
+        return hits
+
+
+def check_config(hostname, config, rules):
+    """
+    Evaluate every rule against one config. Returns
+    {"hostname", "status": {rule id: pass/fail/n/a}, "failures": {rule id: [details]}, "error"}.
+    """
+    result = {"hostname": hostname, "status": {}, "failures": {}, "error": None}
+    try:
+        tree = config_tree.parse(config, cache=False)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+
+    # Every line grouped by its first word, so anchored rules only look at candidate lines
+    by_word = {}
+    for (_, word), nodes in tree.keywords.items():
+        by_word.setdefault(word, []).extend(node.line for node in nodes)
+    scopes = {}  # keyword / section / (section, when) -> _Scope, shared by the rules that use it
+
+    for rule in rules:
+        if rule.scoped:
+            scope = scopes.get(("section",) + rule.scope_key)
+            if scope is None:
+                scope = _Scope((s.line, _subtree_lines(s, [])) for s in rule.sections(tree))
+                scopes[("section",) + rule.scope_key] = scope
+            if rule.when is not None:
+                key = ("when",) + rule.scope_key + (rule.when.pattern,)
+                if key not in scopes:
+                    scopes[key] = scope.subset({b for b, _ in scope.hits(rule.when, one_per_block=True)})
+                scope = scopes[key]
+            if not scope.names:
+                result["status"][rule.id] = NA
+                continue
+            if rule.kind == "require":
+                found = {b for b, _ in scope.hits(rule.pattern, one_per_block=True)}
+                details = [name for b, name in enumerate(scope.names) if b not in found]
+            else:
+                details = [f"{scope.names[b]} > {line}" for b, line in scope.hits(rule.pattern, MAX_DETAILS)]
+        else:
+            scope = scopes.get(("keyword", rule.keyword))
+            if scope is None:
+                if rule.keyword is not None:
+                    lines = by_word.get(rule.keyword, ())
+                else:
+                    lines = [line for group in by_word.values() for line in group]
+                scope = scopes[("keyword", rule.keyword)] = _Scope([("", lines)])
+            if rule.kind == "require":
+                details = [] if scope.hits(rule.pattern, 1) else ["missing"]
+            else:
+                details = [line for _, line in scope.hits(rule.pattern, MAX_DETAILS)]
+        result["status"][rule.id] = FAIL if details else PASS
+        if details:
+            result["failures"][rule.id] = details[:MAX_DETAILS]
+    return result
+
+
+_worker_rules = None
+
+
+def _init_worker(specs):
+    global _worker_rules
+    _worker_rules = compile_rules(specs)  # Once per process, not per config
+
+
+def _check_in_worker(item):
+    return check_config(item[0], item[1], _worker_rules)
+
+
+def run_compliance(configs, rules, max_workers=MAX_WORKERS):
+    """
+    Check every (hostname, config) pair against rules, on a process pool for
+    POOL_THRESHOLD configs or more. Returns results in input order.
+    """
+    configs = list(configs.items()) if isinstance(configs, dict) else list(configs)
+    if max_workers <= 1 or len(configs) < POOL_THRESHOLD:
+        return [check_config(hostname, config, rules) for hostname, config in configs]
+
+    chunksize = max(1, len(configs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=([rule.to_dict() for rule in rules],)) as executor:
+        return list(executor.map(_check_in_worker, configs, chunksize=chunksize))
+
+
+def matrix(results, rules):
+    """{hostname: {rule id: status}} with one column per rule (n/a for errored devices)."""
+    return {r["hostname"]: {rule.id: r["status"].get(rule.id, NA) for rule in rules} for r in results}
+
+
+# ------------------------------------------------------------
+# Config sources
+# ------------------------------------------------------------
+def load_golden_configs(folder=GOLDEN_CONFIG_FOLDER):
+    """
+    Latest golden config per device: from the GoldenStore index when the
+    folder has one, plus any legacy <hostname>_golden_<ts>.cfg files not in it.
+    """
+    configs = {}
+    if os.path.exists(os.path.join(folder, golden_store.INDEX_NAME)):
+        store = golden_store.GoldenStore(folder)
+        try:
+            for hostname in store.hostnames():
+                configs[hostname] = store.get(hostname)[1]
+        finally:
+            store.close()
+
+    legacy = {}
+    for name in sorted(os.listdir(folder)):
+        match = golden_store.LEGACY_FILE.match(name)
+        if match and match.group("hostname") not in configs:
+            legacy[match.group("hostname")] = name  # Sorted by timestamp: the newest wins
+    for hostname, name in legacy.items():
+        with open(os.path.join(folder, name)) as f:
+            configs[hostname] = f.read()
+    return configs
+
+
+def load_running_configs(devices=None, fetch=drift_scan.fetch_running_config, max_workers=FETCH_WORKERS):
+    """Running configs pulled concurrently; devices that fail are reported and left out."""
+    devices = drift_scan.load_devices() if devices is None else devices
+
+    def task(device):
+        try:
+            return device["device_name"], fetch(device)
+        except Exception as e:
+            print(f"❌ Failed to fetch running config from {device['device_name']}: {e}")
+            return device["device_name"], None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(devices) or 1))) as executor:
+        return {hostname: config for hostname, config in executor.map(task, devices) if config is not None}
+
+
+# ------------------------------------------------------------
+# Output
+# ------------------------------------------------------------
+def print_report(results, rules):
+    by_id = {rule.id: rule for rule in rules}
+    for r in results:
+        if r["error"]:
+            print(f"❌ {r['hostname']}: {r['error']}")
+            continue
+        failed = list(r["failures"])
+        icon = "✅" if not failed else "⚠️"
+        print(f"{icon} {r['hostname']}: {len(rules) - len(failed)}/{len(rules)} rules passed")
+        for rule_id in failed:
+            rule = by_id[rule_id]
+            print(f"   [{rule.severity}] {rule_id}: {rule.description}")
+            for detail in r["failures"][rule_id]:
+                print(f"      {detail}")
+
+    print("\nFailures per rule:")
+    for rule in rules:
+        count = sum(1 for r in results if r["status"].get(rule.id) == FAIL)
+        if count:
+            print(f"   {rule.id}: {count}/{len(results)} devices")
+
+
+def write_matrix_csv(path, results, rules):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Hostname"] + [rule.id for rule in rules])
+        for hostname, row in matrix(results, rules).items():
+            writer.writerow([hostname] + [row[rule.id] for rule in rules])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check golden or running configs against compliance rules")
+    parser.add_argument("--rules", default=RULES_FILE)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--golden", metavar="FOLDER", nargs="?", const=GOLDEN_CONFIG_FOLDER,
+                        help="Check the latest golden configs (default source)")
+    source.add_argument("--running", action="store_true", help="Pull and check running configs")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Worker processes (default {MAX_WORKERS})")
+    parser.add_argument("--csv", help="Write the device x rule matrix to this CSV file")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    configs = load_running_configs() if args.running else load_golden_configs(args.golden or GOLDEN_CONFIG_FOLDER)
+    if not configs:
+        print("No configs to check.")
+        sys.exit(1)
+
+    started = time.monotonic()
+    results = run_compliance(configs, rules, max_workers=args.workers)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results, rules)
+        print(f"\n📋 {len(results)} devices x {len(rules)} rules checked in {time.monotonic() - started:.2f}s")
+    if args.csv:
+        write_matrix_csv(args.csv, results, rules)
+        print(f"📄 Matrix saved to {args.csv}")
+    sys.exit(1 if any(r["failures"] or r["error"] for r in results) else 0)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+
+try:
+    from .config_tree import parse_sections
+except ImportError:
+    from config_tree import parse_sections
+
+
+def _keyed(children):
+    """{(line, occurrence): child} so repeated identical lines at one level stay distinct."""
+    seen = {}
+    keyed = {}
+    for child in children:
+        n = seen.get(child.line, 0)
+        seen[child.line] = n + 1
+        keyed[(child.line, n)] = child
+    return keyed
+
+
+def diff_sections(golden, running, path=()):
+    """
+    Yield (op, path, line) for every difference between two parsed trees.
+    op is '-' (only in golden) or '+' (only in running); path is the tuple
+    of parent lines. Blocks with equal hashes are skipped without descending.
+    """
+    if golden.digest == running.digest:
+        return
+    old = _keyed(golden.children)
+    new = _keyed(running.children)
+
+    for key, child in old.items():
+        other = new.get(key)
+        if other is None:
+            yield from _whole("-", child, path)
+        elif other.digest != child.digest:
+            yield from diff_sections(child, other, path + (child.line,))
+    for key, child in new.items():
+        if key not in old:
+            yield from _whole("+", child, path)
+
+
+def _whole(op, node, path):
+    yield op, path, node.line
+    for child in node.children:
+        yield from _whole(op, child, path + (node.line,))
+
+
+def diff_configs(golden, running):
+    """
+    Structured differences between two config texts (see diff_sections).
+    Both sides come from config_tree's cache, so a golden config compared
+    against many devices is parsed once.
+    """
+    return list(diff_sections(parse_sections(golden), parse_sections(running)))
+
+
+def format_diff(changes, indent=3):
+    """
+    Render changes as text, printing each parent section once as context:
+          interface Ethernet1
+        -    ip address 10.0.0.1/30
+        +    ip address 10.0.0.2/30
+    """
+    out = []
+    shown = ()
+    for op, path, line in changes:
+        common = 0
+        while common < min(len(shown), len(path)) and shown[common] == path[common]:
+            common += 1
+        for depth in range(common, len(path)):
+            out.append("  " + " " * (indent * depth) + path[depth])
+        shown = path + (line,)
+        out.append(f"{op} " + " " * (indent * len(path)) + line)
+    return "\n".join(out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Section-aware diff of two EOS configs")
+    parser.add_argument("golden")
+    parser.add_argument("running")
+    args = parser.parse_args()
+
+    with open(args.golden) as f:
+        golden = f.read()
+    with open(args.running) as f:
+        running = f.read()
+    changes = diff_configs(golden, running)
+    print(format_diff(changes) if changes else "✅ No differences!")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Lines that carry no configuration (EOS section separators and comments)
+COMMENT_PREFIXES = ("!", "#")
+
+PATH_SEPARATOR = " > "  # "router bgp 65000 > address-family ipv4"
+CACHE_SIZE = 64         # Parsed configs kept, keyed by a hash of the text
+
+
+class Section:
+    """One config line and the indented lines under it."""
+
+    __slots__ = ("line", "children", "digest")
+
+    def __init__(self, line):
+        self.line = line
+        self.children = []
+        self.digest = None
+
+    def __repr__(self):
+        return f"Section({self.line!r}, {len(self.children)} children)"
+
+    def lines(self):
+        return [child.line for child in self.children]
+
+
+def _hash(node):
+    """Merkle digest: a block's hash covers its line and all of its children."""
+    h = hashlib.blake2b(node.line.encode(), digest_size=16)
+    for child in node.children:
+        h.update(_hash(child))
+    node.digest = h.digest()
+    return node.digest
+
+
+def split_path(path):
+    """'a > b' or ('a', 'b') -> ('a', 'b')."""
+    if isinstance(path, str):
+        return tuple(part.strip() for part in path.split(PATH_SEPARATOR))
+    return tuple(path)
+
+
+class ConfigTree:
+    """
+    A parsed config with two indexes built in the same pass:
+    - paths: full path of lines -> Section ("interface Ethernet2")
+    - keywords: (parent path, first word) -> Sections, so every
+      "router bgp 65000 > neighbor" line is one dict lookup away.
+    Trees are shared through parse()'s cache: treat them as read-only.
+    """
+
+    __slots__ = ("root", "paths", "keywords", "line_count")
+
+    def __init__(self, config):
+        """Parse config text (or a list of lines) by indentation and hash every block bottom-up."""
+        lines = config.splitlines() if isinstance(config, str) else config
+        self.root = root = Section("")
+        self.paths = paths = {}
+        self.keywords = keywords = {}
+        count = 0
+        stack = [(-1, root, ())]
+        for raw in lines:
+            text = raw.rstrip()
+            stripped = text.lstrip()
+            if not stripped or stripped.startswith(COMMENT_PREFIXES):
+                continue
+            indent = len(text) - len(stripped)
+            while stack[-1][0] >= indent:
+                stack.pop()
+            _, parent, parent_path = stack[-1]
+            node = Section(stripped)
+            parent.children.append(node)
+            path = parent_path + (stripped,)
+            stack.append((indent, node, path))
+            count += 1
+
+            if path not in paths:  # First of repeated identical lines wins
+                paths[path] = node
+            key = (parent_path, stripped.split(" ", 1)[0])
+            nodes = keywords.get(key)
+            if nodes is None:
+                keywords[key] = [node]
+            else:
+                nodes.append(node)
+        self.line_count = count
+        _hash(root)
+
+    @property
+    def digest(self):
+        return self.root.digest
+
+    def get(self, path):
+        """Section at an exact path ('router bgp 65000 > address-family ipv4'), or None."""
+        return self.paths.get(split_path(path))
+
+    def __contains__(self, path):
+        return split_path(path) in self.paths
+
+    def children(self, path):
+        """Lines directly under path ([] when the path does not exist)."""
+        node = self.get(path)
+        return node.lines() if node is not None else []
+
+    def find(self, path):
+        """
+        Sections under the parent path whose line starts with the last
+        element (whole words): find('router bgp 65000 > neighbor'),
+        find('interface Ethernet1/1'), find('interface').
+        """
+        parts = split_path(path)
+        parent, prefix = parts[:-1], parts[-1]
+        nodes = self.keywords.get((parent, prefix.split(" ", 1)[0]), [])
+        if " " in prefix:
+            words = prefix + " "
+            return [n for n in nodes if n.line == prefix or n.line.startswith(words)]
+        return list(nodes)
+
+    def sections(self):
+        """Top-level Sections in config order."""
+        return list(self.root.children)
+
+
+# ------------------------------------------------------------
+# Memoised parsing
+# ------------------------------------------------------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def config_key(config):
+    text = config if isinstance(config, str) else "\n".join(config)
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def parse(config, cache=True):
+    """ConfigTree for config text (or lines); identical text is parsed once per process."""
+    if not cache:
+        return ConfigTree(config)
+    key = config_key(config)
+    with _cache_lock:
+        tree = _cache.get(key)
+        if tree is not None:
+            _cache.move_to_end(key)
+            return tree
+    tree = ConfigTree(config)
+    with _cache_lock:
+        _cache[key] = tree
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return tree
+
+
+def parse_sections(config):
+    """Root Section of the (memoised) tree for config."""
+    return parse(config).root
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Look up sections of an EOS config")
+    parser.add_argument("config", help="Config file")
+    parser.add_argument("path", nargs="?", help="'interface Ethernet2' or 'router bgp 65000 > neighbor'")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        tree = parse(f.read())
+    if not args.path:
+        for section in tree.sections():
+            print(section.line)
+    elif args.path in tree:
+        for line in tree.children(args.path):
+            print(line)
+    else:
+        for section in tree.find(args.path):
+            print(section.line)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+import json
+import math
+import threading
+import time
+from array import array
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import numpy as np
+except ImportError:  # Pure-Python statistics are used instead
+    np = None
+
+# ------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------
+INTERVAL = 10                                    # Seconds between polls
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}      # Rolling windows reported by the API
+API_HOST = "127.0.0.1"
+API_PORT = 9105
+
+
+# ------------------------------------------------------------
+# Ring buffer
+# ------------------------------------------------------------
+class RingBuffer:
+    """Fixed-size (timestamp, value) series backed by two array('d') buffers."""
+
+    __slots__ = ("capacity", "times", "values", "next", "count")
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.next = 0
+        self.count = 0
+
+    def append(self, timestamp, value):
+        self.times[self.next] = timestamp
+        self.values[self.next] = value
+        self.next = (self.next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def stats(self, since):
+        """mean/p95/max/samples of the values recorded at or after since."""
+        if np is not None:
+            times = np.frombuffer(self.times, dtype=np.float64)[:self.count]
+            values = np.frombuffer(self.values, dtype=np.float64)[:self.count][times >= since]
+            if not values.size:
+                return None
+            return {"mean": round(float(values.mean()), 2),
+                    "p95": round(float(np.percentile(values, 95)), 2),
+                    "max": round(float(values.max()), 2),
+                    "samples": int(values.size)}
+
+        values = sorted(v for t, v in zip(self.times[:self.count], self.values[:self.count]) if t >= since)
+        if not values:
+            return None
+        return {"mean": round(math.fsum(values) / len(values), 2),
+                "p95": round(_percentile(values, 95), 2),
+                "max": round(values[-1], 2),
+                "samples": len(values)}
+
+
+def _percentile(ordered, q):
+    """Linear-interpolated percentile of an already sorted list (same as numpy's default)."""
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def capacity_for(windows, interval):
+    """Samples needed to cover the largest window at the given poll interval."""
+    return max(1, math.ceil(max(windows.values()) / interval) + 1)
+
+
+# ------------------------------------------------------------
+# Sample store
+# ------------------------------------------------------------
+class CPUStore:
+    """
+    Per-device and per-core ring buffers.
+    Memory is fixed by capacity and the number of devices/cores, not uptime.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._series = {}  # ip -> {"avg": RingBuffer, "cores": {core index: RingBuffer}}
+        self._last = {}    # ip -> timestamp of the last sample
+        self._lock = threading.Lock()
+
+    def record(self, ip, timestamp, avg, cores):
+        with self._lock:
+            series = self._series.setdefault(ip, {"avg": RingBuffer(self.capacity), "cores": {}})
+            series["avg"].append(timestamp, avg)
+            for index, value in enumerate(cores, start=1):
+                if index not in series["cores"]:
+                    series["cores"][index] = RingBuffer(self.capacity)
+                series["cores"][index].append(timestamp, value)
+            self._last[ip] = timestamp
+
+    def stats(self, windows, ip=None, now=None):
+        """{ip: {"last_sample", "avg": {window: stats}, "cores": {core: {window: stats}}}}"""
+        now = time.time() if now is None else now
+        with self._lock:
+            ips = [ip] if ip is not None else list(self._series)
+            result = {}
+            for dev in ips:
+                series = self._series.get(dev)
+                if series is None:
+                    continue
+                result[dev] = {
+                    "last_sample": datetime.fromtimestamp(self._last[dev]).isoformat(timespec="seconds"),
+                    "avg": {name: series["avg"].stats(now - span) for name, span in windows.items()},
+                    "cores": {
+                        str(core): {name: buf.stats(now - span) for name, span in windows.items()}
+                        for core, buf in series["cores"].items()
+                    },
+                }
+            return result
+
+
+# ------------------------------------------------------------
+# Query API
+# ------------------------------------------------------------
+def start_api(store, windows=WINDOWS, host=API_HOST, port=API_PORT):
+    """
+    Serve the current window stats as JSON from a background thread.
+      GET /stats                  every device
+      GET /stats/<ip>             one device
+      GET /stats?window=5m        only the given window(s)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if not parts or parts[0] != "stats" or len(parts) > 2:
+                self._reply(404, {"error": "not found"})
+                return
+
+            wanted = parse_qs(url.query).get("window")
+            selected = {k: v for k, v in windows.items() if not wanted or k in wanted}
+            if not selected:
+                self._reply(400, {"error": f"unknown window, choose from {sorted(windows)}"})
+                return
+            self._reply(200, store.stats(selected, ip=parts[1] if len(parts) == 2 else None))
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt, *args):
+            pass  # Keep the daemon's console output to poll results
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="cpu-monitor-api", daemon=True).start()
+    return server
+
+
+# ------------------------------------------------------------
+# Daemon loop
+# ------------------------------------------------------------
+def run_daemon(devices, poll, interval=INTERVAL, windows=WINDOWS, threshold=None,
+               host=API_HOST, port=API_PORT, iterations=None):
+    """
+    Poll devices every interval seconds with poll(devices) (see
+    check_cpu.poll_cpu_usage), record samples and serve stats until
+    interrupted or until iterations polls have run.
+    """
+    store = CPUStore(capacity_for(windows, interval))
+    server = start_api(store, windows, host, port)
+    print(f"📈 CPU monitor polling {len(devices)} devices every {interval}s, "
+          f"stats on http://{host}:{server.server_address[1]}/stats")
+
+    next_poll = time.monotonic()
+    count = 0
+    try:
+        while True:
+            now = time.time()
+            stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            for result in poll(devices):
+                if result["avg"] is None:
+                    print(f"[{stamp}] ERROR: Unable to fetch CPU usage from {result['ip']}")
+                    continue
+                store.record(result["ip"], now, result["avg"], result["cores"])
+                if threshold is not None and result["avg"] > threshold:
+                    print(f"[{stamp}] ALERT: CPU usage on {result['ip']} is HIGH "
+                          f"({result['avg']:.2f}% > {threshold}%)")
+            count += 1
+            if iterations is not None and count >= iterations:
+                break
+
+            # Schedule from the previous tick so slow polls don't make the interval drift;
+            # a poll that overran the interval restarts the schedule instead of polling back-to-back
+            next_poll += interval
+            if next_poll < time.monotonic():
+                next_poll = time.monotonic()
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+    except KeyboardInterrupt:
+        print("\n🛑 CPU monitor stopped")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return store
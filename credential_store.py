@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import csv
+import os
+import threading
+
+# Written by password_rotate.py: Device, Hostname, Username, New_Password (optional Site)
+PASSWORD_FILE = "/home/student/lab1/rotated_passwords.csv"
+FIELDNAMES = ["Device", "Hostname", "Username", "New_Password"]
+
+
+def parse_row(row):
+    """CSV DictReader row -> credential record, or None for rows without a device."""
+    ip = (row.get("Device") or "").strip()
+    if not ip:
+        return None
+    return {
+        "ip": ip,
+        "hostname": (row.get("Hostname") or "").strip(),
+        "username": (row.get("Username") or "").strip(),
+        "password": (row.get("New_Password") or "").strip(),
+        "site": (row.get("Site") or "default").strip(),
+    }
+
+
+class CredentialStore:
+    """
+    Device credentials from the rotated password CSV, indexed in memory by
+    IP and by hostname (case-insensitive). The file is re-read only when its
+    mtime/size/inode change, so password_rotate.py rewriting it is picked up
+    on the next lookup without restarting anything.
+    """
+
+    def __init__(self, path=PASSWORD_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._records = []
+        self._by_ip = {}
+        self._by_hostname = {}
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _refresh(self):
+        """Reload if the file changed. Raises FileNotFoundError when it cannot be read."""
+        signature = self._stat()
+        if signature is not None and signature == self._signature:
+            return
+        with open(self.path, mode="r") as csvfile:
+            records = [r for r in (parse_row(row) for row in csv.DictReader(csvfile)) if r is not None]
+        self._records = records
+        self._by_ip = {r["ip"].lower(): r for r in records}
+        self._by_hostname = {r["hostname"].lower(): r for r in records if r["hostname"] and r["hostname"] != "N/A"}
+        # Without a stat signature we cannot tell when it changes: read it again next time
+        self._signature = signature
+
+    def devices(self):
+        """Every credential record in file order (copies)."""
+        with self._lock:
+            self._refresh()
+            return [dict(r) for r in self._records]
+
+    def get(self, target):
+        """Record for an IP or hostname (case-insensitive), or None."""
+        key = (target or "").strip().lower()
+        with self._lock:
+            self._refresh()
+            record = self._by_ip.get(key) or self._by_hostname.get(key)
+            return dict(record) if record else None
+
+    def by_ip(self, ip):
+        with self._lock:
+            self._refresh()
+            record = self._by_ip.get((ip or "").strip().lower())
+            return dict(record) if record else None
+
+    def by_hostname(self, hostname):
+        with self._lock:
+            self._refresh()
+            record = self._by_hostname.get((hostname or "").strip().lower())
+            return dict(record) if record else None
+
+    def save(self, records):
+        """
+        Replace the file with records (dicts with ip, hostname, username, password
+        and optional site) via a temp file + os.replace, so readers never see a
+        half-written CSV.
+        """
+        with_site = any(r.get("site", "default") != "default" for r in records)
+        fieldnames = FIELDNAMES + (["Site"] if with_site else [])
+        tmp = self.path + ".tmp"
+        with self._lock:
+            with open(tmp, mode="w", newline="") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                for r in records:
+                    row = {"Device": r["ip"], "Hostname": r.get("hostname") or "N/A",
+                           "Username": r["username"], "New_Password": r["password"]}
+                    if with_site:
+                        row["Site"] = r.get("site", "default")
+                    writer.writerow(row)
+                csvfile.flush()
+                os.fsync(csvfile.fileno())
+            os.replace(tmp, self.path)
+            self._signature = None  # Force a reload on the next lookup
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=PASSWORD_FILE):
+    """Process-wide CredentialStore for path."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CredentialStore(path)
+        return store
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 import argparse
-import csv
+import json
 import sys
 import time
 from netmiko import ConnectHandler
 
+try:
+    from . import credential_store, eapi, instrumentation, parsers, ssh_pool
+except ImportError:
+    import credential_store
+    import eapi
+    import instrumentation
+    import parsers
+    import ssh_pool
+
 # ------------------------------------------------------------
 # Configuration
 # ------------------------------------------------------------
@@ -13,6 +22,7 @@ FALLBACK_USERNAME = "admin"
 DEVICE_TYPE = "arista_eos"  # Change to match your platform (e.g., juniper, linux, etc.)
 
 # Test parameters
+CPU_THRESHOLD = 70  # Percent
 PING_IPV4 = "198.100.100.2"
 PING_IPV6 = "2003:db8::1"
 
@@ -21,7 +31,7 @@ PASSWORD_FILE = "/home/student/lab1/rotated_passwords.csv"
 
 
 # ------------------------------------------------------------
-# CSV helper
+# Credential lookup
 # ------------------------------------------------------------
 def find_credentials(target):
     """
@@ -29,17 +39,10 @@ def find_credentials(target):
     Matching is case-insensitive against both Device and Hostname columns.
     Returns a tuple (username, password) or (None, None) if not found.
     """
-    target_norm = (target or "").strip().lower()
     try:
-        with open(PASSWORD_FILE, mode="r") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                device_val = row.get("Device", "").strip().lower()
-                hostname_val = row.get("Hostname", "").strip().lower()
-                if target_norm == device_val or (hostname_val and target_norm == hostname_val):
-                    username = row.get("Username", "").strip() or FALLBACK_USERNAME
-                    password = row.get("New_Password", "").strip()
-                    return username, password
+        record = credential_store.get_store(PASSWORD_FILE).get(target)
+        if record:
+            return record["username"] or FALLBACK_USERNAME, record["password"]
     except FileNotFoundError:
         print(f"❌ Password file not found: {PASSWORD_FILE}")
     except Exception as e:
@@ -51,44 +54,57 @@ def find_credentials(target):
 # ------------------------------------------------------------
 # Functions
 # ------------------------------------------------------------
-def check_ping(connection):
-    """Ping test for IPv4 and IPv6"""
-    print("\n[+] Testing connectivity...")
+def check_ping(connection, log=print):
+    """Ping test for IPv4 and IPv6. Returns {"ok", "ipv4", "ipv6"}."""
+    log("\n[+] Testing connectivity...")
     ipv4_result = connection.send_command(f"ping {PING_IPV4}")
     ipv6_result = connection.send_command(f"ping ipv6 {PING_IPV6}")
 
-    print(f"IPv4 Ping Result:\n{ipv4_result}\n")
-    print(f"IPv6 Ping Result:\n{ipv6_result}\n")
+    log(f"IPv4 Ping Result:\n{ipv4_result}\n")
+    log(f"IPv6 Ping Result:\n{ipv6_result}\n")
 
-    if "Success rate is 0 percent" in ipv4_result or "Success rate is 0 percent" in ipv6_result:
-        print("❌ Ping test failed")
+    ok = not ("Success rate is 0 percent" in ipv4_result or "Success rate is 0 percent" in ipv6_result)
+    if not ok:
+        log("❌ Ping test failed")
     else:
-        print("✅ Ping test successful")
+        log("✅ Ping test successful")
+    return {"ok": ok, "ipv4": ipv4_result, "ipv6": ipv6_result}
 
 
-def show_routes_and_neighbors(connection):
-    """Display routing table and neighbor relationships"""
-    print("\n[+] Retrieving routing table and neighbor information...")
+def show_routes_and_neighbors(connection, log=print):
+    """Display routing table and neighbor relationships. Returns {"routes", "neighbors"}."""
+    log("\n[+] Retrieving routing table and neighbor information...")
     routes = connection.send_command("show ip route")
-    # Try structured output for OSPF neighbors, fallback to CDP/LLDP if empty
+    # Try structured output for OSPF neighbors (parsers.py), fallback to CDP/LLDP if empty
     try:
-        neighbors = connection.send_command("show ip ospf neighbor", use_textfsm=True)
+        neighbors = parsers.as_dicts(parsers.parse("show ip ospf neighbor",
+                                                   connection.send_command("show ip ospf neighbor")))
     except Exception:
         neighbors = None
 
     if not neighbors:
-        # Try CDP, then LLDP
-        neighbors = connection.send_command("show cdp neighbors") or connection.send_command("show lldp neighbors")
+        # Try CDP, then LLDP (LLDP as records when the table parses, raw text otherwise)
+        neighbors = connection.send_command("show cdp neighbors")
+        if not neighbors:
+            lldp = connection.send_command("show lldp neighbors")
+            neighbors = parsers.as_dicts(parsers.parse("show lldp neighbors", lldp)) or lldp
 
-    print("\n=== Routing Table ===")
-    print(routes)
-    print("\n=== Neighbors ===")
-    print(neighbors if neighbors else "No neighbor data found.")
+    log("\n=== Routing Table ===")
+    log(routes)
+    if isinstance(routes, str):
+        log(f"Routes: {len(parsers.parse('show ip route', routes))}")
+    log("\n=== Neighbors ===")
+    log(neighbors if neighbors else "No neighbor data found.")
+    return {"routes": routes, "neighbors": neighbors or None}
 
 
-def check_cpu_utilization(connection):
-    """Check CPU utilization on Arista EOS and ensure it's below 70%."""
-    print("\n[+] Checking CPU utilization...")
+def check_cpu_utilization(connection, log=print):
+    """
+    Check CPU utilization on Arista EOS and ensure it's below 70%.
+    Returns {"ok", "cpu", "error"}; ok is None when the value could not be read.
+    """
+    log("\n[+] Checking CPU utilization...")
+    result = {"ok": None, "cpu": None, "error": None}
 
     try:
         # Enter privileged EXEC mode
@@ -99,64 +115,185 @@ def check_cpu_utilization(connection):
             'bash top -b -n1 | grep "Cpu(s)" | awk \'{print $2 + $4 + $6}\''
         )
 
-        print(f"Raw CPU Output: {cpu_output.strip()}")
+        log(f"Raw CPU Output: {cpu_output.strip()}")
 
         # Clean and convert output to float
         cpu_value = float(cpu_output.strip())
 
         # Evaluate CPU threshold
-        if cpu_value < 70:
-            print(f"✅ CPU utilization OK ({cpu_value:.2f}%)")
+        result.update(cpu=cpu_value, ok=cpu_value < CPU_THRESHOLD)
+        if cpu_value < CPU_THRESHOLD:
+            log(f"✅ CPU utilization OK ({cpu_value:.2f}%)")
         else:
-            print(f"⚠️ CPU utilization high ({cpu_value:.2f}%)")
+            log(f"⚠️ CPU utilization high ({cpu_value:.2f}%)")
 
     except ValueError:
-        print(f"⚠️ Unable to parse CPU utilization value: '{cpu_output.strip()}'")
+        result["error"] = f"Unable to parse CPU utilization value: '{cpu_output.strip()}'"
+        log(f"⚠️ {result['error']}")
     except Exception as e:
-        print(f"⚠️ Error while checking CPU utilization: {e}")
+        result["error"] = f"Error while checking CPU utilization: {e}"
+        log(f"⚠️ {result['error']}")
+    return result
 
 
 # ------------------------------------------------------------
 # Main logic
 # ------------------------------------------------------------
-def main():
-    parser = argparse.ArgumentParser(description="Device Health Check Script (uses rotated_passwords.csv for auth)")
-    parser.add_argument(
-        "hostname",
-        help="Hostname or IP address of the device to test (will be matched against Device or Hostname fields in CSV)"
-    )
-    args = parser.parse_args()
+def _new_result(hostname):
+    return {"hostname": hostname, "completed": False, "healthy": False, "checked_at": time.time(),
+            "ping": None, "routing": None, "cpu": None, "error": None}
+
+
+def collect_health(hostname, pool=None, log=print, transport="ssh"):
+    """
+    Run every health check against one device and return the structured result:
+    {"hostname", "completed", "healthy", "checked_at", "ping", "routing", "cpu", "error"}.
+    Pass a ssh_pool.SSHSessionPool to reuse an already authenticated session
+    and a log callable to receive output lines instead of printing them.
+    transport="eapi" runs the checks over eAPI instead (see collect_health_eapi).
+    """
+    if transport == "eapi":
+        return collect_health_eapi(hostname, log=log)
+    result = _new_result(hostname)
 
     # Look up username/password from CSV
-    username, password = find_credentials(args.hostname)
+    username, password = find_credentials(hostname)
     if username is None or password is None:
-        print(f"❌ No credentials found in {PASSWORD_FILE} for '{args.hostname}'.")
-        print("Please ensure rotated_passwords.csv contains a matching 'Device' or 'Hostname' entry with 'Username' and 'New_Password'.")
-        sys.exit(1)
+        log(f"❌ No credentials found in {PASSWORD_FILE} for '{hostname}'.")
+        log("Please ensure rotated_passwords.csv contains a matching 'Device' or 'Hostname' entry with 'Username' and 'New_Password'.")
+        result["error"] = "No credentials found"
+        return result
 
     device = {
         "device_type": DEVICE_TYPE,
-        "host": args.hostname,
+        "host": hostname,
         "username": username,
         "password": password,
         "fast_cli": False,
     }
 
     try:
-        print(f"Connecting to {args.hostname} (user: {username})...")
-        connection = ConnectHandler(**device)
-        print(f"✅ Connected to {args.hostname}\n")
+        log(f"Connecting to {hostname} (user: {username})...")
+        with instrumentation.span("health_check", device=hostname), \
+                ssh_pool.connection(device, pool, connect=ConnectHandler) as connection:
+            log(f"✅ Connected to {hostname}\n")
 
-        check_ping(connection)
-        show_routes_and_neighbors(connection)
-        check_cpu_utilization(connection)
+            result["ping"] = check_ping(connection, log)
+            result["routing"] = show_routes_and_neighbors(connection, log)
+            result["cpu"] = check_cpu_utilization(connection, log)
 
-        connection.disconnect()
-        print(f"\n✅ All tests completed for {args.hostname}")
+        log(f"\n✅ All tests completed for {hostname}")
+        result["completed"] = True
+        result["healthy"] = bool(result["ping"]["ok"] and result["cpu"]["ok"] is not False)
     except Exception as e:
-        print(f"❌ Connection or test failed for {args.hostname}: {e}")
-        sys.exit(1)
+        log(f"❌ Connection or test failed for {hostname}: {e}")
+        result["error"] = str(e)
+    return result
+
+
+def _ospf_neighbors(ospf):
+    """Flatten 'show ip ospf neighbor' JSON into its neighbor entries."""
+    return [entry
+            for vrf in ospf.get("vrfs", {}).values()
+            for inst in vrf.get("instList", {}).values()
+            for entry in inst.get("ospfNeighborEntries", [])]
+
+
+def collect_health_eapi(hostname, log=print, client=None):
+    """
+    Same checks and result as collect_health, over Arista eAPI: the two pings
+    go in one text batch and routes, neighbors and CPU in one JSON batch, on
+    a pooled keep-alive HTTP connection. CPU comes from 'show processes top
+    once' (user + system + nice) instead of shelling out to top.
+    """
+    result = _new_result(hostname)
+    if client is None:
+        username, password = find_credentials(hostname)
+        if username is None or password is None:
+            log(f"❌ No credentials found in {PASSWORD_FILE} for '{hostname}'.")
+            result["error"] = "No credentials found"
+            return result
+        client = eapi.EAPIClient(hostname, username, password)
+
+    try:
+        log(f"Connecting to {hostname} over eAPI...")
+        log("\n[+] Testing connectivity...")
+        ipv4_result, ipv6_result = client.run_text([f"ping {PING_IPV4}", f"ping ipv6 {PING_IPV6}"])
+        ok = not ("Success rate is 0 percent" in ipv4_result or "Success rate is 0 percent" in ipv6_result)
+        result["ping"] = {"ok": ok, "ipv4": ipv4_result, "ipv6": ipv6_result}
+        log("✅ Ping test successful" if ok else "❌ Ping test failed")
+
+        log("\n[+] Retrieving routing table, neighbors and CPU utilization...")
+        routes, ospf, lldp, top = client.run_cmds(
+            ["show ip route", "show ip ospf neighbor", "show lldp neighbors", "show processes top once"])
+        neighbors = _ospf_neighbors(ospf) or lldp.get("lldpNeighbors") or None
+        result["routing"] = {"routes": routes, "neighbors": neighbors}
+        log(f"Routes: {len(routes.get('vrfs', {}).get('default', {}).get('routes', {}))}, "
+            f"neighbors: {len(neighbors or [])}")
+
+        cpu = top.get("cpuInfo", {}).get("%Cpu(s)", {})
+        result["cpu"] = {"ok": None, "cpu": None, "error": None}
+        if cpu:
+            value = float(cpu.get("user", 0)) + float(cpu.get("system", 0)) + float(cpu.get("nice", 0))
+            result["cpu"].update(cpu=value, ok=value < CPU_THRESHOLD)
+            log(f"✅ CPU utilization OK ({value:.2f}%)" if value < CPU_THRESHOLD
+                else f"⚠️ CPU utilization high ({value:.2f}%)")
+        else:
+            result["cpu"]["error"] = "No CPU information in 'show processes top once'"
+            log(f"⚠️ {result['cpu']['error']}")
+
+        log(f"\n✅ All tests completed for {hostname}")
+        result["completed"] = True
+        result["healthy"] = bool(ok and result["cpu"]["ok"] is not False)
+    except Exception as e:
+        log(f"❌ eAPI request or test failed for {hostname}: {e}")
+        result["error"] = str(e)
+    return result
 
 
+def run_health_check(hostname, pool=None, log=print, transport="ssh"):
+    """
+    Run every health check against one device (see collect_health).
+    Returns True when the checks ran, False on missing credentials or failure.
+    """
+    return collect_health(hostname, pool, log, transport)["completed"]
+
+
+def format_health(result, log=print):
+    """Replay a stored collect_health() result as the same summary lines a live run prints."""
+    if not result["completed"]:
+        log(f"❌ Health check failed for {result['hostname']}: {result['error']}")
+        return
+    ping, routing, cpu = result["ping"], result["routing"], result["cpu"]
+    log(f"IPv4 Ping Result:\n{ping['ipv4']}\n")
+    log(f"IPv6 Ping Result:\n{ping['ipv6']}\n")
+    log("✅ Ping test successful" if ping["ok"] else "❌ Ping test failed")
+    log("\n=== Routing Table ===")
+    log(routing["routes"] if isinstance(routing["routes"], str) else json.dumps(routing["routes"], indent=2))
+    log("\n=== Neighbors ===")
+    log(routing["neighbors"] if routing["neighbors"] else "No neighbor data found.")
+    if cpu["cpu"] is None:
+        log(f"⚠️ {cpu['error']}")
+    elif cpu["ok"]:
+        log(f"✅ CPU utilization OK ({cpu['cpu']:.2f}%)")
+    else:
+        log(f"⚠️ CPU utilization high ({cpu['cpu']:.2f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Device Health Check Script (uses rotated_passwords.csv for auth)")
+    parser.add_argument(
+        "hostname",
+        help="Hostname or IP address of the device to test (will be matched against Device or Hostname fields in CSV)"
+    )
+    parser.add_argument("--eapi", action="store_true", help="Run the checks over eAPI instead of SSH")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.recording(getattr(args, "metrics", None), getattr(args, "metrics_port", None)):
+        ok = run_health_check(args.hostname, transport="eapi" if getattr(args, "eapi", False) else "ssh")
+    if not ok:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,899 @@
+#!/usr/bin/env python3
+import argparse
+import base64
+import csv
+import hashlib
+import ipaddress
+import json
+import logging
+import random
+import re
+import selectors
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import paramiko
+import yaml
+
+try:
+    import resource
+except ImportError:  # Windows: keep the default file descriptor limit
+    resource = None
+
+USERNAME = "admin"
+PASSWORD = "admin"
+HOSTNAME_PREFIX = "r"
+INTERFACES = 4         # Ethernet ports per device; Ethernet1/2 link to the ring neighbours
+MAX_DEVICES = 65535    # Generated addressing (loopbacks, IPv6 prefixes) has room for this many
+MODEL = "vEOS-lab"
+EOS_VERSION = "4.30.0F"
+EAPI_PATH = "/command-api"
+AUTH_TIMEOUT = 30      # Seconds a client gets to authenticate and open a shell
+
+LINK_BASE = ipaddress.IPv4Address("10.0.0.0")       # /31 per ring link
+STUB_BASE = ipaddress.IPv4Address("172.16.0.0")     # /30 per stub port
+LOOPBACK_BASE = ipaddress.IPv4Address("10.255.0.0")  # /32 per device
+
+# Lines that open a config section (indented lines follow)
+SECTION_KEYWORDS = ("interface ", "router ", "management ", "vlan ", "vrf instance ", "route-map ",
+                    "ip access-list ", "ipv6 access-list ", "policy-map ", "class-map ", "daemon ", "monitor ")
+SAVE_COMMANDS = ("copy running-config startup-config", "write", "write memory")
+_USERNAME = re.compile(r"^username (?P<name>\S+)(?: .*?)?(?: secret(?: (?P<kind>0|5|7|sha512))? (?P<secret>\S+)"
+                       r"| (?P<nopassword>nopassword))")
+_PING = re.compile(r"^ping(?: (?P<ipv6>ipv6))?(?: vrf \S+)? (?P<target>\S+)(?:.* repeat (?P<repeat>\d+))?")
+
+
+class CommandError(Exception):
+    """A command the simulated CLI rejects. code follows eAPI: 1002 invalid input, 1003 no JSON output."""
+
+    def __init__(self, command, code=1002):
+        super().__init__(f"Invalid input (at token 0: '{command.split()[0] if command.split() else ''}')"
+                         if code == 1002 else f"Command '{command}' has no JSON output")
+        self.command = command
+        self.code = code
+
+
+# ------------------------------------------------------------
+# Virtual device: generated state and command output
+# ------------------------------------------------------------
+def short_name(name):
+    """Ethernet1 -> Et1, Loopback0 -> Lo0, Management1 -> Ma1 (as EOS abbreviates in tables)."""
+    match = re.match(r"([A-Za-z]+)(.*)", name)
+    return match.group(1)[:2] + match.group(2) if match else name
+
+
+class VirtualDevice:
+    """
+    One simulated EOS device. Device index of count devices sits in a ring:
+    Ethernet1 links to the next device's Ethernet2 (a /31 each), the other
+    Ethernet ports are stub /30s, Loopback0 is the OSPF router ID.
+    Users, hostname and extra config lines change through configure().
+    """
+
+    def __init__(self, index, count, username=USERNAME, password=PASSWORD, interfaces=INTERFACES,
+                 canned=None, seed=0):
+        if index >= MAX_DEVICES:
+            raise ValueError(f"At most {MAX_DEVICES} devices can be simulated")
+        self.index = index
+        self.hostname = f"{HOSTNAME_PREFIX}{index + 1}"
+        self.users = {username: password}
+        self.canned = canned or {}
+        self.cpu = round(random.Random(seed * MAX_DEVICES + index).uniform(2, 30), 1)
+        self.router_id = str(LOOPBACK_BASE + index + 1)
+        self.serial = f"SIM{index + 1:08d}"
+        self.started = time.time()
+        self.extra = {}   # Config added through configure(): top-level line -> child lines
+        self.startup = None
+        self.down = False  # Every connection is dropped while set
+        self.host = None
+        self.ssh_port = None
+        self.eapi_port = None
+        self._lock = threading.Lock()
+        self.interfaces = self._generate_interfaces(index, count, interfaces)
+
+    @staticmethod
+    def _generate_interfaces(n, count, ports):
+        rows = []
+        for i in range(1, ports + 1):
+            row = {"name": f"Ethernet{i}", "ipv6": f"2001:db8:{n + 1:x}:{i:x}::1/64", "description": None,
+                   "peer": None}
+            if count > 1 and i in (1, 2):
+                # Ethernet1 is the even end of link n, Ethernet2 the odd end of link n-1
+                link = n if i == 1 else (n - 1) % count
+                side = 0 if i == 1 else 1
+                peer = (n + 1) % count if i == 1 else (n - 1) % count
+                peer_port = "Ethernet2" if i == 1 else "Ethernet1"
+                row.update(address=f"{LINK_BASE + 2 * link + side}/31",
+                           ipv6=f"2001:db8:0:{link:x}::{side + 1}/64",
+                           description=f"link to {HOSTNAME_PREFIX}{peer + 1} {peer_port}",
+                           peer={"hostname": f"{HOSTNAME_PREFIX}{peer + 1}", "interface": peer_port,
+                                 "address": str(LINK_BASE + 2 * link + 1 - side),
+                                 "router_id": str(LOOPBACK_BASE + peer + 1)})
+            else:
+                row["address"] = f"{STUB_BASE + 4 * (n * ports + i - 1) + 1}/30"
+            row["link_local"] = f"fe80::{n + 1:x}:{i:x}/64"
+            row["ipv6"] = str(ipaddress.ip_interface(row["ipv6"]))  # Canonical form: 2001:db8::1/64
+            rows.append(row)
+        rows.append({"name": "Loopback0", "address": f"{LOOPBACK_BASE + n + 1}/32",
+                     "ipv6": f"2001:db8:ffff:{n + 1:x}::1/128", "link_local": None,
+                     "description": "router-id", "peer": None})
+        return rows
+
+    # --- Credentials and config -------------------------------------------------
+    def authenticate(self, username, password):
+        with self._lock:
+            secret = self.users.get(username)
+        return secret is not None and (secret == "" or secret == password)
+
+    def configure(self, line, context=None):
+        """Apply one config-mode line inside context (a section line or None). Returns the new context."""
+        with self._lock:
+            if context is None or line.startswith(SECTION_KEYWORDS):
+                if line.startswith(SECTION_KEYWORDS):
+                    self.extra.setdefault(line, [])
+                    return line
+                match = _USERNAME.match(line)
+                if match:
+                    self.users[match.group("name")] = "" if match.group("nopassword") else match.group("secret")
+                elif line.startswith("no username "):
+                    self.users.pop(line.split()[2], None)
+                elif line.startswith("hostname "):
+                    self.hostname = line.split()[1]
+                elif line.startswith("no ") and line[3:] in self.extra:
+                    del self.extra[line[3:]]
+                else:
+                    self.extra.setdefault(line, [])
+                return None
+            children = self.extra.setdefault(context, [])
+            if line.startswith("no ") and line[3:] in children:
+                children.remove(line[3:])
+            elif line not in children:
+                children.append(line)
+            return context
+
+    def save(self):
+        self.startup = self.running_config()
+
+    @staticmethod
+    def _secret(username, password):
+        digest = hashlib.sha512(f"{username}:{password}".encode()).hexdigest()
+        return f"$6${digest[:16]}${digest[16:102]}"
+
+    def running_config(self):
+        with self._lock:
+            users = dict(self.users)
+            extra = {line: list(children) for line, children in self.extra.items()}
+            hostname = self.hostname
+        sections = {"no aaa root": []}
+        for name, password in users.items():
+            if password == "":
+                sections[f"username {name} privilege 15 role network-admin nopassword"] = []
+            else:
+                sections[f"username {name} privilege 15 role network-admin secret sha512 "
+                         f"{self._secret(name, password)}"] = []
+        sections["management api http-commands"] = ["no shutdown"]
+        sections[f"hostname {hostname}"] = []
+        sections["snmp-server community public rw"] = []
+        sections["snmp-server host 10.0.100.1 version 2c pub"] = []
+        sections["spanning-tree mode mstp"] = []
+        for intf in self.interfaces:
+            lines = [f"description {intf['description']}"] if intf["description"] else []
+            if intf["name"].startswith("Ethernet"):
+                lines.append("no switchport")
+            lines += [f"ip address {intf['address']}", f"ipv6 address {intf['ipv6']}"]
+            sections[f"interface {intf['name']}"] = lines
+        if self.host:
+            sections["interface Management1"] = [f"ip address {self.host}/8"]
+        sections["ip routing"] = []
+        sections["ipv6 unicast-routing"] = []
+        sections["router ospf 1"] = [f"router-id {self.router_id}", "network 10.0.0.0/8 area 0.0.0.0",
+                                     "max-lsa 12000"]
+        for line, children in extra.items():
+            existing = sections.setdefault(line, [])
+            existing.extend(child for child in children if child not in existing)
+
+        out = ["! Command: show running-config", f"! device: {hostname} ({MODEL}, EOS-{EOS_VERSION})", "!"]
+        for line, children in sections.items():
+            out.append(line)
+            out.extend(f"   {child}" for child in children)
+            out.append("!")
+        out.append("end")
+        return "\n".join(out)
+
+    # --- Show commands ----------------------------------------------------------
+    def _ip_interface_brief(self):
+        out = [" " * 80 + "Address",
+               "Interface         IP Address            Status       Protocol           MTU    Owner",
+               "----------------- --------------------- ------------ -------------- ---------- -------"]
+        rows = self.interfaces + ([{"name": "Management1", "address": f"{self.host}/8"}] if self.host else [])
+        for intf in rows:
+            mtu = 65535 if intf["name"].startswith("Loopback") else 1500
+            out.append(f"{intf['name']:<17} {intf['address']:<21} {'up':<12} {'up':<14} {mtu:>10}")
+        return "\n".join(out)
+
+    def _ipv6_interface_brief(self):
+        out = ["   Interface       Status        MTU       IPv6 Address                     Addr State    Addr Source",
+               "--------------- ------------ ---------- -------------------------------- ---------------- -----------"]
+        for intf in self.interfaces:
+            mtu = 65535 if intf["name"].startswith("Loopback") else 1500
+            addresses = [(intf["link_local"], "link local")] if intf["link_local"] else []
+            addresses.append((intf["ipv6"], "config"))
+            for n, (address, source) in enumerate(addresses):
+                prefix = f"   {short_name(intf['name']):<15} {'up':<13} {mtu:<9}" if n == 0 else " " * 42
+                out.append(f"{prefix} {address:<32} {'up':<13} {source}")
+        return "\n".join(out)
+
+    def _interfaces_description(self):
+        out = ["Interface                      Status         Protocol           Description"]
+        for intf in self.interfaces:
+            out.append(f"{short_name(intf['name']):<30} {'up':<14} {'up':<18} {intf['description'] or ''}".rstrip())
+        if self.host:
+            out.append(f"{'Ma1':<30} {'up':<14} up")
+        return "\n".join(out)
+
+    def _ip_route(self):
+        out = ["VRF: default",
+               "Codes: C - connected, S - static, K - kernel,",
+               "       O - OSPF, IA - OSPF inter area, E1 - OSPF external type 1,",
+               "       E2 - OSPF external type 2, B - Other BGP Routes, B E - eBGP",
+               "",
+               "Gateway of last resort is not set",
+               ""]
+        for intf in self.interfaces:
+            network = ipaddress.ip_interface(intf["address"]).network
+            out.append(f" C        {network} is directly connected, {intf['name']}")
+        seen = set()
+        for intf in self.interfaces:
+            peer = intf["peer"]
+            if peer and peer["router_id"] not in seen and peer["router_id"] != self.router_id:
+                seen.add(peer["router_id"])
+                out.append(f" O        {peer['router_id']}/32 [110/20] via {peer['address']}, {intf['name']}")
+        return "\n".join(out)
+
+    def _ospf_neighbor(self):
+        out = ["Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface"]
+        for intf in self.interfaces:
+            peer = intf["peer"]
+            if peer:
+                out.append(f"{peer['router_id']:<15} {1:<8} {'default':<8} {1:<3} {'FULL/DR':<22} "
+                           f"{'00:00:35':<11} {peer['address']:<15} {intf['name']}")
+        return "\n".join(out)
+
+    def _lldp_neighbors(self):
+        peers = [intf for intf in self.interfaces if intf["peer"]]
+        out = ["Last table change time   : 0:12:03 ago",
+               f"Number of table inserts  : {len(peers)}",
+               "Number of table deletes  : 0",
+               "",
+               "Port          Neighbor Device ID       Neighbor Port ID    TTL",
+               "---------- ------------------------ ---------------------- ---"]
+        for intf in peers:
+            out.append(f"{short_name(intf['name']):<13} {intf['peer']['hostname']:<24} "
+                       f"{intf['peer']['interface']:<19} 120")
+        return "\n".join(out)
+
+    def _version(self):
+        uptime = int(time.time() - self.started)
+        return {"modelName": MODEL, "version": EOS_VERSION, "serialNumber": self.serial,
+                "systemMacAddress": f"50:00:00:{self.index >> 16 & 0xff:02x}:{self.index >> 8 & 0xff:02x}:"
+                                    f"{self.index & 0xff:02x}",
+                "hardwareRevision": "", "architecture": "x86_64", "internalVersion": f"{EOS_VERSION}-sim",
+                "uptime": uptime, "memTotal": 2006636, "memFree": 1024000, "isIntlVersion": False}
+
+    def _version_text(self):
+        v = self._version()
+        return (f"Arista {v['modelName']}\nHardware version:\nSerial number: {v['serialNumber']}\n"
+                f"System MAC address: {v['systemMacAddress']}\n\nSoftware image version: {v['version']}\n"
+                f"Architecture: {v['architecture']}\nInternal build version: {v['internalVersion']}\n\n"
+                f"Uptime: {v['uptime'] // 3600} hours and {v['uptime'] % 3600 // 60} minutes\n"
+                f"Total memory: {v['memTotal']} kB\nFree memory: {v['memFree']} kB")
+
+    @staticmethod
+    def _ping(command):
+        match = _PING.match(command)
+        if not match:
+            raise CommandError(command)
+        target, count = match.group("target"), int(match.group("repeat") or 5)
+        size = "52(100)" if match.group("ipv6") else "72(100)"
+        out = [f"PING {target} ({target}) {size} bytes of data."]
+        out += [f"80 bytes from {target}: icmp_seq={n} ttl=64 time=0.100 ms" for n in range(1, count + 1)]
+        out += ["", f"--- {target} ping statistics ---",
+                f"{count} packets transmitted, {count} received, 0% packet loss, time {count}ms",
+                "rtt min/avg/max/mdev = 0.100/0.100/0.100/0.000 ms"]
+        return "\n".join(out)
+
+    def execute(self, command):
+        """CLI text of an exec-mode command ('| include/exclude/begin' filters applied)."""
+        base, _, pipe = (" ".join(part.split()) for part in command.partition("|"))
+        text = self._execute(base)
+        if not pipe:
+            return text
+        verb, _, pattern = pipe.partition(" ")
+        lines = text.splitlines()
+        if verb in ("include", "i", "grep"):
+            lines = [line for line in lines if re.search(pattern, line)]
+        elif verb in ("exclude", "e"):
+            lines = [line for line in lines if not re.search(pattern, line)]
+        elif verb in ("begin", "b"):
+            start = next((n for n, line in enumerate(lines) if re.search(pattern, line)), len(lines))
+            lines = lines[start:]
+        else:
+            raise CommandError(pipe)
+        return "\n".join(lines)
+
+    def _execute(self, command):
+        if command in self.canned:
+            return self.canned[command].replace("{hostname}", self.hostname)
+        handlers = {
+            "show ip interface brief": self._ip_interface_brief,
+            "show ipv6 interface brief": self._ipv6_interface_brief,
+            "show interfaces description": self._interfaces_description,
+            "show ip route": self._ip_route,
+            "show ip ospf neighbor": self._ospf_neighbor,
+            "show lldp neighbors": self._lldp_neighbors,
+            "show running-config": self.running_config,
+            "show startup-config": lambda: self.startup or self.running_config(),
+            "show version": self._version_text,
+            "show hostname": lambda: f"Hostname: {self.hostname}\nFQDN:     {self.hostname}",
+            "show clock": lambda: time.strftime("%a %b %d %H:%M:%S %Y") + "\nTimezone: UTC\nClock source: local",
+        }
+        handler = handlers.get(command)
+        if handler is not None:
+            return handler()
+        if command.startswith("ping "):
+            return self._ping(command)
+        if command.startswith("bash "):
+            return str(self.cpu) if "Cpu(s)" in command else ""
+        raise CommandError(command)
+
+    def _json_ip_interface_brief(self):
+        interfaces = {}
+        for intf in self.interfaces:
+            address, _, length = intf["address"].partition("/")
+            interfaces[intf["name"]] = {"name": intf["name"], "lineProtocolStatus": "up",
+                                        "interfaceStatus": "connected", "mtu": 1500,
+                                        "interfaceAddress": {"ipAddr": {"address": address, "maskLen": int(length)}}}
+        return {"interfaces": interfaces}
+
+    def _json_ipv6_interface(self):
+        interfaces = {}
+        for intf in self.interfaces:
+            network = ipaddress.ip_interface(intf["ipv6"]).network
+            interfaces[intf["name"]] = {
+                "name": intf["name"], "lineProtocolStatus": "up",
+                "linkLocal": {"address": intf["link_local"].split("/")[0]} if intf["link_local"] else {},
+                "addresses": [{"address": intf["ipv6"].split("/")[0], "subnet": str(network)}]}
+        return {"interfaces": interfaces}
+
+    def _json_ip_route(self):
+        routes = {}
+        for intf in self.interfaces:
+            network = str(ipaddress.ip_interface(intf["address"]).network)
+            routes[network] = {"routeType": "connected", "directlyConnected": True,
+                               "vias": [{"interface": intf["name"]}]}
+        for intf in self.interfaces:
+            peer = intf["peer"]
+            if peer and peer["router_id"] != self.router_id:
+                routes.setdefault(f"{peer['router_id']}/32", {
+                    "routeType": "OSPF", "preference": 110, "metric": 20, "directlyConnected": False,
+                    "vias": [{"nexthopAddr": peer["address"], "interface": intf["name"]}]})
+        return {"vrfs": {"default": {"routes": routes}}}
+
+    def _json_ospf_neighbor(self):
+        entries = [{"routerId": intf["peer"]["router_id"], "interfaceAddress": intf["peer"]["address"],
+                    "interfaceName": intf["name"], "adjacencyState": "full", "drState": "DR", "priority": 1}
+                   for intf in self.interfaces if intf["peer"]]
+        return {"vrfs": {"default": {"instList": {"1": {"ospfNeighborEntries": entries}}}}}
+
+    def _json_lldp_neighbors(self):
+        return {"lldpNeighbors": [{"port": intf["name"], "neighborDevice": intf["peer"]["hostname"],
+                                   "neighborPort": intf["peer"]["interface"], "ttl": 120}
+                                  for intf in self.interfaces if intf["peer"]]}
+
+    def _json_processes_top(self):
+        user = round(self.cpu * 0.7, 1)
+        system = round(self.cpu - user, 1)
+        return {"cpuInfo": {"%Cpu(s)": {"user": user, "system": system, "nice": 0.0,
+                                        "idle": round(100 - self.cpu, 1)}}}
+
+    def execute_json(self, command):
+        """eAPI format='json' result of an exec-mode command."""
+        command = " ".join(command.split())
+        handlers = {
+            "show version": self._version,
+            "show hostname": lambda: {"hostname": self.hostname, "fqdn": self.hostname},
+            "show ip interface brief": self._json_ip_interface_brief,
+            "show ipv6 interface": self._json_ipv6_interface,
+            "show interfaces description": lambda: {"interfaceDescriptions": {
+                intf["name"]: {"description": intf["description"] or "", "lineProtocolStatus": "up",
+                               "interfaceStatus": "up"} for intf in self.interfaces}},
+            "show ip route": self._json_ip_route,
+            "show ip ospf neighbor": self._json_ospf_neighbor,
+            "show lldp neighbors": self._json_lldp_neighbors,
+            "show processes top once": self._json_processes_top,
+        }
+        handler = handlers.get(command)
+        if handler is not None:
+            return handler()
+        self._execute(command)  # Invalid commands still fail with 1002
+        raise CommandError(command, code=1003)
+
+
+class CLISession:
+    """
+    Mode and prompt of one CLI session on a VirtualDevice (no I/O): exec
+    and config mode, 'configure terminal', 'end', 'exit', 'do', saves and
+    the 'terminal' commands netmiko sends while preparing the session.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.config = False
+        self.context = None
+        self.closed = False
+
+    @property
+    def prompt(self):
+        if not self.config:
+            return f"{self.device.hostname}#"
+        if self.context is None:
+            return f"{self.device.hostname}(config)#"
+        first, _, rest = self.context.partition(" ")
+        mode = f"if-{short_name(rest)}" if first == "interface" else "-".join(self.context.split()[:2])
+        return f"{self.device.hostname}(config-{mode})#"
+
+    def handle(self, line):
+        """Output of one input line; raises CommandError for input the device rejects."""
+        line = " ".join(line.split())
+        if not line or line.startswith("!"):
+            return ""
+        words = line.split()
+        if line in SAVE_COMMANDS:
+            self.device.save()
+            return "Copy completed successfully."
+        if self.config:
+            if words[0] == "end":
+                self.config, self.context = False, None
+            elif words[0] == "exit":
+                if self.context is None:
+                    self.config = False
+                self.context = None
+            elif words[0] == "do":
+                return self.device.execute(line[3:])
+            else:
+                self.context = self.device.configure(line, self.context)
+            return ""
+        if words[0].startswith("conf") and (len(words) == 1 or words[1] in ("terminal", "term", "t")):
+            self.config = True
+            return ""
+        if words[0] in ("exit", "quit", "logout"):
+            self.closed = True
+            return ""
+        if words[0] in ("enable", "disable"):
+            return ""
+        if words[0] == "terminal":
+            if words[1:2] == ["length"]:
+                return "Pagination disabled."
+            if words[1:2] == ["width"] and len(words) > 2:
+                return f"Width set to {words[2]} columns."
+            return ""
+        return self.device.execute(line)
+
+
+# ------------------------------------------------------------
+# SSH and eAPI front ends
+# ------------------------------------------------------------
+class _SSHServer(paramiko.ServerInterface):
+    def __init__(self, device):
+        self.device = device
+        self.ready = threading.Event()
+        self.exec_command = None
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL if self.device.authenticate(username, password) else paramiko.AUTH_FAILED
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.ready.set()
+        return True
+
+    def check_channel_exec_request(self, channel, command):
+        self.exec_command = command.decode(errors="replace")
+        self.ready.set()
+        return True
+
+
+class _EAPIHandler(BaseHTTPRequestHandler):
+    """runCmds over HTTP/1.1 keep-alive for one device (self.server is the _Listener)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "EOS-simulator"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        listener = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path != EAPI_PATH:
+            return self._reply(404)
+        try:
+            kind, _, token = self.headers.get("Authorization", "").partition(" ")
+            username, _, password = base64.b64decode(token).decode().partition(":")
+        except (ValueError, UnicodeDecodeError):
+            kind = username = password = ""
+        if kind != "Basic" or not listener.device.authenticate(username, password):
+            return self._reply(401, headers=[("WWW-Authenticate", 'Basic realm="eAPI"')])
+        if listener.simulator.drop():
+            self.close_connection = True  # Injected failure: no reply at all
+            return None
+        request = json.loads(body)
+        reply = listener.simulator.run_cmds(listener.device, request.get("params", {}))
+        reply.update(jsonrpc="2.0", id=request.get("id"))
+        self._reply(200, json.dumps(reply).encode())
+
+
+class _Listener:
+    def __init__(self, simulator, device, kind, sock):
+        self.simulator = simulator
+        self.device = device
+        self.kind = kind
+        self.sock = sock
+
+
+# ------------------------------------------------------------
+# Simulator
+# ------------------------------------------------------------
+_host_key = None
+_host_key_lock = threading.Lock()
+
+
+def default_host_key():
+    """RSA host key shared by every simulator in the process (generated on first use)."""
+    global _host_key
+    with _host_key_lock:
+        if _host_key is None:
+            _host_key = paramiko.RSAKey.generate(2048)
+        return _host_key
+
+
+def raise_fd_limit():
+    """Lift the soft open-files limit to the hard limit (one socket per listener and session)."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class DeviceSimulator:
+    """
+    Many VirtualDevices served from one process: an SSH server per device
+    (and optionally eAPI over HTTP), all on loopback. Devices listen on
+    consecutive ports of one address (port 0: any free port), or with
+    spread=True on consecutive addresses from address (127.0.0.0/8 is all
+    loopback on Linux) with the same port each, so unmodified scripts can
+    reach them on port 22.
+
+    Failure injection: latency (+ up to jitter) per command, connect_latency
+    per new connection, failure_rate of connections dropped on accept,
+    drop_rate of commands that kill the session instead of answering and a
+    down fraction of devices that drop every connection.
+    """
+
+    def __init__(self, count=8, address="127.0.0.1", port=0, eapi=False, eapi_port=0, spread=False,
+                 username=USERNAME, password=PASSWORD, interfaces=INTERFACES, canned=None,
+                 latency=0.0, jitter=0.0, connect_latency=0.0, failure_rate=0.0, drop_rate=0.0, down=0.0,
+                 host_key=None, seed=0):
+        self.address = address
+        self.port = port
+        self.eapi = eapi
+        self.eapi_port = eapi_port
+        self.spread = spread
+        self.latency = latency
+        self.jitter = jitter
+        self.connect_latency = connect_latency
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.host_key = host_key
+        self._rng = random.Random(seed)
+        self.devices = [VirtualDevice(n, count, username, password, interfaces, canned, seed) for n in range(count)]
+        for device in self._rng.sample(self.devices, int(round(count * down))):
+            device.down = True
+        self._listeners = []
+        self._selector = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._active = set()
+        self._lock = threading.Lock()
+        self.counters = {"connections": 0, "rejected": 0, "commands": 0, "dropped": 0}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _bind(self, n, port):
+        host = str(ipaddress.ip_address(self.address) + n) if self.spread else self.address
+        if port and not self.spread:
+            port += n
+        sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(128)
+        sock.setblocking(False)
+        return host, sock
+
+    def start(self):
+        """Bind every device's listeners and start accepting. Returns self."""
+        raise_fd_limit()
+        self.host_key = self.host_key or default_host_key()
+        self._selector = selectors.DefaultSelector()
+        try:
+            for n, device in enumerate(self.devices):
+                kinds = [("ssh", self.port)] + ([("eapi", self.eapi_port)] if self.eapi else [])
+                for kind, port in kinds:
+                    host, sock = self._bind(n, port)
+                    listener = _Listener(self, device, kind, sock)
+                    self._listeners.append(listener)
+                    self._selector.register(sock, selectors.EVENT_READ, listener)
+                    device.host = host
+                    setattr(device, f"{kind}_port", sock.getsockname()[1])
+        except OSError:
+            self.stop()
+            raise
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._accept_loop, name="device-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for listener in self._listeners:
+            listener.sock.close()
+        self._listeners = []
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        with self._lock:
+            active, self._active = self._active, set()
+        for conn in active:
+            if isinstance(conn, socket.socket):
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)  # Wakes a handler blocked reading a keep-alive connection
+                except OSError:
+                    pass
+            conn.close()
+
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            for key, _ in self._selector.select(timeout=0.2):
+                try:
+                    sock, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                sock.setblocking(True)
+                threading.Thread(target=self._serve, args=(key.data, sock), daemon=True).start()
+
+    # --- Failure injection --------------------------------------------------------
+    def delay(self):
+        wait = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if wait:
+            time.sleep(wait)
+
+    def drop(self):
+        """True when this command should kill its session (drop_rate)."""
+        if self.drop_rate and self._rng.random() < self.drop_rate:
+            self._count("dropped")
+            return True
+        return False
+
+    # --- Sessions --------------------------------------------------------------
+    def _serve(self, listener, sock):
+        self._count("connections")
+        if listener.device.down or (self.failure_rate and self._rng.random() < self.failure_rate):
+            self._count("rejected")
+            sock.close()
+            return
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        if listener.kind == "ssh":
+            self._serve_ssh(listener.device, sock)
+        else:
+            self._serve_eapi(listener, sock)
+
+    def _serve_eapi(self, listener, sock):
+        with self._lock:
+            self._active.add(sock)
+        try:
+            _EAPIHandler(sock, sock.getpeername(), listener)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._active.discard(sock)
+            sock.close()
+
+    def _serve_ssh(self, device, sock):
+        transport = paramiko.Transport(sock)
+        transport.add_server_key(self.host_key)
+        server = _SSHServer(device)
+        with self._lock:
+            self._active.add(transport)
+        try:
+            transport.start_server(server=server)
+            channel = transport.accept(AUTH_TIMEOUT)
+            if channel is None or not server.ready.wait(AUTH_TIMEOUT):
+                return
+            if server.exec_command is not None:
+                self._exec(device, channel, server.exec_command)
+            else:
+                self._shell(device, channel)
+        except (paramiko.SSHException, EOFError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._active.discard(transport)
+            transport.close()
+
+    def _answer(self, session, line):
+        """Run one line on session with latency and drop injection; None when the session must end."""
+        self._count("commands")
+        self.delay()
+        if self.drop():
+            return None
+        try:
+            return session.handle(line)
+        except CommandError as e:
+            return f"% {e}"
+
+    def _exec(self, device, channel, command):
+        output = self._answer(CLISession(device), command)
+        if output is not None:
+            channel.sendall((output.replace("\n", "\r\n") + "\r\n").encode())
+            channel.send_exit_status(0)
+        channel.close()
+
+    def _shell(self, device, channel):
+        session = CLISession(device)
+        channel.sendall(f"\r\n{session.prompt}".encode())
+        pending = ""
+        skip_lf = False
+        while not self._stopping.is_set():
+            data = channel.recv(4096)
+            if not data:
+                return
+            for char in data.decode(errors="replace"):
+                if skip_lf and char == "\n":
+                    skip_lf = False
+                    continue
+                skip_lf = char == "\r"
+                if char not in "\r\n":
+                    pending += char
+                    continue
+                line, pending = pending, ""
+                output = self._answer(session, line)
+                if output is None or session.closed:
+                    return
+                reply = line + "\r\n" + (output.replace("\n", "\r\n") + "\r\n" if output else "") + session.prompt
+                channel.sendall(reply.encode())
+
+    def run_cmds(self, device, params):
+        """JSON-RPC result (or error) of an eAPI runCmds request; stops at the first failing command."""
+        session = CLISession(device)
+        text = params.get("format", "json") == "text"
+        results = []
+        cmds = params.get("cmds", [])
+        for n, cmd in enumerate(cmds, 1):
+            cmd = cmd.get("cmd", "") if isinstance(cmd, dict) else cmd
+            self._count("commands")
+            self.delay()
+            try:
+                if text:
+                    results.append({"output": session.handle(cmd) + "\n"})
+                elif session.config or cmd.split()[:1] in (["enable"], ["configure"], ["end"]):
+                    session.handle(cmd)
+                    results.append({})
+                else:
+                    results.append(device.execute_json(cmd))
+            except CommandError as e:
+                return {"error": {"code": e.code, "message": f"CLI command {n} of {len(cmds)} '{cmd}' failed: "
+                                                            f"{'invalid command' if e.code == 1002 else 'no JSON'}",
+                                  "data": results + [{"errors": [str(e)]}]}}
+        return {"result": results}
+
+    # --- Inventory -------------------------------------------------------------
+    def inventory(self):
+        return [{"hostname": d.hostname, "host": d.host, "port": d.ssh_port, "eapi_port": d.eapi_port,
+                 "username": next(iter(d.users)), "password": next(iter(d.users.values()))}
+                for d in self.devices]
+
+    def write_inventory(self, path):
+        """Devices in the rotated_passwords.csv layout the scripts read, plus SSH and eAPI ports."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Device", "Hostname", "Username", "New_Password", "Port", "EAPI_Port"])
+            for d in self.inventory():
+                writer.writerow([d["host"], d["hostname"], d["username"], d["password"], d["port"],
+                                 d["eapi_port"] or ""])
+        return path
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, active=len(self._active), devices=len(self.devices))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a fleet of EOS devices over SSH (and eAPI) on loopback")
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--address", default="127.0.0.1", help="Listen address (first address with --spread)")
+    parser.add_argument("--port", type=int, default=0, help="First SSH port (0: any free port)")
+    parser.add_argument("--spread", action="store_true",
+                        help="One loopback address per device, all on --port (e.g. 127.0.1.1 and 22)")
+    parser.add_argument("--eapi", action="store_true", help="Also serve eAPI over HTTP")
+    parser.add_argument("--eapi-port", type=int, default=0, help="First eAPI port (0: any free port)")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--interfaces", type=int, default=INTERFACES, help="Ethernet ports per device")
+    parser.add_argument("--outputs", help="YAML/JSON file of {command: output} answered instead of generated data")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per command")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per command, up to this")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="Seconds per new connection")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of connections dropped")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of commands that kill the session")
+    parser.add_argument("--down", type=float, default=0.0, help="Fraction of devices that are unreachable")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inventory", help="Write the device list as CSV (Device,Hostname,Username,...)")
+    args = parser.parse_args()
+
+    logging.getLogger("paramiko").setLevel(logging.CRITICAL)  # Clients hanging up are not errors here
+    canned = None
+    if args.outputs:
+        with open(args.outputs) as f:
+            canned = yaml.safe_load(f) or {}
+    simulator = DeviceSimulator(args.devices, args.address, args.port, args.eapi, args.eapi_port, args.spread,
+                                args.username, args.password, args.interfaces, canned, args.latency, args.jitter,
+                                args.connect_latency, args.failure_rate, args.drop_rate, args.down, seed=args.seed)
+    simulator.start()
+    first, last = simulator.devices[0], simulator.devices[-1]
+    print(f"🖥️  {len(simulator.devices)} devices: {first.hostname} {first.host}:{first.ssh_port} ... "
+          f"{last.hostname} {last.host}:{last.ssh_port}" + (f" (eAPI from port {first.eapi_port})" if args.eapi else ""))
+    if args.inventory:
+        print(f"📄 Inventory written to {simulator.write_inventory(args.inventory)}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {simulator.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
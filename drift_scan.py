@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    from . import credential_store, golden_store, instrumentation, ipam_store
+    from .config_diff import diff_configs, format_diff
+except ImportError:
+    import credential_store
+    import golden_store
+    import instrumentation
+    import ipam_store
+    from config_diff import diff_configs, format_diff
+
+ROTATED_PASSWORD_FILE = credential_store.PASSWORD_FILE
+
+# Results share the web app's SQLite file
+DB_NAME = ipam_store.DB_NAME
+
+MAX_WORKERS = 64  # Devices fetched at the same time; a scan takes about as long as the slowest one
+
+# Result status values
+IN_SYNC = "in_sync"
+DRIFT = "drift"
+NO_GOLDEN = "no_golden"
+ERROR = "error"
+
+
+def load_devices(csv_file=ROTATED_PASSWORD_FILE):
+    """Devices from the shared credential store (rotated password CSV)"""
+    return [{
+        "device_ip": r["ip"],
+        "device_name": r["hostname"],
+        "username": r["username"],
+        "password": r["password"]
+    } for r in credential_store.get_store(csv_file).devices()]
+
+
+def fetch_running_config(device):
+    """Running config over a NAPALM EOS SSH session."""
+    from napalm import get_network_driver
+
+    driver = get_network_driver("eos")
+    with instrumentation.span("get_config", device=device["device_ip"]), driver(
+        hostname=device["device_ip"],
+        username=device["username"],
+        password=device["password"],
+        optional_args={"transport": "ssh"}
+    ) as device_conn:
+        return device_conn.get_config()["running"]
+
+
+def check_device(device, golden, fetch=fetch_running_config):
+    """Diff one device against its latest version in golden (a GoldenStore). Returns a result dict."""
+    started = time.monotonic()
+    result = {"hostname": device["device_name"], "device_ip": device["device_ip"],
+              "status": ERROR, "golden": None, "added": 0, "removed": 0, "diff": "", "error": None}
+    try:
+        version, golden_config = golden.get(device["device_name"])
+        if version is None:
+            result["status"] = NO_GOLDEN
+        else:
+            result["golden"] = f"v{version['id']} ({version['created_at']})"
+            changes = diff_configs(golden_config, fetch(device))
+            result["added"] = sum(1 for op, _, _ in changes if op == "+")
+            result["removed"] = len(changes) - result["added"]
+            result["diff"] = format_diff(changes)
+            result["status"] = DRIFT if changes else IN_SYNC
+    except Exception as e:
+        result["error"] = str(e)
+    result["duration"] = round(time.monotonic() - started, 3)
+    result["checked_at"] = datetime.now().isoformat(timespec="seconds")
+    return result
+
+
+# ------------------------------------------------------------
+# Result store
+# ------------------------------------------------------------
+class DriftStore:
+    """Latest drift result per device plus a history of scans, in SQLite."""
+
+    def __init__(self, db_name=DB_NAME):
+        self.conn = ipam_store.get_db_connection(db_name)
+        self._lock = threading.Lock()
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS drift_scans (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                started_at TEXT NOT NULL,
+                                finished_at TEXT,
+                                devices INTEGER NOT NULL DEFAULT 0,
+                                drifted INTEGER NOT NULL DEFAULT 0,
+                                errors INTEGER NOT NULL DEFAULT 0,
+                                duration REAL
+                            )''')
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS drift_results (
+                                hostname TEXT PRIMARY KEY,
+                                device_ip TEXT NOT NULL,
+                                scan_id INTEGER,
+                                status TEXT NOT NULL,
+                                golden TEXT,
+                                added INTEGER NOT NULL DEFAULT 0,
+                                removed INTEGER NOT NULL DEFAULT 0,
+                                diff TEXT,
+                                error TEXT,
+                                duration REAL,
+                                checked_at TEXT NOT NULL
+                            )''')
+        self.conn.commit()
+
+    def start_scan(self):
+        with self._lock, self.conn:
+            cursor = self.conn.execute("INSERT INTO drift_scans (started_at) VALUES (?)",
+                                       (datetime.now().isoformat(timespec="seconds"),))
+            return cursor.lastrowid
+
+    def record(self, scan_id, result):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO drift_results (hostname, device_ip, scan_id, status, golden, added, removed, "
+                "diff, error, duration, checked_at) VALUES (:hostname, :device_ip, :scan_id, :status, :golden, "
+                ":added, :removed, :diff, :error, :duration, :checked_at)",
+                dict(result, scan_id=scan_id))
+
+    def finish_scan(self, scan_id, results, duration):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE drift_scans SET finished_at = ?, devices = ?, drifted = ?, errors = ?, duration = ? WHERE id = ?",
+                (datetime.now().isoformat(timespec="seconds"), len(results),
+                 sum(1 for r in results if r["status"] == DRIFT),
+                 sum(1 for r in results if r["status"] == ERROR), round(duration, 3), scan_id))
+
+    def results(self):
+        """Latest result of every device (without diff text), drifted devices first."""
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT hostname, device_ip, scan_id, status, golden, added, removed, error, duration, checked_at "
+                "FROM drift_results ORDER BY CASE status WHEN 'drift' THEN 0 WHEN 'error' THEN 1 "
+                "WHEN 'no_golden' THEN 2 ELSE 3 END, hostname")
+            return [dict(r) for r in cursor]
+
+    def result(self, hostname):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM drift_results WHERE hostname = ? COLLATE NOCASE",
+                                    (hostname,)).fetchone()
+            return dict(row) if row else None
+
+    def last_scan(self):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM drift_scans ORDER BY id DESC LIMIT 1").fetchone()
+            return dict(row) if row else None
+
+    def close(self):
+        self.conn.close()
+
+
+# ------------------------------------------------------------
+# Scanning
+# ------------------------------------------------------------
+def run_scan(devices, store, golden, fetch=fetch_running_config, max_workers=MAX_WORKERS):
+    """Check every device concurrently, storing each result as it completes. Returns the results."""
+    scan_id = store.start_scan()
+    started = time.monotonic()
+
+    def task(device):
+        result = check_device(device, golden, fetch)
+        store.record(scan_id, result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(devices) or 1))) as executor:
+        results = list(executor.map(task, devices))
+    store.finish_scan(scan_id, results, time.monotonic() - started)
+    return results
+
+
+class DriftScanner:
+    """
+    Runs run_scan() on a background thread, on demand (trigger) and/or every
+    interval seconds. Only one scan runs at a time.
+    """
+
+    def __init__(self, store, golden, load=load_devices, fetch=fetch_running_config, max_workers=MAX_WORKERS):
+        self.store = store
+        self.golden = golden
+        self.load = load
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self._running = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running.locked()
+
+    def scan(self):
+        """Run one scan in the calling thread. Returns None if a scan is already running."""
+        if not self._running.acquire(blocking=False):
+            return None
+        return self._scan_locked()
+
+    def _scan_locked(self):
+        """Run a scan with _running already held by the caller; releases it when done."""
+        try:
+            return run_scan(self.load(), self.store, self.golden, self.fetch, self.max_workers)
+        finally:
+            self._running.release()
+
+    def trigger(self):
+        """Start a scan in the background. Returns False if one is already running."""
+        if not self._running.acquire(blocking=False):
+            return False
+        self._thread = threading.Thread(target=self._scan_locked, name="drift-scan", daemon=True)
+        self._thread.start()
+        return True
+
+    def start_periodic(self, interval):
+        def loop():
+            while True:
+                try:
+                    self.scan()
+                except Exception as e:
+                    print(f"❌ Drift scan failed: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name="drift-scan-periodic", daemon=True).start()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every device's running config against its golden config")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Devices checked concurrently (default {MAX_WORKERS})")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    store = DriftStore()
+    started = time.monotonic()
+    with instrumentation.recording(args.metrics, args.metrics_port):
+        results = run_scan(load_devices(), store, golden_store.GoldenStore(), max_workers=args.workers)
+    for r in results:
+        icon = {IN_SYNC: "✅", DRIFT: "⚠️", NO_GOLDEN: "📂", ERROR: "❌"}[r["status"]]
+        detail = r["error"] or (f"+{r['added']} -{r['removed']}" if r["status"] == DRIFT else r["status"])
+        print(f"{icon} {r['hostname']} ({r['device_ip']}): {detail} [{r['duration']}s]")
+    print(f"\n📊 {len(results)} devices scanned in {time.monotonic() - started:.1f}s")
+    store.close()
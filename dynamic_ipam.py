@@ -1,87 +1,282 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
 import csv
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from netmiko import ConnectHandler
 
+try:
+    from . import credential_store, eapi, instrumentation, ipam_store, parsers, snmp_poller, ssh_pool
+except ImportError:
+    import credential_store
+    import eapi
+    import instrumentation
+    import ipam_store
+    import parsers
+    import snmp_poller
+    import ssh_pool
+
 # Input file containing rotated passwords with Hostname column
 PASSWORD_FILE = "/home/student/lab1/rotated_passwords.csv"
 
 # Output CSV file for IPAM data
 OUTPUT_FILE = "dynamic_ipam.csv"
+HEADER = ["Hostname", "Device", "Interface", "IP Address", "IP Version"]
+
+# Indexed IPAM database read by the web app
+IPAM_DB = ipam_store.DB_NAME
+
+# Per-device fingerprints from the last incremental run
+STATE_FILE = "dynamic_ipam_state.json"
+
+MAX_WORKERS = 16  # Devices collected at the same time
+
+# SNMP fingerprint: interface table changes plus the address -> ifIndex mapping
+SNMP_COMMUNITY = "public"
+IF_TABLE_LAST_CHANGE = ".1.3.6.1.2.1.31.1.5.0"
+FINGERPRINT_WALKS = [
+    ".1.3.6.1.2.1.4.34.1.3",  # IP-MIB ipAddressIfIndex (IPv4 and IPv6)
+    ".1.3.6.1.2.1.4.20.1.2",  # IP-MIB ipAdEntIfIndex (legacy IPv4 table)
+]
 
 
 def read_device_passwords():
     """Read device details and passwords (including Hostname) from rotated_passwords.csv"""
-    devices = []
-    with open(PASSWORD_FILE, mode="r") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            devices.append({
-                "host": row["Device"].strip(),
-                "hostname": row.get("Hostname", "N/A").strip(),
-                "username": row["Username"].strip(),
-                "password": row["New_Password"].strip()
-            })
-    return devices
-
-
-def collect_ipam():
-    """SSH into each device and collect IP address information."""
+    return [{
+        "host": r["ip"],
+        "hostname": r["hostname"] or "N/A",
+        "username": r["username"],
+        "password": r["password"]
+    } for r in credential_store.get_store(PASSWORD_FILE).devices()]
+
+
+def collect_device_rows(dev, pool=None):
+    """SSH into one device and return its IPAM rows, or None if collection failed."""
+    device = {
+        "device_type": "arista_eos",  # Adjust as needed
+        "host": dev["host"],
+        "username": dev["username"],
+        "password": dev["password"],
+    }
+
+    rows = []
+    print(f"🔗 Connecting to {dev['hostname']} ({dev['host']})...")
+    try:
+        with instrumentation.span("ipam_collect", device=dev["host"]), \
+                ssh_pool.connection(device, pool, connect=ConnectHandler) as connection:
+            ipv4_output = connection.send_command("show ip interface brief")
+            ipv6_output = connection.send_command("show ipv6 interface brief")
+            loop_output = connection.send_command("show interfaces description | include Loopback")
+
+        # --- IPv4 and IPv6 addresses (header and separator rows are not data) ---
+        for command, output, version in (("show ip interface brief", ipv4_output, "IPv4"),
+                                         ("show ipv6 interface brief", ipv6_output, "IPv6")):
+            for intf in parsers.parse(command, output):
+                if intf.address.lower() == "unassigned" or intf.address.lower().startswith("fe80:"):
+                    continue  # Link-local addresses repeat on every interface
+                rows.append([dev["hostname"], dev["host"], intf.name, intf.address, version])
+
+        # --- Optional: capture Loopback interfaces ---
+        for intf in parsers.parse("show interfaces description", loop_output):
+            if intf.name.startswith(("Loopback", "Lo")):
+                rows.append([dev["hostname"], dev["host"], intf.name, "Loopback", "N/A"])
+
+        print(f"✅ Finished collecting IPs for {dev['hostname']} ({dev['host']})")
+        return rows
+
+    except Exception as e:
+        print(f"❌ Failed to connect to {dev['hostname']} ({dev['host']}): {e}")
+        return None
+
+
+def collect_device_rows_eapi(dev, client=None):
+    """
+    Same rows as collect_device_rows, from one batched eAPI request with
+    structured JSON instead of parsed CLI text. Returns None if collection failed.
+    """
+    client = client or eapi.EAPIClient(dev["host"], dev["username"], dev["password"])
+    rows = []
+    print(f"🔗 Querying {dev['hostname']} ({dev['host']}) over eAPI...")
+    try:
+        ipv4, ipv6, descriptions = client.run_cmds(
+            ["show ip interface brief", "show ipv6 interface", "show interfaces description"])
+
+        # --- IPv4 addresses ---
+        for interface, info in ipv4.get("interfaces", {}).items():
+            addr = info.get("interfaceAddress", {}).get("ipAddr", {})
+            if addr.get("address") and addr["address"] != "0.0.0.0":
+                rows.append([dev["hostname"], dev["host"], interface,
+                             f"{addr['address']}/{addr.get('maskLen', 32)}", "IPv4"])
+
+        # --- IPv6 addresses ---
+        for interface, info in ipv6.get("interfaces", {}).items():
+            for addr in info.get("addresses", []):
+                prefixlen = addr.get("subnet", "/128").rsplit("/", 1)[-1]
+                rows.append([dev["hostname"], dev["host"], interface, f"{addr['address']}/{prefixlen}", "IPv6"])
+
+        # --- Optional: capture Loopback interfaces ---
+        for interface in descriptions.get("interfaceDescriptions", {}):
+            if interface.startswith("Loopback"):
+                rows.append([dev["hostname"], dev["host"], interface, "Loopback", "N/A"])
+
+        print(f"✅ Finished collecting IPs for {dev['hostname']} ({dev['host']})")
+        return rows
+
+    except Exception as e:
+        print(f"❌ eAPI collection failed for {dev['hostname']} ({dev['host']}): {e}")
+        return None
+
+
+# ------------------------------------------------------------
+# Incremental mode helpers
+# ------------------------------------------------------------
+def fingerprint_devices(devices, community=SNMP_COMMUNITY):
+    """
+    Cheap change check over SNMP (no SSH login): hash of ifTableLastChange and
+    the address -> ifIndex tables. Returns {host: fingerprint or None}.
+    """
+    engine = snmp_poller.SNMPEngine()
+
+    async def fingerprint(host):
+        try:
+            last_change = await engine.get(host, community, [IF_TABLE_LAST_CHANGE])
+            walks = await asyncio.gather(*(engine.bulk_walk(host, community, oid) for oid in FINGERPRINT_WALKS))
+        except (snmp_poller.SNMPError, OSError):
+            return None
+        if not any(walks):
+            return None  # Nothing to compare against; always re-collect
+        return hashlib.sha256(repr((last_change, walks)).encode()).hexdigest()
+
+    async def run():
+        try:
+            return await asyncio.gather(*(fingerprint(dev["host"]) for dev in devices))
+        finally:
+            engine.close()
+
+    return dict(zip((dev["host"] for dev in devices), asyncio.run(run())))
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_FILE)
+
+
+def load_existing_rows():
+    """Rows of the current OUTPUT_FILE grouped by device IP."""
+    rows = {}
+    try:
+        with open(OUTPUT_FILE, newline="") as csvfile:
+            reader = csv.reader(csvfile)
+            next(reader, None)  # Skip header
+            for row in reader:
+                if len(row) == len(HEADER):
+                    rows.setdefault(row[1], []).append(row)
+    except FileNotFoundError:
+        pass
+    return rows
+
+
+def load_into_store(rows):
+    """Replace the contents of the IPAM database with rows."""
+    try:
+        store = ipam_store.IPAMStore(IPAM_DB)
+        try:
+            count = store.bulk_load(rows)
+        finally:
+            store.close()
+        print(f"🗄️  {count} rows loaded into IPAM store {IPAM_DB}")
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not update IPAM store {IPAM_DB}: {e}")
+
+
+# ------------------------------------------------------------
+# Main logic
+# ------------------------------------------------------------
+def collect_ipam(pool=None, incremental=False, max_workers=MAX_WORKERS, transport="ssh"):
+    """
+    SSH into each device and collect IP address information (optionally via a shared ssh_pool,
+    or over eAPI with transport="eapi").
+    In incremental mode only devices whose SNMP fingerprint changed since the
+    last incremental run are logged into; other devices keep their existing rows.
+    """
     devices = read_device_passwords()
+    existing = {}
+    state = {}
+
+    if incremental:
+        existing = load_existing_rows()
+        state = load_state()
+        fingerprints = fingerprint_devices(devices)
+        todo = [dev for dev in devices
+                if fingerprints[dev["host"]] is None
+                or fingerprints[dev["host"]] != state.get(dev["host"])
+                or dev["host"] not in existing]
+        print(f"🔍 {len(todo)} of {len(devices)} devices changed since the last run")
+    else:
+        todo = devices
+        # A full refresh invalidates fingerprints taken against older rows
+        if os.path.exists(STATE_FILE):
+            os.remove(STATE_FILE)
 
+    if transport == "eapi":
+        collect = collect_device_rows_eapi
+    else:
+        def collect(dev):
+            return collect_device_rows(dev, pool)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        collected = dict(zip((dev["host"] for dev in todo),
+                             executor.map(collect, todo)))
+
+    all_rows = []
     with open(OUTPUT_FILE, mode="w", newline="") as csvfile:
         csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(["Hostname", "Device", "Interface", "IP Address", "IP Version"])
-
+        csv_writer.writerow(HEADER)
         for dev in devices:
-            device = {
-                "device_type": "arista_eos",  # Adjust as needed
-                "host": dev["host"],
-                "username": dev["username"],
-                "password": dev["password"],
-            }
-
-            print(f"🔗 Connecting to {dev['hostname']} ({dev['host']})...")
-            try:
-                connection = ConnectHandler(**device)
-
-                # --- IPv4 addresses ---
-                ipv4_output = connection.send_command("show ip interface brief")
-                lines = ipv4_output.splitlines()
-                for line in lines[1:]:  # Skip header
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        interface = parts[0]
-                        ip_address = parts[1]
-                        if ip_address.lower() != "unassigned":
-                            csv_writer.writerow([dev["hostname"], dev["host"], interface, ip_address, "IPv4"])
-
-                # --- IPv6 addresses ---
-                ipv6_output = connection.send_command("show ipv6 interface brief")
-                lines = ipv6_output.splitlines()
-                for line in lines[1:]:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        interface = parts[0]
-                        ip_address = parts[1]
-                        if ip_address.lower() != "unassigned":
-                            csv_writer.writerow([dev["hostname"], dev["host"], interface, ip_address, "IPv6"])
-
-                # --- Optional: capture Loopback interfaces ---
-                loop_output = connection.send_command("show interfaces description | include Loopback")
-                for line in loop_output.splitlines():
-                    parts = line.split()
-                    if parts:
-                        interface = parts[0]
-                        csv_writer.writerow([dev["hostname"], dev["host"], interface, "Loopback", "N/A"])
-
-                connection.disconnect()
-                print(f"✅ Finished collecting IPs for {dev['hostname']} ({dev['host']})")
-
-            except Exception as e:
-                print(f"❌ Failed to connect to {dev['hostname']} ({dev['host']}): {e}")
-
-    print(f"\n📄 IPAM data saved to {OUTPUT_FILE}")
+            rows = collected.get(dev["host"])
+            if rows is None:
+                rows = existing.get(dev["host"], [])  # Unchanged or failed: keep what we had
+            for row in rows:
+                csv_writer.writerow(row)
+            all_rows.extend(rows)
+    load_into_store(all_rows)
+
+    if incremental:
+        hosts = {dev["host"] for dev in devices}
+        state = {host: fp for host, fp in state.items() if host in hosts}
+        for dev in todo:
+            if collected[dev["host"]] is not None and fingerprints[dev["host"]] is not None:
+                state[dev["host"]] = fingerprints[dev["host"]]
+            else:
+                state.pop(dev["host"], None)
+        save_state(state)
+
+    print(f"\n📄 IPAM data saved to {OUTPUT_FILE} ({len(collected)} devices collected)")
 
 
 if __name__ == "__main__":
-    collect_ipam()
+    parser = argparse.ArgumentParser(description="Collect interface addresses from every device into dynamic_ipam.csv")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-collect devices whose SNMP interface fingerprint changed")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Devices collected concurrently (default {MAX_WORKERS})")
+    parser.add_argument("--eapi", action="store_true", help="Collect over eAPI instead of SSH")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.recording(args.metrics, args.metrics_port):
+        collect_ipam(incremental=args.incremental, max_workers=args.workers,
+                     transport="eapi" if args.eapi else "ssh")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+import argparse
+import base64
+import http.client
+import itertools
+import json
+import ssl
+import threading
+
+try:
+    from . import instrumentation
+except ImportError:
+    import instrumentation
+
+# Arista eAPI (management api http-commands) endpoint
+EAPI_PATH = "/command-api"
+DEFAULT_TRANSPORT = "https"
+DEFAULT_TIMEOUT = 30
+MAX_IDLE_PER_HOST = 4  # Idle keep-alive connections kept per device
+READ_ONLY = ("show ", "enable", "ping ", "traceroute ")  # Batches made only of these are safe to send twice
+
+
+class EAPIError(Exception):
+    """JSON-RPC error returned by the device (bad command, authorization, ...)."""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(f"eAPI error {code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+# ------------------------------------------------------------
+# Keep-alive connection pool
+# ------------------------------------------------------------
+class HTTPConnectionPool:
+    """Idle http.client connections per (transport, host, port), reused across requests and threads."""
+
+    def __init__(self, max_idle_per_host=MAX_IDLE_PER_HOST, timeout=DEFAULT_TIMEOUT, verify=False):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._context = ssl.create_default_context() if verify else ssl._create_unverified_context()
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, transport, host, port):
+        """(connection, reused) for the endpoint; reused connections may have been closed by the peer."""
+        key = (transport, host, port)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop(), True
+            self.created += 1
+        if transport == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout, context=self._context), False
+        return http.client.HTTPConnection(host, port, timeout=self.timeout), False
+
+    def release(self, transport, host, port, conn):
+        key = (transport, host, port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {"created": self.created, "reused": self.reused,
+                    "idle": sum(len(c) for c in self._idle.values())}
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide HTTPConnectionPool shared by every EAPIClient that is not given one."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = HTTPConnectionPool()
+        return _default_pool
+
+
+# ------------------------------------------------------------
+# Client
+# ------------------------------------------------------------
+class EAPIClient:
+    """
+    JSON-RPC runCmds client for one device. Several commands go to the
+    device in a single request and come back as a list of results (dicts
+    for format='json', {'output': text} for format='text').
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, host, username, password, transport=DEFAULT_TRANSPORT, port=None, pool=None):
+        self.host = host
+        self.transport = transport
+        self.port = port or (443 if transport == "https" else 80)
+        self.pool = pool or get_pool()
+        token = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self._headers = {"Content-Type": "application/json", "Authorization": f"Basic {token}",
+                         "Connection": "keep-alive"}
+
+    def _post(self, body, read_only=False):
+        """
+        POST body and return the decoded reply. A failure on a reused
+        keep-alive connection is retried once on a new one when the request
+        was never sent, or at any point for read_only batches: a config batch
+        the peer may already have applied is not sent again.
+        """
+        for attempt in (1, 2):
+            conn, reused = self.pool.acquire(self.transport, self.host, self.port)
+            sent = False
+            try:
+                conn.request("POST", EAPI_PATH, body=body, headers=self._headers)
+                sent = True
+                resp = conn.getresponse()
+                data = resp.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                conn.close()
+                if reused and attempt == 1 and (read_only or not sent):
+                    continue  # Peer closed an idle keep-alive connection: retry on a new one
+                raise ConnectionError(f"eAPI request to {self.host} failed: {e}") from e
+            except OSError:
+                conn.close()
+                raise
+            if resp.status != 200:
+                conn.close()
+                raise ConnectionError(f"eAPI request to {self.host} failed: HTTP {resp.status} {resp.reason}")
+            if resp.will_close:
+                conn.close()
+            else:
+                self.pool.release(self.transport, self.host, self.port, conn)
+            return json.loads(data)
+
+    def run_cmds(self, cmds, format="json", enable=False):
+        """
+        Run cmds in one runCmds request. Returns one result per command (the
+        'enable' added by enable=True is stripped). Raises EAPIError if any
+        command fails; the device stops at the first failing command.
+        """
+        cmds = (["enable"] if enable else []) + list(cmds)
+        request = {"jsonrpc": "2.0", "method": "runCmds", "id": next(self._ids),
+                   "params": {"version": 1, "cmds": cmds, "format": format}}
+        with instrumentation.span("eapi", device=self.host, command="; ".join(cmds)):
+            reply = self._post(json.dumps(request).encode(),
+                               read_only=all(str(cmd).startswith(READ_ONLY) for cmd in cmds))
+        if "error" in reply:
+            error = reply["error"]
+            raise EAPIError(error.get("code"), error.get("message"), error.get("data"))
+        results = reply["result"]
+        return results[1:] if enable else results
+
+    def run(self, cmd, format="json"):
+        return self.run_cmds([cmd], format)[0]
+
+    def run_text(self, cmds):
+        """Plain CLI output of each command, batched."""
+        return [r.get("output", "") for r in self.run_cmds(cmds, format="text")]
+
+
+class EAPISession:
+    """
+    Netmiko-style adapter (send_command / enable / find_prompt) over an
+    EAPIClient, so functions written against an SSH connection run unchanged
+    on eAPI.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def send_command(self, command, use_textfsm=False, **kwargs):
+        return self.client.run_text([command])[0]
+
+    def send_commands(self, commands):
+        return self.client.run_text(commands)
+
+    def enable(self):
+        pass  # eAPI requests run with the user's privilege level
+
+    def find_prompt(self):
+        hostname = self.client.run("show hostname").get("hostname", self.client.host)
+        return f"{hostname}#"
+
+    def disconnect(self):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run show commands over Arista eAPI in one batch")
+    parser.add_argument("host")
+    parser.add_argument("commands", nargs="+")
+    parser.add_argument("-u", "--username", default="admin")
+    parser.add_argument("-p", "--password", default="")
+    parser.add_argument("--text", action="store_true", help="Return CLI text instead of JSON")
+    parser.add_argument("--http", action="store_true", help="Use plain HTTP instead of HTTPS")
+    args = parser.parse_args()
+
+    client = EAPIClient(args.host, args.username, args.password, transport="http" if args.http else "https")
+    results = client.run_cmds(args.commands, format="text" if args.text else "json")
+    for cmd, result in zip(args.commands, results):
+        print(f"=== {cmd} ===")
+        print(result.get("output", "") if args.text else json.dumps(result, indent=2))
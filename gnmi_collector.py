@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+
+import grpc
+import yaml
+from pygnmi.spec.v080 import gnmi_pb2, gnmi_pb2_grpc
+
+try:
+    from . import cpu_monitor
+except ImportError:
+    import cpu_monitor
+
+# ------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------
+CONFIG_FILE = "/home/student/lab1/pythonscripts/grpcclient.yaml"
+DEFAULT_SAMPLE_INTERVAL = "20s"
+RECONNECT_MIN = 1      # Seconds before the first reconnect attempt
+RECONNECT_MAX = 60     # Cap for the exponential reconnect backoff
+REPORT_INTERVAL = 20   # Seconds between aggregate reports in CLI mode
+
+CPU_SUFFIX = "/cpu/utilization/state/instant"
+OPER_STATUS_SUFFIX = "/state/oper-status"
+
+
+# ------------------------------------------------------------
+# YAML config helpers
+# ------------------------------------------------------------
+def load_config(path=CONFIG_FILE):
+    """Read a gnmic-style YAML file (username, password, insecure, targets, subscriptions)."""
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    config.setdefault("targets", {})
+    config["subscriptions"] = config.get("subscriptions") or {}
+    return config
+
+
+def parse_interval(value):
+    """'20s', '500ms', '1m' or a number of seconds -> nanoseconds"""
+    if isinstance(value, (int, float)):
+        return int(value * 1e9)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(ns|us|ms|s|m|h)?\s*", str(value))
+    if not match:
+        raise ValueError(f"invalid interval: {value!r}")
+    scale = {"ns": 1, "us": 1e3, "ms": 1e6, "s": 1e9, "m": 60e9, "h": 3600e9}[match.group(2) or "s"]
+    return int(float(match.group(1)) * scale)
+
+
+_PATH_ELEM = re.compile(r"([^/\[]+)((?:\[[^\]]*\])*)")
+_PATH_KEY = re.compile(r"\[([^=\]]+)=([^\]]*)\]")
+
+
+def parse_path(path):
+    """'interfaces/interface[name=Ethernet1]/state' -> gnmi_pb2.Path"""
+    elems = []
+    for name, keys in _PATH_ELEM.findall(path.strip("/")):
+        elems.append(gnmi_pb2.PathElem(name=name, key=dict(_PATH_KEY.findall(keys))))
+    return gnmi_pb2.Path(elem=elems)
+
+
+def path_to_str(prefix, path):
+    """Join a notification prefix and update path into '/a/b[k=v]/c'."""
+    parts = []
+    for source in (prefix, path):
+        for elem in source.elem:
+            keys = "".join(f"[{k}={v}]" for k, v in sorted(elem.key.items()))
+            parts.append(elem.name + keys)
+    return sys.intern("/" + "/".join(parts))
+
+
+def decode_value(typed):
+    """gnmi_pb2.TypedValue -> Python value"""
+    kind = typed.WhichOneof("value")
+    if kind in ("json_val", "json_ietf_val"):
+        return json.loads(getattr(typed, kind))
+    if kind == "decimal_val":
+        return typed.decimal_val.digits / (10 ** typed.decimal_val.precision)
+    if kind == "leaflist_val":
+        return [decode_value(v) for v in typed.leaflist_val.element]
+    if kind is None:
+        return None
+    return getattr(typed, kind)
+
+
+def build_subscribe_request(config):
+    """One STREAM SubscriptionList with a SAMPLE subscription per configured path."""
+    subscriptions = []
+    for sub in config["subscriptions"].values():
+        interval = parse_interval(sub.get("sample-interval", DEFAULT_SAMPLE_INTERVAL))
+        for path in sub.get("paths", []):
+            subscriptions.append(gnmi_pb2.Subscription(
+                path=parse_path(path), mode=gnmi_pb2.SubscriptionMode.SAMPLE, sample_interval=interval))
+    return gnmi_pb2.SubscribeRequest(subscribe=gnmi_pb2.SubscriptionList(
+        subscription=subscriptions,
+        mode=gnmi_pb2.SubscriptionList.STREAM,
+        encoding=gnmi_pb2.Encoding.Value(config.get("encoding", "JSON").upper().replace("-", "_")),
+    ))
+
+
+# ------------------------------------------------------------
+# In-memory store
+# ------------------------------------------------------------
+class TelemetryStore:
+    """
+    Latest value of every path per target.
+    Path strings are interned and each leaf is a (timestamp ns, value) tuple,
+    so memory is proportional to the number of distinct leaves, not updates.
+    """
+
+    def __init__(self):
+        self._targets = {}  # target -> {path: (timestamp, value)}
+        self._lock = threading.Lock()
+        self.updates = 0
+
+    def update(self, target, path, timestamp, value):
+        with self._lock:
+            self._targets.setdefault(target, {})[path] = (timestamp, value)
+            self.updates += 1
+
+    def delete(self, target, path):
+        with self._lock:
+            leaves = self._targets.get(target, {})
+            for key in [p for p in leaves if p == path or p.startswith(path + "/")]:
+                del leaves[key]
+
+    def get(self, target, path):
+        with self._lock:
+            return self._targets.get(target, {}).get(path)
+
+    def matching(self, suffix):
+        """{target: [value, ...]} for every leaf whose path ends with suffix."""
+        with self._lock:
+            return {
+                target: [value for path, (_, value) in leaves.items() if path.endswith(suffix)]
+                for target, leaves in self._targets.items()
+            }
+
+    def cpu_by_target(self):
+        """{target: [per-CPU utilisation, ...]} from the components/component/cpu subscription."""
+        return {t: [v for v in values if isinstance(v, (int, float))]
+                for t, values in self.matching(CPU_SUFFIX).items() if values}
+
+    def oper_status_by_target(self):
+        """{target: {"UP": n, "DOWN": n, ...}} from the interface oper-status subscription."""
+        summary = {}
+        for target, values in self.matching(OPER_STATUS_SUFFIX).items():
+            counts = {}
+            for value in values:
+                counts[str(value)] = counts.get(str(value), 0) + 1
+            if counts:
+                summary[target] = counts
+        return summary
+
+    def stats(self):
+        with self._lock:
+            return {"targets": len(self._targets),
+                    "leaves": sum(len(leaves) for leaves in self._targets.values()),
+                    "updates": self.updates}
+
+
+# ------------------------------------------------------------
+# Subscribe client
+# ------------------------------------------------------------
+class GNMICollector:
+    """
+    Keeps one long-lived Subscribe stream per target on a single asyncio
+    loop and writes every update into a TelemetryStore. Streams reconnect
+    with exponential backoff.
+    """
+
+    def __init__(self, config, store=None):
+        self.config = config
+        self.store = store or TelemetryStore()
+        self.request = build_subscribe_request(config)
+        self.status = {name: "connecting" for name in config["targets"]}
+        self._stop = None
+
+    def _metadata(self):
+        if self.config.get("username"):
+            return (("username", str(self.config["username"])), ("password", str(self.config.get("password", ""))))
+        return None
+
+    def _channel(self, address):
+        if self.config.get("insecure", False):
+            return grpc.aio.insecure_channel(address)
+        return grpc.aio.secure_channel(address, grpc.ssl_channel_credentials())
+
+    async def _requests(self):
+        yield self.request
+        await self._stop.wait()  # Keep our side of the stream open until stopped
+
+    def handle(self, target, response):
+        """Apply one SubscribeResponse to the store."""
+        if response.HasField("sync_response"):
+            self.status[target] = "synced"
+            return
+        notification = response.update
+        for update in notification.update:
+            self.store.update(target, path_to_str(notification.prefix, update.path),
+                              notification.timestamp, decode_value(update.val))
+        for path in notification.delete:
+            self.store.delete(target, path_to_str(notification.prefix, path))
+
+    async def stream_target(self, target, address):
+        backoff = RECONNECT_MIN
+        while not self._stop.is_set():
+            try:
+                async with self._channel(address) as channel:
+                    call = gnmi_pb2_grpc.gNMIStub(channel).Subscribe(self._requests(), metadata=self._metadata())
+                    self.status[target] = "streaming"
+                    async for response in call:
+                        backoff = RECONNECT_MIN
+                        self.handle(target, response)
+            except grpc.aio.AioRpcError as e:
+                self.status[target] = f"error: {e.code().name}"
+            except Exception as e:  # Bad update, decode failure, OSError: reconnect rather than stop for good
+                self.status[target] = f"error: {type(e).__name__}"
+                print(f"❌ {target}: stream failed, reconnecting in {backoff}s: {e}")
+            if self._stop.is_set():
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX)
+        self.status[target] = "stopped"
+
+    async def run(self, duration=None):
+        """Stream from every target until stop() is called or duration seconds pass."""
+        self._stop = asyncio.Event()
+        tasks = [asyncio.create_task(self.stream_target(name, target["address"]))
+                 for name, target in self.config["targets"].items()]
+        try:
+            if duration is None:
+                await self._stop.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), duration)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._stop.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+async def report_loop(collector, cpu_store, interval):
+    """Periodically print aggregates and feed CPU samples into the cpu_monitor store."""
+    while True:
+        await asyncio.sleep(interval)
+        now = time.time()
+        for target, cores in collector.store.cpu_by_target().items():
+            cpu_store.record(target, now, sum(cores) / len(cores), cores)
+        stats = collector.store.stats()
+        streaming = sum(1 for s in collector.status.values() if s in ("streaming", "synced"))
+        print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {streaming}/{len(collector.status)} streams up, "
+              f"{stats['leaves']} leaves, {stats['updates']} updates")
+        for target, counts in collector.store.oper_status_by_target().items():
+            print(f"  {target}: " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+
+
+async def main(config_files, interval, port):
+    config = load_config(config_files[0])
+    for extra in config_files[1:]:
+        more = load_config(extra)
+        config["subscriptions"].update(more["subscriptions"])
+        config["targets"].update(more["targets"])
+
+    collector = GNMICollector(config)
+    cpu_store = cpu_monitor.CPUStore(cpu_monitor.capacity_for(cpu_monitor.WINDOWS, interval))
+    server = cpu_monitor.start_api(cpu_store, port=port)
+    print(f"📡 Streaming from {len(config['targets'])} targets, CPU stats on "
+          f"http://{cpu_monitor.API_HOST}:{server.server_address[1]}/stats")
+    reporter = asyncio.create_task(report_loop(collector, cpu_store, interval))
+    try:
+        await collector.run()
+    finally:
+        reporter.cancel()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="gNMI streaming telemetry collector")
+    parser.add_argument("config", nargs="*", default=[CONFIG_FILE],
+                        help="gnmic-style YAML files (targets and subscriptions are merged)")
+    parser.add_argument("--interval", type=float, default=REPORT_INTERVAL,
+                        help=f"Seconds between aggregate reports (default {REPORT_INTERVAL})")
+    parser.add_argument("--port", type=int, default=cpu_monitor.API_PORT,
+                        help=f"CPU stats API port (default {cpu_monitor.API_PORT})")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.config, args.interval, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Collector stopped")
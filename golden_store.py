@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+GOLDEN_CONFIG_FOLDER = "/home/student/lab1/pythonscripts/netapp/golden_configs"
+INDEX_NAME = "index.db"
+OBJECTS_DIR = "objects"
+
+# Files written by the old create_golden_config(): <hostname>_golden_<YYYYmmdd_HHMMSS>.cfg
+LEGACY_FILE = re.compile(r"^(?P<hostname>.+)_golden_(?P<stamp>\d{8}_\d{6})\.cfg$")
+
+
+class GoldenStore:
+    """
+    Golden configs stored once per distinct content (sha256, zlib-compressed
+    under objects/) with an SQLite index of versions per device. Saving a
+    config identical to the device's latest version adds nothing; lookups of
+    the latest or a given version are a single indexed query.
+    """
+
+    def __init__(self, folder=GOLDEN_CONFIG_FOLDER):
+        self.folder = folder
+        os.makedirs(os.path.join(folder, OBJECTS_DIR), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(folder, INDEX_NAME), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS golden_versions (
+                                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                    hostname TEXT NOT NULL COLLATE NOCASE,
+                                    digest TEXT NOT NULL,
+                                    created_at TEXT NOT NULL,
+                                    size INTEGER NOT NULL
+                                )''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS golden_host ON golden_versions (hostname, id)")
+
+    def _object_path(self, digest):
+        return os.path.join(self.folder, OBJECTS_DIR, digest[:2], digest + ".z")
+
+    def _write_object(self, digest, data):
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(data, 9))
+        os.replace(tmp, path)
+
+    def read_object(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode()
+
+    def save(self, hostname, config, created_at=None):
+        """
+        Store config as hostname's newest golden version.
+        Returns (version, created); created is False when it matches the latest version.
+        """
+        data = config.encode()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            latest = self._latest(hostname)
+            if latest and latest["digest"] == digest:
+                return latest, False
+            self._write_object(digest, data)
+            with self.conn:
+                cursor = self.conn.execute(
+                    "INSERT INTO golden_versions (hostname, digest, created_at, size) VALUES (?, ?, ?, ?)",
+                    (hostname, digest, created_at or datetime.now().isoformat(timespec="seconds"), len(data)))
+            return self._version(cursor.lastrowid), True
+
+    def _latest(self, hostname):
+        row = self.conn.execute("SELECT * FROM golden_versions WHERE hostname = ? ORDER BY id DESC LIMIT 1",
+                                (hostname,)).fetchone()
+        return dict(row) if row else None
+
+    def _version(self, version_id):
+        row = self.conn.execute("SELECT * FROM golden_versions WHERE id = ?", (version_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self, hostname):
+        """Newest version record of hostname (exact, case-insensitive match), or None."""
+        with self._lock:
+            return self._latest(hostname)
+
+    def versions(self, hostname):
+        """Every version of hostname, newest first."""
+        with self._lock:
+            cursor = self.conn.execute("SELECT * FROM golden_versions WHERE hostname = ? ORDER BY id DESC",
+                                       (hostname,))
+            return [dict(r) for r in cursor]
+
+    def hostnames(self):
+        """Every device with at least one version."""
+        with self._lock:
+            return [r[0] for r in self.conn.execute(
+                "SELECT DISTINCT hostname FROM golden_versions ORDER BY hostname")]
+
+    def get(self, hostname, version_id=None):
+        """(version, config text) for the latest or a given version of hostname, or (None, None)."""
+        with self._lock:
+            if version_id is None:
+                version = self._latest(hostname)
+            else:
+                version = self._version(version_id)
+                if version and version["hostname"].lower() != hostname.lower():
+                    version = None
+        if version is None:
+            return None, None
+        return version, self.read_object(version["digest"])
+
+    def stats(self):
+        with self._lock:
+            versions, devices, raw = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT hostname), COALESCE(SUM(size), 0) FROM golden_versions").fetchone()
+            digests = [r[0] for r in self.conn.execute("SELECT DISTINCT digest FROM golden_versions")]
+        stored = sum(os.path.getsize(self._object_path(d)) for d in digests if os.path.exists(self._object_path(d)))
+        return {"devices": devices, "versions": versions, "objects": len(digests),
+                "raw_bytes": raw, "stored_bytes": stored}
+
+    def import_legacy(self, folder=None, remove=False):
+        """
+        Import old <hostname>_golden_<timestamp>.cfg files (oldest first),
+        skipping ones already imported; remove=True deletes each file once
+        stored. Returns the number of files imported.
+        """
+        folder = folder or self.folder
+        imported = 0
+        found = []
+        for name in os.listdir(folder):
+            match = LEGACY_FILE.match(name)
+            if match:
+                stamp = datetime.strptime(match.group("stamp"), "%Y%m%d_%H%M%S")
+                found.append((stamp, match.group("hostname"), name))
+        for stamp, hostname, name in sorted(found):
+            path = os.path.join(folder, name)
+            created_at = stamp.isoformat(timespec="seconds")
+            with self._lock:
+                seen = self.conn.execute("SELECT 1 FROM golden_versions WHERE hostname = ? AND created_at = ?",
+                                         (hostname, created_at)).fetchone()
+            if not seen:
+                with open(path) as f:
+                    self.save(hostname, f.read(), created_at=created_at)
+                imported += 1
+            if remove:
+                os.remove(path)
+        return imported
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Golden config repository")
+    parser.add_argument("--folder", default=GOLDEN_CONFIG_FOLDER)
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Import legacy <hostname>_golden_<timestamp>.cfg files")
+    migrate.add_argument("--remove", action="store_true", help="Delete each legacy file once imported")
+    sub.add_parser("stats", help="Show repository size")
+    versions = sub.add_parser("versions", help="List the versions of a device")
+    versions.add_argument("hostname")
+    show = sub.add_parser("show", help="Print a golden config")
+    show.add_argument("hostname")
+    show.add_argument("--version", type=int)
+    args = parser.parse_args()
+
+    store = GoldenStore(args.folder)
+    if args.command == "migrate":
+        print(f"📦 Imported {store.import_legacy(remove=args.remove)} legacy golden config files")
+    elif args.command == "stats":
+        stats = store.stats()
+        print(f"📊 {stats['devices']} devices, {stats['versions']} versions, {stats['objects']} objects, "
+              f"{stats['raw_bytes']} bytes of config stored in {stats['stored_bytes']} bytes")
+    elif args.command == "versions":
+        for v in store.versions(args.hostname):
+            print(f"{v['id']:>6}  {v['created_at']}  {v['digest'][:12]}  {v['size']} bytes")
+    elif args.command == "show":
+        version, config = store.get(args.hostname, args.version)
+        print(config if config is not None else f"❌ No golden config for {args.hostname}")
+    store.close()
@@ -1,5 +1,7 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from ncclient import manager
-from lxml import etree
 
 devices = [
     {'host': '10.0.100.9', 'port': 830, 'username': 'admin', 'password': 'pranav', 'name': 'r1'},
@@ -10,9 +12,10 @@ devices = [
     {'host': '10.0.100.7', 'port': 830, 'username': 'admin', 'password': 'pranav', 'name': 's2'},
     {'host': '10.0.100.2', 'port': 830, 'username': 'admin', 'password': 'pranav', 'name': 's3'},
     {'host': '10.0.100.5', 'port': 830, 'username': 'admin', 'password': 'pranav', 'name': 's4'},
-    
 ]
 
+MAX_WORKERS = 8  # Devices collected at the same time
+
 # Corrected filters using proper YANG namespaces and syntax
 # This filter is for Arista EOS
 CPU_FILTER = """
@@ -63,7 +66,77 @@ INTERFACE_STATUS_FILTER = """
 </filter>
 """
 
-def get_netconf_data(device, filter_xml):
+FILTERS = {
+    'cpu': CPU_FILTER,
+    'storage': STORAGE_FILTER,
+    'interfaces': INTERFACE_STATUS_FILTER,
+}
+
+
+def _text(element, path):
+    """Text of the first descendant matching path (namespace-agnostic), or None."""
+    found = element.find(path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def _number(value):
+    try:
+        return float(value) if '.' in value else int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def parse_cpu(data_ele):
+    """openconfig-system cpus -> [{'index', 'instant', 'avg', 'min', 'max'}]"""
+    records = []
+    for cpu in data_ele.iter('{*}cpu'):
+        total = cpu.find('{*}state/{*}total')
+        if total is None:
+            continue
+        record = {'index': _text(cpu, '{*}index')}
+        for field in ('instant', 'avg', 'min', 'max'):
+            record[field] = _number(_text(total, '{*}' + field))
+        records.append(record)
+    return records
+
+
+def parse_storage(data_ele):
+    """openconfig-system mount-points -> [{'name', 'size', 'available', 'utilized'}]"""
+    return [
+        {
+            'name': _text(mount, '{*}name'),
+            'size': _number(_text(mount, '{*}state/{*}size')),
+            'available': _number(_text(mount, '{*}state/{*}available')),
+            'utilized': _number(_text(mount, '{*}state/{*}utilized')),
+        }
+        for mount in data_ele.iter('{*}mount-point')
+    ]
+
+
+def parse_interfaces(data_ele):
+    """openconfig-interfaces -> [{'name', 'oper_status'}]"""
+    return [
+        {'name': _text(iface, '{*}name'), 'oper_status': _text(iface, '{*}state/{*}oper-status')}
+        for iface in data_ele.iter('{*}interface')
+    ]
+
+
+PARSERS = {
+    'cpu': parse_cpu,
+    'storage': parse_storage,
+    'interfaces': parse_interfaces,
+}
+
+
+def collect_device(device):
+    """
+    Open one NETCONF session to the device and run every filter over it.
+    Returns a record with parsed cpu/storage/interfaces lists, per-filter
+    errors and the time spent on the device.
+    """
+    start = time.perf_counter()
+    record = {'name': device['name'], 'host': device['host'], 'errors': {}}
+    record.update({section: [] for section in FILTERS})
     try:
         with manager.connect(host=device['host'],
                              port=device['port'],
@@ -71,24 +144,38 @@ def get_netconf_data(device, filter_xml):
                              password=device['password'],
                              hostkey_verify=False,
                              device_params={'name': 'default'}) as m:
-            response = m.get(filter=filter_xml)
-            return etree.tostring(response.data_ele, pretty_print=True).decode()
+            for section, filter_xml in FILTERS.items():
+                try:
+                    record[section] = PARSERS[section](m.get(filter=filter_xml).data_ele)
+                except Exception as e:
+                    record['errors'][section] = str(e)
     except Exception as e:
-        return f"[{device['name']}] Error: {e}"
+        record['errors']['connect'] = str(e)
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+def collect_all(devices, max_workers=MAX_WORKERS):
+    """Collect every device concurrently; records are returned in input order."""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        return list(pool.map(collect_device, devices))
+
 
 def main():
-    for device in devices:
-        print(f"\n--- CPU Usage for {device['name']} ---")
-        # Assuming Arista EOS namespace for CPU, but this may vary
-        print(get_netconf_data(device, CPU_FILTER))
-        
-        print(f"\n--- Storage Usage for {device['name']} ---")
-        # Assuming Arista EOS namespace for storage, but this may vary
-        print(get_netconf_data(device, STORAGE_FILTER))
-        
-        print(f"\n--- Interface Status for {device['name']} ---")
-        # Using the OpenConfig namespace for interfaces, as seen in the successful r1 output
-        print(get_netconf_data(device, INTERFACE_STATUS_FILTER))
+    start = time.perf_counter()
+    for record in collect_all(devices):
+        print(f"\n--- {record['name']} ({record['host']}) in {record['elapsed']:.2f}s ---")
+        for section, error in record['errors'].items():
+            print(f"  [{section}] Error: {error}")
+
+        for cpu in record['cpu']:
+            print(f"  CPU {cpu['index']}: instant={cpu['instant']} avg={cpu['avg']} max={cpu['max']}")
+        for mount in record['storage']:
+            print(f"  Storage {mount['name']}: size={mount['size']} available={mount['available']} utilized={mount['utilized']}")
+        for iface in record['interfaces']:
+            print(f"  Interface {iface['name']}: {iface['oper_status']}")
+
+    print(f"\nCollected {len(devices)} devices in {time.perf_counter() - start:.2f}s")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    from . import device_health_check
+except ImportError:
+    import device_health_check
+
+TTL = 60          # Seconds a result is served as fresh
+MAX_STALE = 600   # Up to this age a stale result is served while it refreshes in the background
+REFRESH_WORKERS = 4
+
+# Entry states returned by HealthCache.get()
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+JOINED = "joined"  # Shared another caller's run; its live output went to that caller's log
+
+
+def _discard(*args, **kwargs):
+    pass
+
+
+class HealthCache:
+    """
+    Health check results per device with stale-while-revalidate:
+    - younger than ttl: returned as is
+    - up to max_stale: returned immediately, refreshed in the background
+    - older, missing or invalidated: run synchronously (concurrent callers
+      for the same device share one run; only the first sees live output)
+    Only completed checks are cached; failures are retried on the next get.
+    """
+
+    def __init__(self, check=device_health_check.collect_health, ttl=TTL, max_stale=MAX_STALE,
+                 workers=REFRESH_WORKERS):
+        self.check = check
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="health-refresh")
+        self._entries = {}    # key -> (stored monotonic time, result)
+        self._inflight = {}   # key -> Future of the running check
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(hostname):
+        return (hostname or "").strip().lower()
+
+    def _run(self, key, hostname, log, **kwargs):
+        """Run (or join) the check for key. Returns (result, whether this call ran it)."""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result(), False
+        try:
+            result = self.check(hostname, log=log, **kwargs)
+            with self._lock:
+                if result.get("completed"):
+                    self._entries[key] = (time.monotonic(), result)
+            future.set_result(result)
+            return result, True
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get(self, hostname, log=print, **kwargs):
+        """
+        {"result", "age" (seconds), "state" (fresh/stale/miss/joined), "refreshing"} for hostname.
+        log receives the live output when this call runs the check (miss);
+        a call that waited on a check already running gets joined and no
+        output. Extra kwargs (e.g. pool=) are passed to the check.
+        """
+        key = self._key(hostname)
+        with self._lock:
+            entry = self._entries.get(key)
+            refreshing = key in self._inflight
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= self.ttl:
+                return {"result": entry[1], "age": age, "state": FRESH, "refreshing": refreshing}
+            if age <= self.max_stale:
+                if not refreshing:
+                    self._executor.submit(self._refresh, key, hostname, kwargs)
+                return {"result": entry[1], "age": age, "state": STALE, "refreshing": True}
+        result, owner = self._run(key, hostname, log, **kwargs)
+        return {"result": result, "age": 0.0, "state": MISS if owner else JOINED, "refreshing": False}
+
+    def _refresh(self, key, hostname, kwargs):
+        try:
+            self._run(key, hostname, _discard, **kwargs)
+        except Exception:
+            pass  # Keep serving the stale entry; the next get past max_stale runs synchronously
+
+    def peek(self, hostname):
+        """(age, result) of the cached entry without triggering a check, or None."""
+        with self._lock:
+            entry = self._entries.get(self._key(hostname))
+        return (time.monotonic() - entry[0], entry[1]) if entry else None
+
+    def invalidate(self, hostname=None):
+        """Drop one device's cached result, or every result when hostname is None."""
+        with self._lock:
+            if hostname is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(hostname), None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (Prometheus 'le' labels)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC = "netops_span_seconds"
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9106  # Live endpoint for long-running modes (cpu_monitor's stats API is 9105)
+SUMMARY_LIMIT = 10   # Spans listed in the end-of-run summary, by total time
+
+
+# ------------------------------------------------------------
+# Histograms
+# ------------------------------------------------------------
+class Histogram:
+    """Bucketed durations of one span/label combination."""
+
+    __slots__ = ("counts", "count", "errors", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds, error=False):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate from the buckets (linear within the bucket, clamped to the observed min/max)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for n, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = BUCKETS[n - 1] if n else 0.0
+                high = BUCKETS[n] if n < len(BUCKETS) else self.max
+                value = low + (high - low) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+
+class _Noop:
+    """Shared span handed out while instrumentation is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _Noop()
+
+
+class _Span:
+    __slots__ = ("registry", "key", "start")
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry._observe(self.key, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class Registry:
+    """
+    In-process span histograms keyed by span name and labels
+    (device, command, ...). Disabled registries hand out a shared no-op
+    context manager, so instrumented code costs one attribute check.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def span(self, name, **labels):
+        """Context manager timing its block as one observation of name/labels (errors counted too)."""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, (name, tuple(sorted((k, str(v)) for k, v in labels.items()))))
+
+    def observe(self, name, seconds, error=False, **labels):
+        """Record a duration measured elsewhere (e.g. an SNMP poll's latency)."""
+        if self.enabled:
+            self._observe((name, tuple(sorted((k, str(v)) for k, v in labels.items()))), seconds, error)
+
+    def _observe(self, key, seconds, error):
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+        self.started = time.time()
+
+    def snapshot(self):
+        """Every span as a dict: name, labels, count, errors, sum/min/max/mean and p50/p90/p99 (seconds)."""
+        with self._lock:
+            items = [(key, h.count, h.errors, h.total, h.min, h.max, list(h.counts), h.quantile(0.5),
+                      h.quantile(0.9), h.quantile(0.99)) for key, h in self._histograms.items()]
+        spans = []
+        for (name, labels), count, errors, total, low, high, counts, p50, p90, p99 in sorted(items):
+            cumulative, buckets = 0, {}
+            for bound, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                buckets[str(bound)] = cumulative
+            spans.append({"span": name, "labels": dict(labels), "count": count, "errors": errors,
+                          "sum": round(total, 6), "min": low, "max": high,
+                          "mean": round(total / count, 6) if count else None,
+                          "p50": p50, "p90": p90, "p99": p99, "buckets": buckets})
+        return spans
+
+    def to_json(self):
+        return json.dumps({"started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                           "created": datetime.now().isoformat(timespec="seconds"),
+                           "spans": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition: one histogram family plus an error counter."""
+        spans = self.snapshot()
+        out = [f"# HELP {METRIC} Duration of instrumented operations (connect, commands, parsing, ...)",
+               f"# TYPE {METRIC} histogram"]
+        for s in spans:
+            labels = _labels(s["span"], s["labels"])
+            for bound, count in s["buckets"].items():
+                out.append(f'{METRIC}_bucket{{{labels},le="{bound}"}} {count}')
+            out.append(f"{METRIC}_sum{{{labels}}} {s['sum']}")
+            out.append(f"{METRIC}_count{{{labels}}} {s['count']}")
+        out += ["# HELP netops_span_errors_total Instrumented operations that raised",
+                "# TYPE netops_span_errors_total counter"]
+        out += [f"netops_span_errors_total{{{_labels(s['span'], s['labels'])}}} {s['errors']}" for s in spans]
+        return "\n".join(out) + "\n"
+
+    def summary(self, limit=SUMMARY_LIMIT):
+        """Lines for the spans with the most total time, aggregated over labels other than device."""
+        totals = {}
+        for s in self.snapshot():
+            labels = ", ".join(f"{k}={v}" for k, v in s["labels"].items() if k != "device")
+            key = f"{s['span']}" + (f" ({labels})" if labels else "")
+            entry = totals.setdefault(key, {"count": 0, "errors": 0, "sum": 0.0, "max": 0.0})
+            entry["count"] += s["count"]
+            entry["errors"] += s["errors"]
+            entry["sum"] += s["sum"]
+            entry["max"] = max(entry["max"], s["max"] or 0.0)
+        ranked = sorted(totals.items(), key=lambda item: -item[1]["sum"])[:limit]
+        return [f"{key:<50} {e['count']:>6}x {e['sum']:9.3f}s total {e['sum'] / e['count'] * 1000:9.1f} ms avg "
+                f"{e['max'] * 1000:9.1f} ms max" + (f"  ❌ {e['errors']} errors" if e["errors"] else "")
+                for key, e in ranked]
+
+    def write(self, path):
+        """Write JSON to path and Prometheus text next to it (<path without .json>.prom). Returns both paths."""
+        prom_path = (path[:-5] if path.endswith(".json") else path) + ".prom"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        for target, text in ((path, self.to_json()), (prom_path, self.to_prometheus())):
+            with open(target + ".tmp", "w") as f:
+                f.write(text)
+            os.replace(target + ".tmp", target)
+        return path, prom_path
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(name, labels):
+    return ",".join([f'span="{_escape(name)}"'] + [f'{k}="{_escape(v)}"' for k, v in labels.items()])
+
+
+# ------------------------------------------------------------
+# Process-wide registry
+# ------------------------------------------------------------
+REGISTRY = Registry()
+
+
+def enable(registry=REGISTRY):
+    registry.enabled = True
+
+
+def disable(registry=REGISTRY):
+    registry.enabled = False
+
+
+def span(name, **labels):
+    if not REGISTRY.enabled:  # Fast path: no key building while off
+        return _NOOP
+    return REGISTRY.span(name, **labels)
+
+
+def observe(name, seconds, error=False, **labels):
+    if REGISTRY.enabled:
+        REGISTRY.observe(name, seconds, error, **labels)
+
+
+# ------------------------------------------------------------
+# netmiko connections
+# ------------------------------------------------------------
+class TimedConnection:
+    """
+    Wraps a netmiko connection so command methods run in spans tagged with
+    the device. Config sets are timed without their lines (they can carry
+    secrets); anything else passes straight through to the connection.
+    """
+
+    def __init__(self, conn, device, registry=REGISTRY):
+        self._conn = conn
+        self._device = device
+        self._registry = registry
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def send_command(self, command_string, *args, **kwargs):
+        with self._registry.span("command", device=self._device, command=command_string):
+            return self._conn.send_command(command_string, *args, **kwargs)
+
+    def send_command_timing(self, command_string, *args, **kwargs):
+        with self._registry.span("command", device=self._device, command=command_string):
+            return self._conn.send_command_timing(command_string, *args, **kwargs)
+
+    def send_config_set(self, config_commands=None, *args, **kwargs):
+        with self._registry.span("config", device=self._device):
+            return self._conn.send_config_set(config_commands, *args, **kwargs)
+
+    def find_prompt(self, *args, **kwargs):
+        with self._registry.span("find_prompt", device=self._device):
+            return self._conn.find_prompt(*args, **kwargs)
+
+    def enable(self, *args, **kwargs):
+        with self._registry.span("enable", device=self._device):
+            return self._conn.enable(*args, **kwargs)
+
+    def save_config(self, *args, **kwargs):
+        with self._registry.span("save_config", device=self._device):
+            return self._conn.save_config(*args, **kwargs)
+
+
+def instrument_connection(conn, device, registry=REGISTRY):
+    """conn wrapped in a TimedConnection, or conn itself while instrumentation is off."""
+    return TimedConnection(conn, device, registry) if registry.enabled else conn
+
+
+# ------------------------------------------------------------
+# Export: end of run and live endpoint
+# ------------------------------------------------------------
+def serve(port=METRICS_PORT, host=METRICS_HOST, registry=REGISTRY):
+    """
+    Serve the registry from a background thread:
+      GET /metrics        Prometheus text
+      GET /metrics.json   JSON snapshot
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                self._reply(200, registry.to_prometheus(), "text/plain; version=0.0.4")
+            elif self.path == "/metrics.json":
+                self._reply(200, registry.to_json(), "application/json")
+            else:
+                self._reply(404, json.dumps({"error": "not found"}), "application/json")
+
+        def _reply(self, status, body, content_type):
+            payload = body.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-api", daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    """--metrics / --metrics-port options shared by the scripts."""
+    parser.add_argument("--metrics", metavar="FILE.json",
+                        help="Time connect, commands and parsing; write JSON here and Prometheus text to .prom")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help=f"Also serve live metrics on http://{METRICS_HOST}:PORT/metrics")
+
+
+@contextmanager
+def recording(path=None, port=None, registry=REGISTRY, log=print):
+    """
+    Enable instrumentation for the block when path or port is given; on the
+    way out print the slowest spans and write path. Without either, a no-op.
+    """
+    if not path and not port:
+        yield registry
+        return
+    registry.enabled = True
+    server = serve(port, registry=registry) if port else None
+    if server is not None:
+        log(f"📈 Live metrics on http://{METRICS_HOST}:{server.server_address[1]}/metrics")
+    try:
+        yield registry
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        lines = registry.summary()
+        if lines:
+            log("\n⏱️  Slowest operations:")
+            for line in lines:
+                log(f"   {line}")
+        if path:
+            json_path, prom_path = registry.write(path)
+            log(f"📊 Metrics written to {json_path} and {prom_path}")
+        registry.enabled = False
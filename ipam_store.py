@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+import csv
+import ipaddress
+import sqlite3
+import threading
+
+# SQLite file shared with the web app (netapp/db.py keeps its tables in the same file)
+DB_NAME = "/home/student/lab1/pythonscripts/netapp/devices.db"
+
+COLUMNS = ["Hostname", "Device", "Interface", "IP Address", "IP Version"]
+SELECT_COLUMNS = "hostname, device, interface, ip_address, ip_version"
+
+# Sort keys accepted by query() -> ORDER BY expression
+SORT_KEYS = {
+    "hostname": "hostname COLLATE NOCASE",
+    "device": "device",
+    "interface": "interface COLLATE NOCASE",
+    "address": "ip_version, addr_key",
+    "version": "ip_version",
+}
+
+
+def get_db_connection(db_name=DB_NAME):
+    conn = sqlite3.connect(db_name, check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # lets us access columns by name
+    return conn
+
+
+def init_db(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS ipam (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        hostname TEXT NOT NULL,
+                        device TEXT NOT NULL,
+                        interface TEXT NOT NULL,
+                        ip_address TEXT NOT NULL,
+                        ip_version TEXT NOT NULL,
+                        address TEXT,
+                        prefixlen INTEGER,
+                        addr_key TEXT
+                    )''')
+    conn.execute("CREATE INDEX IF NOT EXISTS ipam_addr_key ON ipam (ip_version, addr_key)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ipam_device ON ipam (device)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ipam_hostname ON ipam (hostname COLLATE NOCASE)")
+    conn.commit()
+
+
+def _like_escape(value):
+    """value with LIKE wildcards taken literally (escape character: backslash)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_filter(hostname=None, interface=None, version=None, prefix=None):
+    """
+    WHERE clause and parameters for the IPAM view filters.
+    hostname/interface are case-insensitive substring matches, version is
+    IPv4/IPv6/N/A and prefix keeps addresses inside a network (index range scan).
+    Raises ValueError for an invalid prefix.
+    """
+    clauses, params = [], []
+    if hostname:
+        clauses.append("hostname LIKE ? ESCAPE '\\'")
+        params.append(f"%{_like_escape(hostname)}%")
+    if interface:
+        clauses.append("interface LIKE ? ESCAPE '\\'")
+        params.append(f"%{_like_escape(interface)}%")
+    if version:
+        clauses.append("ip_version = ?")
+        params.append(version)
+    if prefix:
+        network = ipaddress.ip_network(prefix, strict=False)
+        clauses.append("ip_version = ? AND addr_key BETWEEN ? AND ?")
+        params += [f"IPv{network.version}", f"{int(network.network_address):032x}",
+                   f"{int(network.broadcast_address):032x}"]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def parse_row(row):
+    """
+    CSV row -> column dict for the ipam table, or None for rows that claim to
+    be IPv4/IPv6 but carry no address (header/separator lines in old CSVs).
+    """
+    hostname, device, interface, ip_text, version = [str(v).strip() for v in row[:5]]
+    record = {"hostname": hostname, "device": device, "interface": interface,
+              "ip_address": ip_text, "ip_version": version,
+              "address": None, "prefixlen": None, "addr_key": None}
+    if version not in ("IPv4", "IPv6"):
+        return record  # e.g. Loopback marker rows
+    try:
+        iface = ipaddress.ip_interface(ip_text)
+    except ValueError:
+        return None
+    record.update(address=str(iface.ip), prefixlen=iface.network.prefixlen,
+                  addr_key=f"{int(iface.ip):032x}")
+    return record
+
+
+# ------------------------------------------------------------
+# Prefix tree
+# ------------------------------------------------------------
+class _Node:
+    __slots__ = ("children", "hosts", "networks")
+
+    def __init__(self):
+        self.children = [None, None]
+        self.hosts = None      # rows whose address is exactly this /32 or /128
+        self.networks = None   # rows whose connected subnet is this prefix
+
+
+class PrefixTrie:
+    """
+    Binary radix tree over address bits for one IP version.
+    Every lookup walks at most 32 (IPv4) or 128 (IPv6) nodes, independent of
+    how many addresses are stored.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = _Node()
+
+    def _walk(self, value, length, create=False):
+        node = self.root
+        for i in range(length):
+            bit = (value >> (self.bits - 1 - i)) & 1
+            child = node.children[bit]
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[bit] = _Node()
+            node = child
+        return node
+
+    def insert(self, iface, row):
+        host = self._walk(int(iface.ip), self.bits, create=True)
+        if host.hosts is None:
+            host.hosts = []
+        host.hosts.append(row)
+        net = self._walk(int(iface.network.network_address), iface.network.prefixlen, create=True)
+        if net.networks is None:
+            net.networks = []
+        net.networks.append(row)
+
+    def exact(self, ip):
+        node = self._walk(int(ip), self.bits)
+        return list(node.hosts or []) if node else []
+
+    def longest_prefix(self, ip):
+        """(network, rows) of the most specific stored subnet containing ip, or (None, [])."""
+        value = int(ip)
+        node = self.root
+        best = (None, [])
+        for depth in range(self.bits + 1):
+            if node.networks:
+                best = (ipaddress.ip_network((value >> (self.bits - depth) << (self.bits - depth), depth)), node.networks)
+            if depth == self.bits:
+                break
+            node = node.children[(value >> (self.bits - 1 - depth)) & 1]
+            if node is None:
+                break
+        return best[0], list(best[1])
+
+    def contained(self, network):
+        """Rows whose address lies inside network."""
+        node = self._walk(int(network.network_address), network.prefixlen)
+        found = []
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            if node.hosts:
+                found.extend(node.hosts)
+            stack.extend(child for child in reversed(node.children) if child is not None)
+        return found
+
+
+# ------------------------------------------------------------
+# Store
+# ------------------------------------------------------------
+class IPAMStore:
+    """
+    IPAM rows persisted in SQLite with in-memory prefix trees for IPv4 and
+    IPv6. The trees are rebuilt only when the table changes, including
+    changes committed by another process (e.g. a dynamic_ipam.py run).
+    """
+
+    def __init__(self, db_name=DB_NAME):
+        self.db_name = db_name
+        self.conn = get_db_connection(db_name)
+        init_db(self.conn)
+        self._lock = threading.RLock()
+        self._version = None
+        self._tries = None
+
+    def bulk_load(self, rows, replace=True):
+        """Load CSV-style rows (see COLUMNS). Returns the number of rows stored."""
+        records = [r for r in (parse_row(row) for row in rows) if r is not None]
+        with self._lock:
+            with self.conn:
+                if replace:
+                    self.conn.execute("DELETE FROM ipam")
+                self.conn.executemany(
+                    "INSERT INTO ipam (hostname, device, interface, ip_address, ip_version, address, prefixlen, addr_key) "
+                    "VALUES (:hostname, :device, :interface, :ip_address, :ip_version, :address, :prefixlen, :addr_key)",
+                    records)
+            self._tries = None
+        return len(records)
+
+    def load_csv(self, path):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip header
+            return self.bulk_load(row for row in reader if len(row) >= 5)
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM ipam").fetchone()[0]
+
+    def rows(self):
+        """Every row as a dict keyed by the CSV column names."""
+        with self._lock:
+            cursor = self.conn.execute(f"SELECT {SELECT_COLUMNS} FROM ipam ORDER BY id")
+            return [dict(zip(COLUMNS, r)) for r in cursor]
+
+    def query(self, filters=None, sort="hostname", descending=False, limit=100, offset=0):
+        """
+        One page of rows matching filters (see build_filter).
+        Returns (rows, total matching rows).
+        """
+        where, params = build_filter(**(filters or {}))
+        order = ", ".join(f"{key} {'DESC' if descending else 'ASC'}"
+                          for key in SORT_KEYS.get(sort, SORT_KEYS["hostname"]).split(", "))
+        with self._lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM ipam{where}", params).fetchone()[0]
+            cursor = self.conn.execute(
+                f"SELECT {SELECT_COLUMNS} FROM ipam{where} ORDER BY {order}, id LIMIT ? OFFSET ?",
+                params + [limit, offset])
+            return [dict(zip(COLUMNS, r)) for r in cursor], total
+
+    def iter_rows(self, filters=None, batch=1000):
+        """
+        Iterator over matching rows (tuples in COLUMNS order), fetched in
+        batches from a private connection so a long export never holds the
+        shared one. Invalid filters raise ValueError here, not mid-stream.
+        """
+        where, params = build_filter(**(filters or {}))
+
+        def generate():
+            conn = get_db_connection(self.db_name)
+            try:
+                cursor = conn.execute(f"SELECT {SELECT_COLUMNS} FROM ipam{where} ORDER BY id", params)
+                while True:
+                    chunk = cursor.fetchmany(batch)
+                    if not chunk:
+                        return
+                    for row in chunk:
+                        yield tuple(row)
+            finally:
+                conn.close()
+
+        return generate()
+
+    def _index(self):
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._tries is None or version != self._version:
+                tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+                cursor = self.conn.execute(f"SELECT {SELECT_COLUMNS} FROM ipam WHERE address IS NOT NULL")
+                for r in cursor:
+                    row = dict(zip(COLUMNS, r))
+                    iface = ipaddress.ip_interface(row["IP Address"])
+                    tries[iface.version].insert(iface, row)
+                self._tries, self._version = tries, version
+            return self._tries
+
+    def owner(self, ip):
+        """Rows whose interface address is exactly ip."""
+        ip = ipaddress.ip_address(ip)
+        return self._index()[ip.version].exact(ip)
+
+    def longest_prefix(self, ip):
+        """(subnet, rows) for the most specific connected subnet containing ip."""
+        ip = ipaddress.ip_address(ip)
+        return self._index()[ip.version].longest_prefix(ip)
+
+    def contained(self, prefix):
+        """Rows whose address falls inside prefix (e.g. '10.0.10.0/24')."""
+        network = ipaddress.ip_network(prefix, strict=False)
+        return self._index()[network.version].contained(network)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+import itertools
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8      # Jobs running at the same time
+KEEP_FINISHED = 300  # Seconds a finished job's output stays available
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """
+    One background task and the lines it has logged so far.
+    Readers follow the output with stream(), which blocks until new lines
+    arrive or the job finishes.
+    """
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.result = None
+        self.created = time.time()
+        self.finished = None
+        self.lines = []
+        self._changed = threading.Condition()
+
+    def log(self, message=""):
+        """Append output; multi-line messages become several lines. Usable as a print() replacement."""
+        with self._changed:
+            self.lines.extend(str(message).splitlines() or [""])
+            self._changed.notify_all()
+
+    def _finish(self, status, result=None):
+        with self._changed:
+            self.status = status
+            self.result = result
+            self.finished = time.time()
+            self._changed.notify_all()
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED)
+
+    def stream(self, start=0, timeout=None):
+        """
+        Yield output lines from index start on as they are logged, until the
+        job finishes. With timeout, yield None after that many idle seconds
+        (lets callers send keep-alives).
+        """
+        position = start
+        while True:
+            with self._changed:
+                if position >= len(self.lines) and not self.done:
+                    self._changed.wait(timeout)
+                new = self.lines[position:]
+                finished = self.done
+            position += len(new)
+            yield from new
+            if not new:
+                if finished:
+                    return
+                yield None
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "status": self.status, "result": self.result,
+                "created": self.created, "finished": self.finished, "lines": len(self.lines)}
+
+
+class JobRunner:
+    """Runs jobs on a thread pool, keeping finished ones for KEEP_FINISHED seconds."""
+
+    def __init__(self, max_workers=MAX_WORKERS, keep=KEEP_FINISHED):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.keep = keep
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, *args, **kwargs):
+        """
+        Start fn(*args, log=job.log, **kwargs) in the background and return the Job.
+        fn's return value becomes job.result; an exception marks the job failed.
+        """
+        job = Job(name)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        try:
+            result = fn(*args, log=job.log, **kwargs)
+        except Exception as e:
+            job.log(f"❌ {name_of(fn)} failed: {e}")
+            job.log(traceback.format_exc())
+            job._finish(FAILED)
+        else:
+            job._finish(DONE, result)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda j: j.created, reverse=True)
+
+    def _prune(self):
+        cutoff = time.time() - self.keep
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+def name_of(fn):
+    return getattr(fn, "__name__", repr(fn))
+
+
+def sse(lines, event_id_start=0):
+    """Format stream() output as Server-Sent Events; None becomes a keep-alive comment."""
+    counter = itertools.count(event_id_start + 1)
+    for line in lines:
+        if line is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield f"id: {next(counter)}\ndata: {line}\n\n"
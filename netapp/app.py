@@ -1,13 +1,33 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-from jinja2 import Environment, FileSystemLoader
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from napalm import get_network_driver
 import os
 from datetime import datetime
-import subprocess
 import sys
 import csv
-from flask import send_file
-import difflib
+from flask import send_file, Response, stream_with_context
+import io
+import tempfile
+import math
+import json
+import urllib.parse
+import urllib.request
+
+# Shared helpers (ssh_pool, ...) live one level up in pythonscripts/
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+import bulk_render
+import credential_store
+import device_health_check
+import drift_scan
+import golden_store
+import health_cache
+import instrumentation
+import ipam_store
+import jobs
+import ssh_pool
+from config_diff import diff_configs, format_diff
 
 
 app = Flask(__name__)
@@ -15,7 +35,7 @@ app.secret_key = 'supersecretkey'  # Needed for flash messages
 
 # Path to your Jinja2 templates
 TEMPLATE_DIR = 'templates/'  # Put your .j2 files here
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+env = bulk_render.make_env(TEMPLATE_DIR)  # Compiled templates cached on disk (netapp/.jinja_cache)
 
 # Dummy list of templates to populate dropdown
 templates = [
@@ -28,7 +48,7 @@ templates = [
 
 @app.route('/')
 def index():
-    return render_template('index.html', templates=templates, devices=devices)
+    return render_template('index.html', templates=templates, devices=load_devices_from_csv())
 
 @app.route('/add', methods=['POST'])
 def add_device():
@@ -87,48 +107,83 @@ def add_device():
 
 
 
+@app.route('/bulk_render', methods=['POST'])
+def bulk_render_configs():
+    """
+    Render every device in an uploaded CSV/YAML variables file and stream the
+    configs back as a ZIP (timing.csv inside has the per-device render time).
+    """
+    upload = request.files.get('devices')
+    if not upload or not upload.filename:
+        flash("Choose a CSV or YAML file with device variables", "error")
+        return redirect(url_for('index'))
+
+    suffix = os.path.splitext(upload.filename)[1].lower() or '.yaml'
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+        upload.save(tmp.name)
+        try:
+            device_vars = bulk_render.load_device_vars(tmp.name)
+        except Exception as e:
+            flash(f"Could not read {upload.filename}: {e}", "error")
+            return redirect(url_for('index'))
+
+    default_template = request.form.get('j2_template') or None
+    results = bulk_render.render_all(device_vars, default_template, template_dir=TEMPLATE_DIR)
+    return Response(stream_with_context(bulk_render.stream_zip(results)), mimetype='application/zip',
+                    headers={'Content-Disposition': 'attachment; filename=rendered_configs.zip'})
+
+
+
 ROTATED_PASSWORD_FILE = "/home/student/lab1/rotated_passwords.csv"
 GOLDEN_CONFIG_FOLDER = "/home/student/lab1/pythonscripts/golden_configs/"
 
+# Shared with every script; re-read only when password_rotate.py rewrites the file
+CREDENTIALS = credential_store.get_store(ROTATED_PASSWORD_FILE)
+
+def as_app_device(record):
+    return {
+        "device_ip": record["ip"],
+        "device_name": record["hostname"],
+        "username": record["username"],
+        "password": record["password"]
+    }
+
 def load_devices_from_csv():
-    """Load devices from CSV using column positions (0=IP, 1=Hostname, 2=Username, 3=Password)"""
-    devices_list = []
+    """Current device list from the credential store (picks up rotated passwords without a restart)"""
     try:
-        with open(ROTATED_PASSWORD_FILE, "r") as f:
-            reader = csv.reader(f)
-            next(reader)  # skip header
-            for row in reader:
-                # strip spaces just in case
-                ip = row[0].strip()
-                hostname = row[1].strip()
-                username = row[2].strip()
-                password = row[3].strip()
-                devices_list.append({
-                    "device_ip": ip,
-                    "device_name": hostname,
-                    "username": username,
-                    "password": password
-                })
+        return [as_app_device(r) for r in CREDENTIALS.devices()]
     except FileNotFoundError:
         print(f"❌ Rotated password CSV not found at {ROTATED_PASSWORD_FILE}")
     except Exception as e:
         print(f"❌ Error reading CSV: {e}")
-    return devices_list
-
-# Load devices once at startup
-devices = load_devices_from_csv()
+    return []
 
 GOLDEN_CONFIG_FOLDER = "/home/student/lab1/pythonscripts/netapp/golden_configs"
+_golden_store = None
+
+def get_golden_store():
+    """Open the golden config repository on first use, importing any legacy .cfg files."""
+    global _golden_store
+    if _golden_store is None:
+        _golden_store = golden_store.GoldenStore(GOLDEN_CONFIG_FOLDER)
+        _golden_store.import_legacy()
+    return _golden_store
+
+def find_device(device_input):
+    """Device by IP or exact hostname (case-insensitive), from the credential store indexes"""
+    try:
+        record = CREDENTIALS.get(device_input)
+    except Exception as e:
+        print(f"❌ Error reading CSV: {e}")
+        return None
+    return as_app_device(record) if record else None
 
 @app.route("/golden_config", methods=["POST"])
 def create_golden_config():
     device_input = request.form.get("hostname", "").strip()
 
     # Lookup device by IP or name
-    device = next(
-        (d for d in devices if d["device_ip"] == device_input or d["device_name"].lower() == device_input.lower()),
-        None
-    )
+    device = find_device(device_input)
 
     if not device:
         flash(f"Device '{device_input}' not found!", "error")
@@ -146,52 +201,51 @@ def create_golden_config():
         ) as device_conn:
             running_config = device_conn.get_config()["running"]
 
-        # Ensure the folder exists
-        os.makedirs(GOLDEN_CONFIG_FOLDER, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Identical snapshots are stored once; only real changes add a version
+        version, created = get_golden_store().save(device["device_name"], running_config)
+        if created:
+            flash(f"Golden config saved: {device['device_name']} v{version['id']}", "success")
+        else:
+            flash(f"Golden config unchanged: {device['device_name']} v{version['id']}", "success")
+        timestamp = datetime.fromisoformat(version["created_at"]).strftime("%Y%m%d_%H%M%S")
         filename = f"{device['device_name']}_golden_{timestamp}.cfg"
-        filepath = os.path.join(GOLDEN_CONFIG_FOLDER, filename)
-
-        with open(filepath, "w") as f:
-            f.write(running_config)
-
-        flash(f"Golden config saved: {filename}", "success")
-        return send_file(filepath, as_attachment=True)
+        return send_file(io.BytesIO(running_config.encode()), as_attachment=True,
+                         download_name=filename, mimetype="text/plain")
 
     except Exception as e:
         flash(f"Failed to create golden config: {str(e)}", "error")
         return redirect(url_for("index"))
 
+@app.route("/golden_config/<hostname>", methods=["GET"])
+def golden_config_versions(hostname):
+    """Version list of a device as JSON, or one version as a file with ?version=<id> (or ?version=latest)."""
+    store = get_golden_store()
+    wanted = request.args.get("version")
+    if not wanted:
+        return jsonify({"hostname": hostname, "versions": store.versions(hostname)})
+    version, config = store.get(hostname, None if wanted == "latest" else request.args.get("version", type=int))
+    if version is None:
+        return jsonify({"error": f"No golden config version {wanted} for '{hostname}'"}), 404
+    timestamp = datetime.fromisoformat(version["created_at"]).strftime("%Y%m%d_%H%M%S")
+    return send_file(io.BytesIO(config.encode()), as_attachment=True, mimetype="text/plain",
+                     download_name=f"{version['hostname']}_golden_{timestamp}.cfg")
+
 @app.route("/config_diff", methods=["POST"])
 def config_diff():
-    import difflib
-
-    device_input = request.form.get("hostname", "").strip().lower()
-
-    # Find latest golden config for device
-    golden_files = [
-        f for f in os.listdir(GOLDEN_CONFIG_FOLDER)
-        if f.lower().startswith(device_input)
-    ]
-    if not golden_files:
-        flash(f"No golden config found for device '{device_input}'", "error")
-        return redirect(url_for("index"))
-
-    latest_file = sorted(golden_files, reverse=True)[0]
-    golden_filepath = os.path.join(GOLDEN_CONFIG_FOLDER, latest_file)
-
-    with open(golden_filepath, "r") as f:
-        golden_config = [line.strip() for line in f if line.strip() and not line.strip().startswith(("!", "#"))]
+    device_input = request.form.get("hostname", "").strip()
 
     # Find device credentials
-    device = next(
-        (d for d in devices if d["device_name"].lower().startswith(device_input)),
-        None
-    )
+    device = find_device(device_input)
     if not device:
         flash(f"Device '{device_input}' not found in devices list", "error")
         return redirect(url_for("index"))
 
+    # Latest golden config for the device (single indexed lookup)
+    version, golden_config = get_golden_store().get(device["device_name"])
+    if version is None:
+        flash(f"No golden config found for device '{device_input}'", "error")
+        return redirect(url_for("index"))
+
     try:
         driver = get_network_driver("eos")  # SSH connection
         optional_args = {"transport": "ssh"}
@@ -201,65 +255,277 @@ def config_diff():
             password=device["password"],
             optional_args=optional_args
         ) as device_conn:
-            running_config = [
-                line.strip() for line in device_conn.get_config()["running"].splitlines()
-                if line.strip() and not line.strip().startswith(("!", "#"))
-            ]
-
-        # Minimalist diff: only lines that differ
-        diff_lines = []
-        for line in difflib.ndiff(golden_config, running_config):
-            if line.startswith("- ") or line.startswith("+ "):
-                diff_lines.append(line)
-
-        if not diff_lines:
+            running_config = device_conn.get_config()["running"]
+
+        # Section-aware diff: changed lines are shown under their parent sections
+        changes = diff_configs(golden_config, running_config)
+
+        if not changes:
             diff_output = "✅ No differences! Running config matches the golden config."
         else:
-            diff_output = "\n".join(diff_lines)
+            diff_output = format_diff(changes)
 
-        return render_template("config_diff.html", hostname=device_input.upper(), diff=diff_output)
+        return render_template("config_diff.html", hostname=device["device_name"].upper(), diff=diff_output)
 
     except Exception as e:
         flash(f"Failed to fetch running config or generate diff: {str(e)}", "error")
         return redirect(url_for("index"))
 
 
+# Fleet-wide drift scan: results are stored in SQLite and /drift only reads them
+DRIFT_SCAN_INTERVAL = 900  # Seconds between background scans (None = only on demand)
+_drift_scanner = None
+
+def get_drift_scanner():
+    """Open the drift result store on first use and start the periodic background scan."""
+    global _drift_scanner
+    if _drift_scanner is None:
+        _drift_scanner = drift_scan.DriftScanner(drift_scan.DriftStore(), get_golden_store(),
+                                                 load=load_devices_from_csv)
+        if DRIFT_SCAN_INTERVAL:
+            _drift_scanner.start_periodic(DRIFT_SCAN_INTERVAL)
+    return _drift_scanner
+
+@app.route("/drift", methods=["GET"])
+def drift_summary():
+    scanner = get_drift_scanner()
+    results = scanner.store.results()
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return render_template("drift.html", results=results, counts=counts,
+                           last_scan=scanner.store.last_scan(), running=scanner.running)
+
+@app.route("/drift/scan", methods=["POST"])
+def drift_scan_now():
+    if get_drift_scanner().trigger():
+        flash("Drift scan started", "success")
+    else:
+        flash("A drift scan is already running", "error")
+    return redirect(url_for("drift_summary"))
+
+@app.route("/drift/<hostname>", methods=["GET"])
+def drift_detail(hostname):
+    result = get_drift_scanner().store.result(hostname)
+    if not result:
+        flash(f"No drift result for '{hostname}'", "error")
+        return redirect(url_for("drift_summary"))
+    diff_output = result["diff"] or result["error"] or {
+        "in_sync": "✅ No differences! Running config matches the golden config.",
+        "no_golden": f"No golden config found for device '{hostname}'",
+    }.get(result["status"], "")
+    return render_template("config_diff.html", hostname=result["hostname"].upper(), diff=diff_output)
+
+@app.route("/drift.json", methods=["GET"])
+def drift_json():
+    scanner = get_drift_scanner()
+    return jsonify({"last_scan": scanner.store.last_scan(), "running": scanner.running,
+                    "results": scanner.store.results()})
+
+
+# Authenticated SSH sessions shared by every request handled in this process
+SSH_POOL = ssh_pool.get_pool()
+SSH_POOL.start_reaper()
+
+# Health checks run as in-process jobs; output is streamed to the page over SSE
+JOBS = jobs.JobRunner()
+
+# Recent results are reused (stale ones refreshed in the background, see health_cache.py)
+HEALTH_CACHE = health_cache.HealthCache()
+HEALTH_TRANSPORT = "ssh"  # "eapi" runs the checks as batched eAPI requests instead
+
+def cached_health_check(hostname, refresh=False, log=print):
+    """Job body: serve a cached result with its age, or run the checks live."""
+    if refresh:
+        HEALTH_CACHE.invalidate(hostname)
+    entry = HEALTH_CACHE.get(hostname, log=log, pool=SSH_POOL, transport=HEALTH_TRANSPORT)
+    if entry["state"] == health_cache.JOINED:
+        log(f"ℹ️ Joined a check of {hostname} that was already running\n")
+        device_health_check.format_health(entry["result"], log)
+    elif entry["state"] != health_cache.MISS:
+        note = ", refreshing in the background" if entry["refreshing"] else ""
+        log(f"ℹ️ Cached result from {entry['age']:.0f}s ago{note}\n")
+        device_health_check.format_health(entry["result"], log)
+    return entry["result"]["completed"]
+
 @app.route("/health_check", methods=["POST"])
 def health_check():
-    hostname = request.form.get("hostname")
-
-    result = subprocess.run(
-        [sys.executable, "/home/student/lab1/pythonscripts/device_health_check.py", hostname],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
-    )
-
-    output = result.stdout + "\n" + result.stderr
-    return render_template("health_output.html", hostname=hostname, output=output)
+    hostname = request.form.get("hostname", "").strip()
+    job = JOBS.submit(f"health_check {hostname}", cached_health_check, hostname,
+                      refresh=bool(request.form.get("refresh")))
+    return redirect(url_for("health_check_job", job_id=job.id))
+
+@app.route("/health/<hostname>", methods=["GET"])
+def health_result(hostname):
+    """Structured health result with its age; ?cached=1 never runs a check."""
+    if request.args.get("cached"):
+        cached = HEALTH_CACHE.peek(hostname)
+        if cached is None:
+            return jsonify({"error": f"no cached health result for '{hostname}'"}), 404
+        age, result = cached
+        return jsonify({"result": result, "age": age, "state": "cached", "refreshing": False})
+    return jsonify(HEALTH_CACHE.get(hostname, log=lambda *a: None, pool=SSH_POOL, transport=HEALTH_TRANSPORT))
+
+@app.route("/health/<hostname>/invalidate", methods=["POST"])
+def health_invalidate(hostname):
+    HEALTH_CACHE.invalidate(hostname)
+    return jsonify({"invalidated": hostname})
+
+@app.route("/health_check/<job_id>", methods=["GET"])
+def health_check_job(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        flash(f"Health check job '{job_id}' not found (finished jobs expire)", "error")
+        return redirect(url_for("index"))
+    hostname = job.name.split(" ", 1)[-1]
+    return render_template("health_output.html", hostname=hostname, job=job)
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": f"job '{job_id}' not found"}), 404
+    return jsonify(dict(job.to_dict(), output=job.lines))
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """Server-Sent Events: one 'data:' event per output line, then an 'end' event with the job status."""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": f"job '{job_id}' not found"}), 404
+    start = request.headers.get("Last-Event-ID", 0, type=int)
+
+    def generate():
+        yield from jobs.sse(job.stream(start, timeout=15), start)
+        yield f"event: end\ndata: {job.status}\n\n"
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/ssh_pool_stats", methods=["GET"])
+def ssh_pool_stats():
+    return jsonify(SSH_POOL.stats())
+
+# Connect/command/parse timings per device (see instrumentation.py), scraped from /metrics
+METRICS_ENABLED = True
+if METRICS_ENABLED:
+    instrumentation.enable()
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if request.args.get("format") == "json":
+        return Response(instrumentation.REGISTRY.to_json(), mimetype="application/json")
+    return Response(instrumentation.REGISTRY.to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+# Rolling CPU stats served by `check_cpu.py --daemon` (see cpu_monitor.py)
+CPU_MONITOR_URL = "http://127.0.0.1:9105"
+
+@app.route("/cpu_stats", methods=["GET"])
+@app.route("/cpu_stats/<device_ip>", methods=["GET"])
+def cpu_stats(device_ip=None):
+    url = f"{CPU_MONITOR_URL}/stats" + (f"/{urllib.parse.quote(device_ip, safe='')}" if device_ip else "")
+    if request.args.get("window"):
+        url += "?" + urllib.parse.urlencode({"window": request.args["window"]})
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resp:
+            return jsonify(json.load(resp))
+    except Exception as e:
+        return jsonify({"error": f"CPU monitor not reachable at {CPU_MONITOR_URL}: {e}"}), 503
 
 IPAM_CSV = "/home/student/lab1/dynamic_ipam.csv"  # Path to your IPAM CSV
+_ipam_store = None
+
+def get_ipam_store():
+    """Open the IPAM database on first use, importing IPAM_CSV if it is still empty."""
+    global _ipam_store
+    if _ipam_store is None:
+        _ipam_store = ipam_store.IPAMStore()
+        if _ipam_store.count() == 0 and os.path.exists(IPAM_CSV):
+            _ipam_store.load_csv(IPAM_CSV)
+    return _ipam_store
+
+IPAM_PAGE_SIZE = 100
+IPAM_MAX_PAGE_SIZE = 1000
+
+def ipam_filters():
+    """Filter values from the query string (empty ones dropped)."""
+    return {key: request.args.get(key, "").strip()
+            for key in ("hostname", "interface", "version", "prefix")
+            if request.args.get(key, "").strip()}
 
 @app.route("/ipam_view", methods=["GET"])
 def ipam_view():
-    ipam_data = []
+    filters = ipam_filters()
+    sort = request.args.get("sort", "hostname")
+    descending = request.args.get("order") == "desc"
+    per_page = min(max(request.args.get("per_page", IPAM_PAGE_SIZE, type=int), 1), IPAM_MAX_PAGE_SIZE)
+    page = max(request.args.get("page", 1, type=int), 1)
 
     try:
-        with open(IPAM_CSV, mode="r") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                ipam_data.append(row)
-    except FileNotFoundError:
-        flash(f"IPAM CSV not found at {IPAM_CSV}", "error")
-        return redirect(url_for("index"))
+        ipam_data, total = get_ipam_store().query(filters, sort, descending, per_page, (page - 1) * per_page)
+    except ValueError as e:
+        flash(f"Invalid filter: {e}", "error")
+        ipam_data, total = [], 0
     except Exception as e:
-        flash(f"Error reading IPAM CSV: {e}", "error")
+        flash(f"Error reading IPAM store: {e}", "error")
         return redirect(url_for("index"))
 
-    return render_template("ipam_full.html", ipam_data=ipam_data)
+    return render_template("ipam_full.html", ipam_data=ipam_data, columns=ipam_store.COLUMNS,
+                           filters=filters, sort=sort, descending=descending,
+                           page=page, per_page=per_page, total=total,
+                           pages=max(1, math.ceil(total / per_page)))
 
+@app.route("/ipam_export", methods=["GET"])
+def ipam_export():
+    """Stream every row matching the /ipam_view filters as CSV (default) or JSON (?format=json)."""
+    filters = ipam_filters()
+    try:
+        rows = get_ipam_store().iter_rows(filters)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.args.get("format") == "json":
+        def generate():
+            yield "["
+            for i, row in enumerate(rows):
+                yield ("," if i else "") + json.dumps(dict(zip(ipam_store.COLUMNS, row)))
+            yield "]"
+        return Response(stream_with_context(generate()), mimetype="application/json")
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(ipam_store.COLUMNS)
+        for i, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if i % 500 == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+    return Response(stream_with_context(generate()), mimetype="text/csv",
+                    headers={"Content-Disposition": "attachment; filename=ipam.csv"})
+
+@app.route("/ipam_lookup", methods=["GET"])
+def ipam_lookup():
+    """?ip=10.0.10.37 -> owner and longest-prefix match; ?prefix=10.0.10.0/24 -> contained addresses"""
+    ip = request.args.get("ip", "").strip()
+    prefix = request.args.get("prefix", "").strip()
+    try:
+        store = get_ipam_store()
+        if ip:
+            network, rows = store.longest_prefix(ip)
+            return jsonify({"ip": ip, "owner": store.owner(ip),
+                            "longest_prefix": {"network": str(network) if network else None, "rows": rows}})
+        if prefix:
+            return jsonify({"prefix": prefix, "contained": store.contained(prefix)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"error": "pass ?ip=<address> or ?prefix=<network>"}), 400
 
 
 
 if __name__ == '__main__':
+    # The debug reloader runs this file twice; only its serving child scans the fleet
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        get_drift_scanner()
     app.run(debug=True)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    from . import instrumentation
+except ImportError:
+    import instrumentation
+
+try:
+    import textfsm
+except ImportError:  # Only the built-in parsers are available
+    textfsm = None
+
+try:
+    import ntc_templates
+    NTC_TEMPLATE_DIR = os.path.join(os.path.dirname(ntc_templates.__file__), "templates")
+except ImportError:
+    NTC_TEMPLATE_DIR = None
+
+PLATFORM = "arista_eos"
+CACHE_SIZE = 512  # Parsed outputs kept, keyed by command and output hash
+
+
+# ------------------------------------------------------------
+# Records
+# ------------------------------------------------------------
+class Interface(NamedTuple):
+    name: str
+    address: Optional[str] = None  # As printed, with /prefix when the device shows one
+    version: Optional[int] = None
+    status: Optional[str] = None
+    protocol: Optional[str] = None
+    mtu: Optional[int] = None
+    description: Optional[str] = None
+
+
+class Route(NamedTuple):
+    prefix: str
+    protocol: str                  # Route code: C, S, O, O E2, B E, ...
+    distance: Optional[int] = None
+    metric: Optional[int] = None
+    next_hops: Tuple[str, ...] = ()
+    interfaces: Tuple[str, ...] = ()
+
+
+class Neighbor(NamedTuple):
+    neighbor_id: str               # OSPF router ID or LLDP system name
+    interface: Optional[str] = None
+    address: Optional[str] = None
+    state: Optional[str] = None
+    remote_port: Optional[str] = None
+    protocol: str = "ospf"
+
+
+def as_dicts(records):
+    """Records as plain dicts (for JSON); anything else is returned unchanged."""
+    if isinstance(records, (list, tuple)):
+        return [r._asdict() if hasattr(r, "_asdict") else r for r in records]
+    return records
+
+
+# ------------------------------------------------------------
+# Built-in parsers (regexes compiled once at import)
+# ------------------------------------------------------------
+_IPV4 = r"\d{1,3}(?:\.\d{1,3}){3}"
+_IPV4_BRIEF = re.compile(
+    rf"^\s*(?P<name>[A-Za-z][\w/.:-]*)\s+(?P<address>{_IPV4}(?:/\d+)?|unassigned)"
+    r"(?:\s+(?P<status>admin down|\S+)\s+(?P<protocol>lowerlayerdown|notpresent|\S+)(?:\s+(?P<mtu>\d+))?)?",
+    re.IGNORECASE)
+_IPV6_ADDRESS = re.compile(r"^[0-9a-fA-F]{0,4}(?::[0-9a-fA-F]{0,4}){2,7}(?:/\d+)?$")
+_INTERFACE_NAME = re.compile(r"^[A-Za-z][\w/.:-]*$")
+_DESCRIPTION = re.compile(
+    r"^(?P<name>[A-Za-z][\w/.:-]*)\s+(?P<status>admin down|up|down|notconnect|\S+)"
+    r"\s+(?P<protocol>lowerlayerdown|notpresent|up|down|\S+)(?:\s+(?P<description>.*?))?\s*$")
+_ROUTE = re.compile(
+    rf"^\s*(?P<code>[A-Z][A-Za-z0-9]*(?: [A-Z0-9][A-Za-z0-9]*)?)\s+(?P<prefix>{_IPV4}/\d+)"
+    r"(?:\s+\[(?P<distance>\d+)/(?P<metric>\d+)\])?\s*(?P<rest>.*)$")
+_VIA = re.compile(rf"via (?P<hop>{_IPV4}),\s*(?P<interface>\S+)")
+_CONNECTED = re.compile(r"directly connected,\s*(?P<interface>\S+)")
+_OSPF_NEIGHBOR = re.compile(
+    rf"^\s*(?P<id>{_IPV4})\s+\d+\s+\S+\s+\d+\s+(?P<state>\S+)\s+\S+\s+(?P<address>{_IPV4})\s+(?P<interface>\S+)")
+_LLDP_NEIGHBOR = re.compile(r"^(?P<port>[A-Za-z][\w/.:-]*)\s+(?P<device>\S+)\s+(?P<rport>\S+)\s+(?P<ttl>\d+)\s*$")
+
+
+def parse_ip_interface_brief(output):
+    """'show ip interface brief' data rows; header and ---- separator lines are skipped."""
+    records = []
+    for line in output.splitlines():
+        m = _IPV4_BRIEF.match(line)
+        if m:
+            mtu = m.group("mtu")
+            records.append(Interface(m.group("name"), m.group("address"), 4, m.group("status"),
+                                     m.group("protocol"), int(mtu) if mtu else None))
+    return records
+
+
+def parse_ipv6_interface_brief(output):
+    """
+    'show ipv6 interface brief': one record per address. Continuation lines
+    (extra addresses under the same interface) belong to the interface above.
+    """
+    records = []
+    current = None
+    for line in output.splitlines():
+        parts = line.split()
+        if not parts or parts[0].startswith("-"):
+            continue
+        if _INTERFACE_NAME.match(parts[0]) and not _IPV6_ADDRESS.match(parts[0]):
+            current = parts[0]
+            if len(parts) > 1 and parts[1].lower() == "unassigned":
+                records.append(Interface(current, "unassigned", 6))
+                continue
+        if current is None:
+            continue
+        for part in parts:
+            if ":" in part and _IPV6_ADDRESS.match(part):
+                records.append(Interface(current, part, 6))
+                break
+    return records
+
+
+def parse_interfaces_description(output):
+    """'show interfaces description' (also with '| include ...'), address left empty."""
+    records = []
+    for line in output.splitlines():
+        m = _DESCRIPTION.match(line)
+        if m and m.group("name") != "Interface":
+            records.append(Interface(m.group("name"), status=m.group("status"),
+                                     protocol=m.group("protocol"), description=m.group("description") or None))
+        elif line.strip() and not line.startswith((" ", "-")) and len(line.split()) == 1:
+            records.append(Interface(line.strip()))  # Bare interface names
+    return records
+
+
+def parse_ip_route(output):
+    """'show ip route': one record per prefix, ECMP 'via' continuation lines folded in."""
+    records = []
+    route = None
+    hops, interfaces = [], []
+
+    def flush():
+        if route is not None:
+            records.append(route._replace(next_hops=tuple(hops), interfaces=tuple(interfaces)))
+
+    for line in output.splitlines():
+        m = _ROUTE.match(line)
+        if m:
+            flush()
+            hops, interfaces = [], []
+            distance, metric = m.group("distance"), m.group("metric")
+            route = Route(m.group("prefix"), m.group("code"),
+                          int(distance) if distance else None, int(metric) if metric else None)
+            rest = m.group("rest")
+        elif route is not None and line[:1].isspace() and "via " in line:
+            rest = line
+        else:
+            continue
+        for via in _VIA.finditer(rest):
+            hops.append(via.group("hop"))
+            interfaces.append(via.group("interface"))
+        connected = _CONNECTED.search(rest)
+        if connected:
+            interfaces.append(connected.group("interface"))
+    flush()
+    return records
+
+
+def parse_ospf_neighbor(output):
+    return [Neighbor(m.group("id"), m.group("interface"), m.group("address"), m.group("state"))
+            for m in map(_OSPF_NEIGHBOR.match, output.splitlines()) if m]
+
+
+def parse_lldp_neighbors(output):
+    return [Neighbor(m.group("device"), m.group("port"), remote_port=m.group("rport"), protocol="lldp")
+            for m in map(_LLDP_NEIGHBOR.match, output.splitlines()) if m and m.group("port") != "Port"]
+
+
+PARSERS = {
+    "show ip interface brief": parse_ip_interface_brief,
+    "show ipv6 interface brief": parse_ipv6_interface_brief,
+    "show interfaces description": parse_interfaces_description,
+    "show ip route": parse_ip_route,
+    "show ip ospf neighbor": parse_ospf_neighbor,
+    "show lldp neighbors": parse_lldp_neighbors,
+}
+
+
+# ------------------------------------------------------------
+# TextFSM (ntc-templates) for commands without a built-in parser
+# ------------------------------------------------------------
+class _CompiledTemplate:
+    """A TextFSM template parsed once; parses are serialised because the FSM is stateful."""
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.fsm = textfsm.TextFSM(f)
+        self.header = [h.lower() for h in self.fsm.header]
+        self._lock = threading.Lock()
+
+    def parse(self, output):
+        with self._lock:
+            self.fsm.Reset()
+            rows = self.fsm.ParseText(output)
+        return [dict(zip(self.header, row)) for row in rows]
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_template(command, platform=PLATFORM, template_dir=None):
+    """Compiled ntc-templates template for platform + command (loaded on first use)."""
+    if textfsm is None:
+        raise RuntimeError("textfsm is not installed")
+    template_dir = template_dir or NTC_TEMPLATE_DIR
+    if template_dir is None:
+        raise RuntimeError("ntc-templates is not installed")
+    name = f"{platform}_{command.strip().replace(' ', '_')}.textfsm"
+    path = os.path.join(template_dir, name)
+    with _templates_lock:
+        template = _templates.get(path)
+        if template is None:
+            if not os.path.exists(path):
+                raise LookupError(f"No TextFSM template {name}")
+            template = _templates[path] = _CompiledTemplate(path)
+    return template
+
+
+def parse_textfsm(command, output, platform=PLATFORM, template_dir=None):
+    """Rows of the ntc-templates template as dicts with lower-case keys."""
+    return get_template(command, platform, template_dir).parse(output)
+
+
+# ------------------------------------------------------------
+# Cached entry point
+# ------------------------------------------------------------
+class ParseCache:
+    """LRU of parsed outputs keyed by (command, blake2b of the output)."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            records = self._entries.get(key)
+            if records is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return records
+
+    def put(self, key, records):
+        with self._lock:
+            self._entries[key] = records
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+CACHE = ParseCache()
+
+
+def parser_for(command):
+    """Built-in parser for command, ignoring '| include ...' style filters."""
+    return PARSERS.get(" ".join(command.split("|", 1)[0].split()))
+
+
+def parse(command, output, platform=PLATFORM, cache=CACHE):
+    """
+    Parse show command output into records. Built-in parsers return typed
+    records (Interface, Route, Neighbor); other commands go through the
+    ntc-templates TextFSM template and return dicts. Identical output is
+    parsed once: results are cached by output hash and returned as a tuple.
+    Output that is not text (already parsed, e.g. by netmiko's use_textfsm)
+    is returned unchanged.
+    """
+    if not isinstance(output, str):
+        return output
+    key = (platform, command, hashlib.blake2b(output.encode(), digest_size=16).digest())
+    if cache is not None:
+        records = cache.get(key)
+        if records is not None:
+            return records
+    parser = parser_for(command)
+    with instrumentation.span("parse", command=command):
+        if parser is not None:
+            records = tuple(parser(output))
+        else:
+            records = tuple(parse_textfsm(command, output, platform))
+    if cache is not None:
+        cache.put(key, records)
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse saved show command output (stdin or file)")
+    parser.add_argument("command", help='Command the output came from, e.g. "show ip route"')
+    parser.add_argument("file", nargs="?", help="Output file (default: stdin)")
+    parser.add_argument("--platform", default=PLATFORM)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file) as f:
+            text = f.read()
+    else:
+        text = sys.stdin.read()
+    for record in as_dicts(parse(args.command, text, args.platform)):
+        print(record)
@@ -1,14 +1,33 @@
 #!/usr/bin/env python3
-import csv
+import argparse
+import json
+import os
 import random
 import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from netmiko import ConnectHandler
 import time
 
+try:
+    from . import credential_store, instrumentation, ssh_pool
+except ImportError:
+    import credential_store
+    import instrumentation
+    import ssh_pool
+
 PASSWORD_FILE = "/home/student/lab1/rotated_passwords.csv"
 LOG_FILE = "/home/student/lab1/pythonscripts/password_rotation.log"
 
+# Write-ahead checkpoint: one JSON line per device state change, fsynced before we move on
+CHECKPOINT_FILE = "/home/student/lab1/pythonscripts/password_rotation.wal"
+
+MAX_WORKERS = 8   # Devices rotated at the same time
+RATE_LIMIT = 2.0  # Rotations started per second across all workers (0 = unlimited)
+
+_log_lock = threading.Lock()
+
 
 def generate_password(length=16):
     """Generate a secure random password with only alphabets and digits."""
@@ -18,91 +37,257 @@ def generate_password(length=16):
 
 def log(message):
     """Write log messages with timestamps."""
-    with open(LOG_FILE, "a") as logf:
-        logf.write(f"[{datetime.now()}] {message}\n")
-    print(message)
+    with _log_lock:
+        with open(LOG_FILE, "a") as logf:
+            logf.write(f"[{datetime.now()}] {message}\n")
+        print(message)
 
 
 def read_device_passwords():
     """Read current device passwords from CSV."""
-    devices = []
-    with open(PASSWORD_FILE, mode="r") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            devices.append({
-                "Device": row["Device"].strip(),
-                "Username": row["Username"].strip(),
-                "Old_Password": row["New_Password"].strip()
-            })
-    return devices
+    return [{
+        "Device": r["ip"],
+        "Hostname": r["hostname"] or "N/A",
+        "Username": r["username"],
+        "Old_Password": r["password"],
+        "Site": r["site"]
+    } for r in credential_store.get_store(PASSWORD_FILE).devices()]
 
 
 def write_new_passwords(devices):
-    """Overwrite CSV file with newly rotated passwords including Hostname."""
-    with open(PASSWORD_FILE, mode="w", newline="") as csvfile:
-        fieldnames = ["Device", "Hostname", "Username", "New_Password"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for dev in devices:
-            writer.writerow({
-                "Device": dev["Device"],
-                "Hostname": dev.get("Hostname", "N/A"),
-                "Username": dev["Username"],
-                "New_Password": dev["New_Password"]
-            })
-
-
-def rotate_passwords():
-    devices = read_device_passwords()
-    updated_devices = []
+    """Replace the CSV file with newly rotated passwords including Hostname (and Site)."""
+    credential_store.get_store(PASSWORD_FILE).save([{
+        "ip": dev["Device"],
+        "hostname": dev.get("Hostname", "N/A"),
+        "username": dev["Username"],
+        "password": dev["New_Password"],
+        "site": dev.get("Site", "default")
+    } for dev in devices])
 
-    for dev in devices:
-        new_password = generate_password()
-        device = {
-            "device_type": "arista_eos",
-            "host": dev["Device"],
-            "username": dev["Username"],
-            "password": dev["Old_Password"],
-            "fast_cli": False,
-            "global_delay_factor": 2,
-            "read_timeout_override": 60,
-            "session_log": f"session_{dev['Device']}.log"
-        }
-
-        log(f"\n[+] Connecting to {dev['Device']}...")
 
+# ------------------------------------------------------------
+# Checkpoint and rate limiting
+# ------------------------------------------------------------
+class Checkpoint:
+    """
+    Append-only JSON-lines log of rotation progress. A device is recorded as
+    'pending' (with the new password) before the change is pushed and as
+    'done' once it succeeded, each line fsynced, so an interrupted run never
+    loses a password that may already be active on a device.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """{device: last record} from an earlier, unfinished run."""
+        state = {}
         try:
-            conn = ConnectHandler(**device)
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash
+                    state[record["device"]] = record
+        except FileNotFoundError:
+            pass
+        return state
+
+    def record(self, device, status, **fields):
+        entry = dict(fields, device=device, status=status, time=datetime.now().isoformat(timespec="seconds"))
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RateLimiter:
+    """Spaces calls to wait() at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# ------------------------------------------------------------
+# Rotation
+# ------------------------------------------------------------
+def confirm_password(device, password):
+    """Hostname if the device accepts a login with password, else None."""
+    try:
+        with ssh_pool.connection(dict(device, password=password), None, connect=ConnectHandler) as conn:
+            prompt = conn.find_prompt()
+    except Exception:
+        return None
+    return prompt.replace("#", "").replace(">", "").strip()
+
+
+def rotate_device(dev, checkpoint, limiter, pool=None, pending=None):
+    """
+    Rotate one device's password. pending is the password from an
+    interrupted attempt: if the device already accepts it, that rotation
+    is completed instead of starting a new one.
+    Returns dev with New_Password (old password on failure) and Hostname.
+    """
+    limiter.wait()
+    new_password = generate_password()
+    device = {
+        "device_type": "arista_eos",
+        "host": dev["Device"],
+        "username": dev["Username"],
+        "password": dev["Old_Password"],
+        "fast_cli": False,
+        "global_delay_factor": 2,
+        "read_timeout_override": 60,
+        "session_log": f"session_{dev['Device']}.log"
+    }
+
+    if pending:
+        hostname = confirm_password(device, pending)
+        if hostname is not None:
+            checkpoint.record(dev["Device"], "done", hostname=hostname, password=pending)
+            log(f"[+] {dev['Device']} ({hostname}) already uses the password from the interrupted run")
+            return dict(dev, Hostname=hostname, New_Password=pending)
+        # Not applied: rotate again from the old password
+
+    log(f"\n[+] Connecting to {dev['Device']}...")
+    checkpoint.record(dev["Device"], "pending", password=new_password)
+    pushed = False
+    try:
+        with instrumentation.span("password_rotate", device=dev["Device"]), \
+                ssh_pool.connection(device, pool, connect=ConnectHandler) as conn:
             conn.enable()
 
             # Capture hostname (strip '#' or '>')
             prompt = conn.find_prompt()
             hostname = prompt.replace("#", "").replace(">", "").strip()
-            dev["Hostname"] = hostname
 
             # Rotate password
             commands = [f"username {dev['Username']} secret {new_password}"]
             conn.send_config_set(commands)
+            pushed = True
             conn.save_config()
-            conn.disconnect()
 
-            log(f"[+] Password successfully rotated for {dev['Device']} ({hostname})")
-            dev["New_Password"] = new_password
-            updated_devices.append(dev)
+        # Pooled sessions were opened with the old password
+        if pool is not None:
+            pool.discard(device)
+
+        checkpoint.record(dev["Device"], "done", hostname=hostname, password=new_password)
+        log(f"[+] Password successfully rotated for {dev['Device']} ({hostname})")
+        return dict(dev, Hostname=hostname, New_Password=new_password)
+
+    except Exception as e:
+        log(f"[-] Failed to update {dev['Device']}: {e}")
+        if pushed:
+            # The new password may already be active (e.g. save_config timed out): check before giving up on it
+            if pool is not None:
+                pool.discard(device)
+            hostname = confirm_password(device, new_password)
+            if hostname is not None:
+                checkpoint.record(dev["Device"], "done", hostname=hostname, password=new_password)
+                log(f"[+] {dev['Device']} ({hostname}) accepts the new password; "
+                    f"save it on the device if it did not persist")
+                return dict(dev, Hostname=hostname, New_Password=new_password)
+            checkpoint.record(dev["Device"], "pending", password=new_password, error=str(e))
+            return dict(dev, New_Password=dev["Old_Password"], Unresolved=new_password)
+        if pending:
+            # The interrupted attempt may still be active on the device: keep it on record
+            checkpoint.record(dev["Device"], "pending", password=pending, error=str(e))
+            return dict(dev, New_Password=dev["Old_Password"], Unresolved=pending)
+        checkpoint.record(dev["Device"], "failed", error=str(e))
+        return dict(dev, New_Password=dev["Old_Password"])
+
+
+def rotate_passwords(pool=None, max_workers=MAX_WORKERS, rate=RATE_LIMIT, resume=False,
+                     checkpoint_file=None):
+    """
+    Rotate the password on every device concurrently (optionally borrowing
+    sessions from a shared ssh_pool), at most `rate` new rotations per second.
+    Progress is checkpointed per device; with resume=True devices finished
+    by an interrupted run are skipped. The CSV is replaced atomically at the end.
+    Returns False if an unfinished run was found and resume was not requested.
+    """
+    checkpoint_file = checkpoint_file or CHECKPOINT_FILE
+    checkpoint = Checkpoint(checkpoint_file)
+    previous = checkpoint.load() if resume else {}
+    if not resume and checkpoint.exists():
+        log(f"[-] Unfinished rotation found in {checkpoint_file}; rerun with --resume")
+        return False
+
+    devices = read_device_passwords()
+    done = []
+    todo = []
+    for dev in devices:
+        state = previous.get(dev["Device"], {})
+        if state.get("status") == "done":
+            done.append(dict(dev, Hostname=state.get("hostname") or dev["Hostname"],
+                             New_Password=state["password"]))
+        else:
+            todo.append((dev, state.get("password") if state.get("status") == "pending" else None))
+    if resume:
+        log(f"[+] Resuming: {len(done)} devices already rotated, {len(todo)} remaining")
 
-        except Exception as e:
-            log(f"[-] Failed to update {dev['Device']}: {e}")
-            dev["New_Password"] = dev["Old_Password"]
-            dev["Hostname"] = "N/A"
-            updated_devices.append(dev)
+    limiter = RateLimiter(rate)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        rotated = list(executor.map(lambda item: rotate_device(item[0], checkpoint, limiter, pool, item[1]), todo))
 
-        # Small delay to prevent overloading
-        time.sleep(2)
+    # Keep CSV order; write new passwords with hostname column, then drop the checkpoint
+    results = {dev["Device"]: dev for dev in done + rotated}
+    write_new_passwords([results[dev["Device"]] for dev in devices])
+    unresolved = [dev["Device"] for dev in rotated if dev.get("Unresolved")]
+    if unresolved:
+        checkpoint.close()
+        log(f"[-] Could not confirm the password of {', '.join(unresolved)}; "
+            f"keeping {checkpoint_file} for the next --resume")
+    else:
+        checkpoint.remove()
 
-    # Write new passwords with hostname column
-    write_new_passwords(updated_devices)
-    log("\n✅ Password rotation completed successfully!\n")
+    failed = sum(1 for dev in rotated if dev["New_Password"] == dev["Old_Password"])
+    log(f"\n✅ Password rotation completed: {len(devices) - failed}/{len(devices)} devices "
+        f"in {time.monotonic() - started:.1f}s\n")
+    return True
 
 
 if __name__ == "__main__":
-    rotate_passwords()
+    parser = argparse.ArgumentParser(description="Rotate the login password on every device")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Devices rotated concurrently (default {MAX_WORKERS})")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help=f"Max rotations started per second, 0 = unlimited (default {RATE_LIMIT})")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping devices it already rotated")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.recording(args.metrics, args.metrics_port, log=log):
+        rotate_passwords(max_workers=args.workers, rate=args.rate, resume=args.resume)
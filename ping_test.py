@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
-import csv
+import argparse
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from netmiko import ConnectHandler
 from datetime import datetime
 
+try:
+    from . import credential_store, instrumentation, ssh_pool
+except ImportError:
+    import credential_store
+    import instrumentation
+    import ssh_pool
+
 CSV_FILE = "/home/student/lab1/rotated_passwords.csv"
 LOG_FILE = "/home/student/lab1/pythonscripts/ping_results.txt"
 
@@ -12,19 +22,13 @@ PING_TARGETS = [
     "10.0.100.1"
 ]
 
+# Concurrency limits (override with --workers / --per-site)
+MAX_WORKERS = 16     # Devices tested at the same time across the whole fleet
+PER_SITE_LIMIT = 4   # Devices tested at the same time within one site (0 = no limit)
+
 def load_devices(csv_file):
-    """Load device details from CSV"""
-    devices = []
-    with open(csv_file, mode="r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            devices.append({
-                "ip": row["Device"].strip(),
-                "hostname": row["Hostname"].strip(),
-                "username": row["Username"].strip(),
-                "password": row["New_Password"].strip()
-            })
-    return devices
+    """Load device details (ip, hostname, username, password, site) from the shared credential store"""
+    return credential_store.get_store(csv_file).devices()
 
 def get_device_type(hostname):
     """Infer device type from hostname"""
@@ -32,8 +36,8 @@ def get_device_type(hostname):
         return "cisco_ios"
     return "arista_eos"
 
-def run_ping_on_device(device):
-    """SSH into device and run ping commands"""
+def run_ping_on_device(device, pool=None):
+    """SSH into device and run ping commands (reusing a pooled session if pool is given)"""
     hostname = device["hostname"]
 
     # Skip devices not starting with 'r'
@@ -57,45 +61,100 @@ def run_ping_on_device(device):
 
     results = []
     try:
-        conn = ConnectHandler(**device_params)
-        conn.find_prompt()  # Verify connection
+        with instrumentation.span("ping_test", device=ip), \
+                ssh_pool.connection(device_params, pool, connect=ConnectHandler) as conn:
+            conn.find_prompt()  # Verify connection
 
-        for target in PING_TARGETS:
-            print(f"  🔸 Pinging {target} from {hostname} ...")
+            for target in PING_TARGETS:
+                print(f"  🔸 Pinging {target} from {hostname} ...")
 
-            if ":" in target:
-                ping_cmd = f"ping ipv6 {target}" if device_type != "arista_eos" else f"ping ipv6 {target} repeat 3"
-            else:
-                ping_cmd = f"ping {target}" if device_type != "arista_eos" else f"ping {target} repeat 3"
+                if ":" in target:
+                    ping_cmd = f"ping ipv6 {target}" if device_type != "arista_eos" else f"ping ipv6 {target} repeat 3"
+                else:
+                    ping_cmd = f"ping {target}" if device_type != "arista_eos" else f"ping {target} repeat 3"
 
-            output = conn.send_command(ping_cmd, expect_string=None, delay_factor=2)
+                output = conn.send_command(ping_cmd, expect_string=None, delay_factor=2)
 
-            success = any(kw in output.lower() for kw in ["success rate", "bytes from", "100 percent", "0% packet loss"])
-            status = "✅ Success" if success else "❌ Failed"
-            results.append(f"{hostname} → {target}: {status}")
-
-        conn.disconnect()
+                success = any(kw in output.lower() for kw in ["success rate", "bytes from", "100 percent", "0% packet loss"])
+                status = "✅ Success" if success else "❌ Failed"
+                results.append(f"{hostname} → {target}: {status}")
 
     except Exception as e:
         results.append(f"❌ Connection failed for {hostname} ({ip}): {str(e)}")
 
     return results
 
-def main():
+def run_fleet(devices, max_workers=MAX_WORKERS, per_site=PER_SITE_LIMIT, pool=None):
+    """
+    Run run_ping_on_device() for every device on a thread pool.
+    At most max_workers devices run at once overall and at most per_site
+    devices per site. Devices are queued per site and only handed to the
+    pool when their site has a free slot, so a CSV grouped by site still
+    keeps every worker busy. Yields each device's results in input order.
+    """
+    max_workers = max(1, max_workers)
+    queues = {}  # site -> deque of (index, device), sites in first-seen order
+    for index, device in enumerate(devices):
+        queues.setdefault(device.get("site", "default"), deque()).append((index, device))
+    futures = [None] * len(devices)
+    running = {}  # future -> site
+    active = {site: 0 for site in queues}
+
+    def retire(done):
+        for future in done:
+            active[running.pop(future)] -= 1
+
+    def fill(executor):
+        for site, queue in queues.items():
+            while queue and len(running) < max_workers and (not per_site or active[site] < per_site):
+                index, device = queue.popleft()
+                future = futures[index] = executor.submit(run_ping_on_device, device, pool=pool)
+                running[future] = site
+                active[site] += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fill(executor)
+        for index in range(len(devices)):
+            while futures[index] is None or not futures[index].done():
+                retire(wait(running, return_when=FIRST_COMPLETED)[0])
+                fill(executor)
+            retire([f for f in running if f.done()])
+            fill(executor)
+            yield futures[index].result()
+
+def main(max_workers=MAX_WORKERS, per_site=PER_SITE_LIMIT):
     devices = load_devices(CSV_FILE)
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     print(f"\n===== DEVICE PING TEST ({timestamp}) =====\n")
+    start = time.perf_counter()
+    pings = 0
     with open(LOG_FILE, "w") as log:
         log.write(f"===== DEVICE PING TEST ({timestamp}) =====\n\n")
 
-        for device in devices:
-            results = run_ping_on_device(device)
+        for results in run_fleet(devices, max_workers, per_site):
             for line in results:
                 print(line)
                 log.write(line + "\n")
+            pings += len(results)
+
+        elapsed = time.perf_counter() - start
+        summary = (f"{len(devices)} devices, {pings} results in {elapsed:.2f}s "
+                   f"({len(devices) / elapsed if elapsed else 0:.2f} devices/s, "
+                   f"{pings / elapsed if elapsed else 0:.2f} results/s, "
+                   f"workers={max_workers}, per-site={per_site or 'unlimited'})")
+        log.write(f"\n{summary}\n")
 
+    print(f"\n⏱️  {summary}")
     print(f"\n✅ Results saved to {LOG_FILE}\n")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Ping test across all routers in rotated_passwords.csv")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Maximum devices tested concurrently (default {MAX_WORKERS}, 1 = serial)")
+    parser.add_argument("--per-site", type=int, default=PER_SITE_LIMIT,
+                        help=f"Maximum devices tested concurrently per site (default {PER_SITE_LIMIT}, 0 = no limit)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.recording(args.metrics, args.metrics_port):
+        main(max_workers=args.workers, per_site=args.per_site)
@@ -1,6 +1,49 @@
 from napalm import get_network_driver
-import yaml
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import yaml
+
+try:
+    from .config_tree import parse as parse_config
+except ImportError:
+    from config_tree import parse as parse_config
+
+# List of devices (hostname: IP)
+DEVICES = {
+    "s1": "10.0.100.8",
+    "r1": "10.0.100.9",
+    "s3": "10.0.100.2",
+    "r3": "10.0.100.3"
+}
+
+USERNAME = "admin"
+PASSWORD = "pranav"
+
+# Output directory
+OUTPUT_DIR = "/home/student/lab1/pythonscripts/templateyaml"
+STATE_FILE = ".export_state.json"  # Config hash per device from the last export, inside OUTPUT_DIR
+
+MAX_WORKERS = 16  # Devices fetched at the same time
+
+# libyaml's C emitter when PyYAML was built with it
+Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Top-level sections by their first words ("no ..." lines go with what they negate)
+CATEGORIES = [
+    ("interfaces", ("interface ",)),
+    ("routing", ("router ", "ipv6 router ", "ip route ", "ipv6 route ", "ip routing", "ipv6 unicast-routing",
+                 "route-map ", "ip prefix-list ", "ipv6 prefix-list ", "ip access-list ", "ipv6 access-list ",
+                 "ip community-list ", "ip as-path ", "vrf ", "mpls ", "arp ")),
+    ("management", ("management ", "hostname ", "username ", "aaa ", "enable ", "ntp ", "snmp-server ",
+                    "logging ", "ip name-server ", "dns ", "ip domain", "clock ", "banner ", "daemon ",
+                    "api ")),
+]
+
 
 def get_running_config(host, username, password):
     # Load EOS driver
@@ -16,34 +59,142 @@ def get_running_config(host, username, password):
     device.close()
     return config
 
-if __name__ == "__main__":
-    # List of devices (hostname: IP)
-    devices = {
-        "s1": "10.0.100.8",
-        "r1": "10.0.100.9",
-        "s3": "10.0.100.2",
-        "r3": "10.0.100.3"
-    }
-
-    username = "admin"
-    password = "pranav"
-
-    # Output directory
-    output_dir = "/home/student/lab1/pythonscripts/templateyaml"
-    os.makedirs(output_dir, exist_ok=True)  # create dir if not exists
 
-    for name, ip in devices.items():
-        print(f"📡 Fetching running config from {name} ({ip})...")
+# ------------------------------------------------------------
+# Section tree
+# ------------------------------------------------------------
+def category(line):
+    line = line[3:] if line.startswith("no ") else line
+    for name, prefixes in CATEGORIES:
+        if line.startswith(prefixes):
+            return name
+    return "other"
+
+
+def _children(node):
+    """Leaf lines as strings, sub-sections as {line: [children]}."""
+    return [{child.line: _children(child)} if child.children else child.line for child in node.children]
+
+
+def config_tree(config):
+    """
+    Nested view of a running config for lookups:
+    {"interfaces": {"interface Ethernet1": ["description ...", ...]},
+     "routing": {"router bgp 65000": [..., {"address-family ipv4": [...]}]},
+     "management": {...}, "other": {...}}
+    Top-level lines are keys of their category; a top-level line without
+    children maps to an empty list.
+    """
+    tree = {name: {} for name, _ in CATEGORIES}
+    tree["other"] = {}
+    for section in parse_config(config).sections():
+        tree[category(section.line)].setdefault(section.line, []).extend(_children(section))
+    return tree
+
+
+def config_hash(config):
+    return hashlib.sha256(config.encode()).hexdigest()
 
-        config = get_running_config(ip, username, password)
 
-        # Split config into lines and store as list
-        config_lines = config.splitlines()
+# ------------------------------------------------------------
+# Export
+# ------------------------------------------------------------
+def export_path(name, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"{name}-running-config.yaml")
 
-        # Save to YAML file (per device) inside the target folder
-        filename = os.path.join(output_dir, f"{name}-running-config.yaml")
-        with open(filename, "w") as f:
-            yaml.dump(config_lines, f, default_flow_style=False)
 
-        print(f"✅ Running config for {name} saved to {filename}")
+def load_state(output_dir=OUTPUT_DIR):
+    try:
+        with open(os.path.join(output_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
 
+
+def save_state(state, output_dir=OUTPUT_DIR):
+    path = os.path.join(output_dir, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def write_export(name, config, digest, output_dir=OUTPUT_DIR):
+    """Dump the section tree of one device to <name>-running-config.yaml (atomic replace)."""
+    document = {"hostname": name, "sha256": digest, "config": config_tree(config)}
+    filename = export_path(name, output_dir)
+    with open(filename + ".tmp", "w") as f:
+        yaml.dump(document, f, Dumper=Dumper, default_flow_style=False, sort_keys=False, width=1000)
+    os.replace(filename + ".tmp", filename)
+    return filename
+
+
+def load_export(name, output_dir=OUTPUT_DIR):
+    with open(export_path(name, output_dir)) as f:
+        return yaml.load(f, Loader=Loader)
+
+
+def export_device(name, ip, previous, output_dir=OUTPUT_DIR, fetch=get_running_config, force=False):
+    """
+    Fetch one device and write its export unless the config hash matches
+    previous and the file is still there. Returns (name, status, hash or error).
+    """
+    print(f"📡 Fetching running config from {name} ({ip})...")
+    try:
+        config = fetch(ip, USERNAME, PASSWORD)
+    except Exception as e:
+        print(f"❌ Failed to fetch running config from {name} ({ip}): {e}")
+        return name, "failed", str(e)
+
+    digest = config_hash(config)
+    if not force and digest == previous and os.path.exists(export_path(name, output_dir)):
+        print(f"⏭️  {name} unchanged since the last export")
+        return name, "unchanged", digest
+
+    try:
+        filename = write_export(name, config, digest, output_dir)
+    except Exception as e:
+        print(f"❌ Failed to write the export for {name}: {e}")
+        return name, "failed", str(e)
+    print(f"✅ Running config for {name} saved to {filename}")
+    return name, "exported", digest
+
+
+def export_all(devices=None, output_dir=OUTPUT_DIR, max_workers=MAX_WORKERS, fetch=get_running_config,
+               force=False):
+    """
+    Export every device concurrently. Devices whose config hash is the same
+    as in the last export are fetched but not re-parsed or rewritten.
+    Returns {name: status}.
+    """
+    devices = DEVICES if devices is None else devices
+    os.makedirs(output_dir, exist_ok=True)  # create dir if not exists
+    state = load_state(output_dir)
+    started = time.monotonic()
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(export_device, name, ip, state.get(name), output_dir, fetch, force)
+                   for name, ip in devices.items()]
+        for future in as_completed(futures):
+            name, status, value = future.result()
+            results[name] = status
+            if status == "failed":
+                state.pop(name, None)
+            else:
+                state[name] = value
+    save_state(state, output_dir)
+
+    counts = {s: list(results.values()).count(s) for s in ("exported", "unchanged", "failed")}
+    print(f"\n📄 {counts['exported']} exported, {counts['unchanged']} unchanged, {counts['failed']} failed "
+          f"in {time.monotonic() - started:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export device running configs as YAML section trees")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"Devices fetched concurrently (default {MAX_WORKERS})")
+    parser.add_argument("--force", action="store_true", help="Rewrite every export, even if unchanged")
+    args = parser.parse_args()
+    export_all(output_dir=args.output_dir, max_workers=args.workers, force=args.force)
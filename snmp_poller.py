@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+import asyncio
+import itertools
+import random
+import socket
+import threading
+import time
+
+try:
+    from . import instrumentation
+except ImportError:
+    import instrumentation
+
+# ------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------
+SNMP_PORT = 161
+TIMEOUT = 1.0          # Seconds to wait for each request
+RETRIES = 2            # Extra attempts after a timeout
+MAX_REPETITIONS = 25   # Rows asked for per GETBULK round trip
+
+# BER / SNMP tags
+INTEGER, OCTET_STRING, NULL, OID, SEQUENCE = 0x02, 0x04, 0x05, 0x06, 0x30
+IP_ADDRESS, COUNTER32, GAUGE32, TIMETICKS, COUNTER64 = 0x40, 0x41, 0x42, 0x43, 0x46
+NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW = 0x80, 0x81, 0x82
+GET, GETNEXT, RESPONSE, GETBULK = 0xA0, 0xA1, 0xA2, 0xA5
+
+SNMP_V2C = 1
+NUMERIC_TAGS = (INTEGER, COUNTER32, GAUGE32, TIMETICKS, COUNTER64)
+END_OF_DATA = (NO_SUCH_OBJECT, NO_SUCH_INSTANCE, END_OF_MIB_VIEW)
+
+
+class SNMPError(Exception):
+    """Raised for timeouts, malformed packets and SNMP error-status responses."""
+
+
+# ------------------------------------------------------------
+# BER encoding
+# ------------------------------------------------------------
+def parse_oid(oid):
+    """'.1.3.6.1' or '1.3.6.1' -> (1, 3, 6, 1)"""
+    return tuple(int(part) for part in oid.strip(".").split("."))
+
+
+def format_oid(oid):
+    return "." + ".".join(str(part) for part in oid)
+
+
+def _encode_length(length):
+    if length < 0x80:
+        return bytes([length])
+    raw = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([0x80 | len(raw)]) + raw
+
+
+def _tlv(tag, payload):
+    return bytes([tag]) + _encode_length(len(payload)) + payload
+
+
+def _encode_integer(value, tag=INTEGER):
+    size = max(1, (value.bit_length() + 8) // 8)
+    return _tlv(tag, value.to_bytes(size, "big", signed=tag == INTEGER or value < 0))
+
+
+def _encode_oid(oid):
+    arcs = [oid[0] * 40 + oid[1]] + list(oid[2:])
+    payload = bytearray()
+    for arc in arcs:
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        payload.extend(reversed(chunk))
+    return _tlv(OID, bytes(payload))
+
+
+def _encode_value(tag, value):
+    if tag in NUMERIC_TAGS:
+        return _encode_integer(value, tag)
+    if tag == OCTET_STRING:
+        return _tlv(OCTET_STRING, value.encode() if isinstance(value, str) else value)
+    if tag == OID:
+        return _encode_oid(value)
+    return _tlv(tag, b"")  # NULL and the end-of-data exceptions
+
+
+def encode_message(community, pdu_type, request_id, varbinds, field1=0, field2=0):
+    """
+    Build an SNMPv2c message.
+    varbinds is a list of (oid tuple, tag, value); field1/field2 are
+    error-status/error-index, or non-repeaters/max-repetitions for GETBULK.
+    """
+    binds = b"".join(_tlv(SEQUENCE, _encode_oid(oid) + _encode_value(tag, value))
+                     for oid, tag, value in varbinds)
+    pdu = _tlv(pdu_type, _encode_integer(request_id) + _encode_integer(field1)
+               + _encode_integer(field2) + _tlv(SEQUENCE, binds))
+    return _tlv(SEQUENCE, _encode_integer(SNMP_V2C) + _tlv(OCTET_STRING, community.encode()) + pdu)
+
+
+# ------------------------------------------------------------
+# BER decoding
+# ------------------------------------------------------------
+def _read_tlv(data, pos):
+    """Return (tag, payload start, payload end) for the TLV at pos."""
+    try:
+        tag = data[pos]
+        length = data[pos + 1]
+        pos += 2
+        if length & 0x80:
+            count = length & 0x7F
+            length = int.from_bytes(data[pos:pos + count], "big")
+            pos += count
+    except IndexError:
+        raise SNMPError("truncated packet")
+    if pos + length > len(data):
+        raise SNMPError("truncated packet")
+    return tag, pos, pos + length
+
+
+def _decode_oid(payload):
+    arcs = []
+    value = 0
+    for byte in payload:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(value)
+            value = 0
+    first = min(arcs[0] // 40, 2)
+    return (first, arcs[0] - first * 40) + tuple(arcs[1:])
+
+
+def _decode_value(tag, payload):
+    if tag == INTEGER:
+        return int.from_bytes(payload, "big", signed=True)
+    if tag in NUMERIC_TAGS:
+        return int.from_bytes(payload, "big")
+    if tag == OID:
+        return _decode_oid(payload)
+    if tag == IP_ADDRESS:
+        return socket.inet_ntoa(bytes(payload))
+    if tag == OCTET_STRING:
+        return bytes(payload)
+    return None
+
+
+def decode_message(data):
+    """
+    Parse an SNMPv2c message.
+    Returns (community, pdu_type, request_id, field1, field2, varbinds) with
+    varbinds as a list of (oid tuple, tag, value).
+    """
+    data = memoryview(data)
+    tag, pos, end = _read_tlv(data, 0)
+    if tag != SEQUENCE:
+        raise SNMPError("not an SNMP message")
+    _, vstart, pos = _read_tlv(data, pos)
+    _, cstart, pos = _read_tlv(data, pos)
+    community = bytes(data[cstart:pos]).decode(errors="replace")
+
+    pdu_type, pos, pdu_end = _read_tlv(data, pos)
+    fields = []
+    for _ in range(3):
+        _, start, pos = _read_tlv(data, pos)
+        fields.append(int.from_bytes(data[start:pos], "big", signed=True))
+
+    _, pos, binds_end = _read_tlv(data, pos)
+    varbinds = []
+    while pos < binds_end:
+        _, inner, pos = _read_tlv(data, pos)
+        _, ostart, oend = _read_tlv(data, inner)
+        vtag, vstart, vend = _read_tlv(data, oend)
+        varbinds.append((_decode_oid(data[ostart:oend]), vtag, _decode_value(vtag, data[vstart:vend])))
+    return community, pdu_type, fields[0], fields[1], fields[2], varbinds
+
+
+# ------------------------------------------------------------
+# Async engine
+# ------------------------------------------------------------
+class _ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, pending):
+        self.pending = pending
+
+    def datagram_received(self, data, addr):
+        try:
+            message = decode_message(data)
+        except (SNMPError, ValueError, IndexError):
+            return
+        future = self.pending.get(message[2])
+        if future is not None and not future.done():
+            future.set_result(message)
+
+    def error_received(self, exc):
+        # ICMP errors on the shared socket carry no request id; let the timeout handle them
+        pass
+
+
+class SNMPEngine:
+    """
+    Sends SNMPv2c requests for many devices over one UDP socket per address
+    family and matches responses by request-id, so polling hundreds of
+    devices concurrently costs a handful of file descriptors.
+    """
+
+    def __init__(self, timeout=TIMEOUT, retries=RETRIES):
+        self.timeout = timeout
+        self.retries = retries
+        self._pending = {}
+        self._transports = {}
+        self._transport_lock = asyncio.Lock()
+        self._ids = itertools.count(random.randint(1, 1 << 30))
+
+    async def _transport(self, family):
+        async with self._transport_lock:
+            if family not in self._transports:
+                loop = asyncio.get_running_loop()
+                local = ("::", 0) if family == socket.AF_INET6 else ("0.0.0.0", 0)
+                transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _ClientProtocol(self._pending), local_addr=local, family=family)
+                self._transports[family] = transport
+        return self._transports[family]
+
+    async def request(self, host, community, pdu_type, varbinds, field1=0, field2=0, port=SNMP_PORT):
+        """Send one PDU with timeout/retries and return the decoded response varbinds."""
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        transport = await self._transport(family)
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.retries + 1):
+            request_id = next(self._ids) & 0x7FFFFFFF
+            future = loop.create_future()
+            self._pending[request_id] = future
+            try:
+                transport.sendto(encode_message(community, pdu_type, request_id, varbinds, field1, field2),
+                                 (host, port))
+                _, _, _, error_status, error_index, binds = await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                self._pending.pop(request_id, None)
+
+            if error_status:
+                raise SNMPError(f"error-status {error_status} at index {error_index}")
+            return binds
+
+        raise SNMPError(f"timeout after {self.retries + 1} attempts")
+
+    async def get(self, host, community, oids, port=SNMP_PORT):
+        """GET one or more scalar OIDs. Returns {oid string: value} (None when absent)."""
+        binds = await self.request(host, community, GET,
+                                   [(parse_oid(o), NULL, None) for o in oids], port=port)
+        return {format_oid(oid): (None if tag in END_OF_DATA else value) for oid, tag, value in binds}
+
+    async def bulk_walk(self, host, community, oid, max_repetitions=MAX_REPETITIONS, port=SNMP_PORT):
+        """Walk the subtree under oid with GETBULK. Returns [(oid string, value), ...]."""
+        root = parse_oid(oid)
+        current = root
+        rows = []
+        while True:
+            binds = await self.request(host, community, GETBULK, [(current, NULL, None)],
+                                       0, max_repetitions, port=port)
+            if not binds:
+                return rows
+            for bind_oid, tag, value in binds:
+                if tag in END_OF_DATA or bind_oid[:len(root)] != root or bind_oid <= current:
+                    return rows
+                rows.append((format_oid(bind_oid), value))
+                current = bind_oid
+
+    def close(self):
+        for transport in self._transports.values():
+            transport.close()
+        self._transports.clear()
+
+
+async def poll_walk(devices, oid, timeout=TIMEOUT, retries=RETRIES, max_repetitions=MAX_REPETITIONS):
+    """
+    Walk oid on every device concurrently.
+    devices are dicts with ip, community and optional port. Returns one dict
+    per device, in input order, with ip, values, latency (s) and error.
+    """
+    engine = SNMPEngine(timeout, retries)
+
+    async def poll(device):
+        start = time.perf_counter()
+        try:
+            rows = await engine.bulk_walk(device["ip"], device["community"], oid,
+                                          max_repetitions, device.get("port", SNMP_PORT))
+            values, error = [value for _, value in rows], None
+        except (SNMPError, OSError) as e:
+            values, error = [], str(e)
+        latency = time.perf_counter() - start
+        instrumentation.observe("snmp_walk", latency, error is not None, device=device["ip"])
+        return {"ip": device["ip"], "values": values, "latency": latency, "error": error}
+
+    try:
+        return await asyncio.gather(*(poll(d) for d in devices))
+    finally:
+        engine.close()
+
+
+# ------------------------------------------------------------
+# Agent simulator (tests and benchmarks)
+# ------------------------------------------------------------
+class AgentSimulator(asyncio.DatagramProtocol):
+    """
+    Minimal SNMPv2c agent answering GET/GETNEXT/GETBULK from a dict
+    {oid string: (tag, value)}. Responses can be delayed by latency seconds.
+    """
+
+    def __init__(self, mib, community="public", latency=0.0):
+        self.mib = {parse_oid(oid): entry for oid, entry in mib.items()}
+        self.order = sorted(self.mib)
+        self.community = community
+        self.latency = latency
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def _next(self, oid):
+        for candidate in self.order:
+            if candidate > oid:
+                return candidate, self.mib[candidate]
+        return oid, (END_OF_MIB_VIEW, None)
+
+    def _answer(self, data):
+        community, pdu_type, request_id, field1, field2, binds = decode_message(data)
+        if community != self.community:
+            return None
+        out = []
+        if pdu_type == GET:
+            out = [(oid,) + self.mib.get(oid, (NO_SUCH_OBJECT, None)) for oid, _, _ in binds]
+        elif pdu_type == GETNEXT:
+            out = [(o,) + entry for o, entry in (self._next(oid) for oid, _, _ in binds)]
+        elif pdu_type == GETBULK:
+            for oid, _, _ in binds:
+                for _ in range(max(field2, 1)):
+                    oid, entry = self._next(oid)
+                    out.append((oid,) + entry)
+                    if entry[0] == END_OF_MIB_VIEW:
+                        break
+        return encode_message(community, RESPONSE, request_id, out)
+
+    def datagram_received(self, data, addr):
+        try:
+            reply = self._answer(data)
+        except (SNMPError, ValueError, IndexError):
+            return
+        if reply is None:
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+def run_simulator_in_thread(mib, community="public", latency=0.0, host="127.0.0.1", port=0):
+    """Start an AgentSimulator on a background event loop. Returns (port, stop function)."""
+    ready = threading.Event()
+    state = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        transport, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+            lambda: AgentSimulator(mib, community, latency), local_addr=(host, port)))
+        state.update(loop=loop, port=transport.get_extra_info("sockname")[1])
+        ready.set()
+        loop.run_forever()
+        transport.close()
+        loop.close()
+
+    thread = threading.Thread(target=serve, name="snmp-simulator", daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        state["loop"].call_soon_threadsafe(state["loop"].stop)
+        thread.join()
+
+    return state["port"], stop
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+import threading
+import time
+from contextlib import contextmanager
+from netmiko import ConnectHandler
+
+try:
+    from . import instrumentation
+except ImportError:
+    import instrumentation
+
+# ------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------
+IDLE_TIMEOUT = 300      # Close sessions unused for this many seconds
+KEEPALIVE = 30          # SSH keepalive interval in seconds (0 disables)
+MAX_IDLE_PER_KEY = 2    # Idle sessions kept per host/credential
+
+
+def pool_key(params):
+    """Key a session by host, port, credentials and platform."""
+    return (
+        params.get("host") or params.get("ip"),
+        params.get("port", 22),
+        params.get("username"),
+        params.get("password"),
+        params.get("device_type"),
+    )
+
+
+# ------------------------------------------------------------
+# Session pool
+# ------------------------------------------------------------
+class SSHSessionPool:
+    """
+    Keeps authenticated netmiko sessions open between operations.
+    A session is handed to one caller at a time; idle sessions are kept
+    per host/credential, kept alive with SSH keepalives and closed once
+    they have been unused for idle_timeout seconds or stop responding.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, keepalive=KEEPALIVE,
+                 max_idle_per_key=MAX_IDLE_PER_KEY, connect=ConnectHandler):
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        self.max_idle_per_key = max_idle_per_key
+        self.connect = connect
+        self._idle = {}  # key -> [(connection, last_used), ...]
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "broken": 0}
+        self._reaper = None
+
+    def acquire(self, params, connect=None):
+        """Return an open session for params, reusing an idle one if possible."""
+        key = pool_key(params)
+        self.evict_idle()
+
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    self._stats["misses"] += 1
+                    break
+                conn, _ = idle.pop()
+
+            if self._is_alive(conn):
+                with self._lock:
+                    self._stats["hits"] += 1
+                return conn
+
+            with self._lock:
+                self._stats["broken"] += 1
+            self._close(conn)
+
+        with instrumentation.span("connect", device=key[0]):
+            conn = (connect or self.connect)(**params)
+        if self.keepalive:
+            try:
+                conn.remote_conn.transport.set_keepalive(self.keepalive)
+            except AttributeError:
+                pass
+        return conn
+
+    def release(self, params, conn, broken=False):
+        """Give a session back to the pool (or close it if broken or surplus)."""
+        if broken:
+            with self._lock:
+                self._stats["broken"] += 1
+            self._close(conn)
+            return
+
+        key = pool_key(params)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_key:
+                idle.append((conn, time.monotonic()))
+                return
+            self._stats["evictions"] += 1
+        self._close(conn)
+
+    @contextmanager
+    def session(self, params, connect=None):
+        """Context manager around acquire()/release()."""
+        conn = self.acquire(params, connect)
+        try:
+            yield conn
+        except Exception:
+            # The channel may be left mid-command; never hand it out again
+            self.release(params, conn, broken=True)
+            raise
+        self.release(params, conn)
+
+    def discard(self, params):
+        """Close every idle session for params (e.g. after a password change)."""
+        with self._lock:
+            idle = self._idle.pop(pool_key(params), [])
+        for conn, _ in idle:
+            self._close(conn)
+
+    def evict_idle(self):
+        """Close sessions that have been idle longer than idle_timeout."""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        with self._lock:
+            for key, idle in list(self._idle.items()):
+                keep = [(c, t) for c, t in idle if t >= cutoff]
+                expired.extend(c for c, t in idle if t < cutoff)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            self._stats["evictions"] += len(expired)
+        for conn in expired:
+            self._close(conn)
+        return len(expired)
+
+    def start_reaper(self, interval=60):
+        """Evict idle sessions from a daemon thread (for long-running processes)."""
+        if self._reaper is not None:
+            return
+
+        def reap():
+            while True:
+                time.sleep(interval)
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=reap, name="ssh-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def close_all(self):
+        """Close every idle session."""
+        with self._lock:
+            idle = [c for sessions in self._idle.values() for c, _ in sessions]
+            self._idle.clear()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the number of idle sessions."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = sum(len(s) for s in self._idle.values())
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+        return stats
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            return bool(conn.is_alive())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.disconnect()
+        except Exception:
+            pass
+
+
+# ------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide shared pool, creating it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = SSHSessionPool()
+        return _default_pool
+
+
+@contextmanager
+def connection(params, pool=None, connect=ConnectHandler):
+    """
+    Yield a connection for params.
+    With a pool the session is borrowed and returned; without one a
+    one-off session is opened and disconnected afterwards. While
+    instrumentation is on, connects and commands are timed per device.
+    """
+    device = params.get("host") or params.get("ip")
+    if pool is not None:
+        with pool.session(params, connect=connect) as conn:
+            yield instrumentation.instrument_connection(conn, device)
+        return
+
+    with instrumentation.span("connect", device=device):
+        conn = connect(**params)
+    try:
+        yield instrumentation.instrument_connection(conn, device)
+    finally:
+        conn.disconnect()
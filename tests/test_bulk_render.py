@@ -0,0 +1,95 @@
+import io
+import os
+import zipfile
+
+import pytest
+from pythonscripts import bulk_render
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "core_router.j2").write_text(
+        "hostname {{ hostname }}\n{% for intf in interfaces %}interface {{ intf.name }}\n"
+        "   ip address {{ intf.ip }}\n{% endfor %}")
+    (templates / "broken.j2").write_text("{{ hostname | nosuchfilter }}")
+    return str(templates), str(tmp_path / "cache")
+
+
+# ------------------------------
+# Test: variable files
+# ------------------------------
+def test_load_csv_with_nested_columns(tmp_path):
+    path = tmp_path / "devices.csv"
+    path.write_text("hostname,template,interfaces.0.name,interfaces.0.ip,interfaces.2.name,bgp.asn\n"
+                    "r1,core_router,Ethernet1,10.0.0.1/30,Ethernet3,65000\n"
+                    "r2,core_router,Ethernet1,,,\n")
+    devices = bulk_render.load_device_vars(str(path))
+    assert devices[0] == {"hostname": "r1", "template": "core_router",
+                          "interfaces": [{"name": "Ethernet1", "ip": "10.0.0.1/30"}, {"name": "Ethernet3"}],
+                          "bgp": {"asn": "65000"}}
+    assert devices[1] == {"hostname": "r2", "template": "core_router", "interfaces": [{"name": "Ethernet1"}]}
+
+def test_load_yaml(tmp_path):
+    path = tmp_path / "devices.yaml"
+    path.write_text("devices:\n  - hostname: r1\n    interfaces:\n      - {name: Ethernet1, ip: 10.0.0.1/30}\n")
+    assert bulk_render.load_device_vars(str(path)) == [
+        {"hostname": "r1", "interfaces": [{"name": "Ethernet1", "ip": "10.0.0.1/30"}]}]
+
+
+# ------------------------------
+# Test: rendering
+# ------------------------------
+def test_render_all_in_order_with_errors(dirs):
+    template_dir, cache_dir = dirs
+    devices = [{"hostname": f"r{i}", "interfaces": [{"name": "Ethernet1", "ip": f"10.0.{i}.1/30"}]}
+               for i in range(3)]
+    devices.append({"hostname": "bad", "template": "broken"})
+    results = list(bulk_render.render_all(devices, "core_router", max_workers=1,
+                                          template_dir=template_dir, cache_dir=cache_dir))
+    assert [r["hostname"] for r in results] == ["r0", "r1", "r2", "bad"]
+    assert "ip address 10.0.2.1/30" in results[2]["config"]
+    assert results[3]["config"] is None and "nosuchfilter" in results[3]["error"]
+    assert os.listdir(cache_dir)  # bytecode persisted
+
+def test_render_all_on_process_pool(dirs, monkeypatch):
+    template_dir, cache_dir = dirs
+    monkeypatch.setattr(bulk_render, "POOL_THRESHOLD", 2)
+    devices = [{"hostname": f"r{i}", "interfaces": []} for i in range(40)]
+    results = list(bulk_render.render_all(devices, "core_router.j2", max_workers=2,
+                                          template_dir=template_dir, cache_dir=cache_dir))
+    assert [r["config"] for r in results] == [f"hostname r{i}\n" for i in range(40)]
+    assert all(r["seconds"] >= 0 for r in results)
+
+
+# ------------------------------
+# Test: ZIP stream
+# ------------------------------
+def test_stream_zip_contains_configs_and_timing():
+    results = [{"hostname": "r1", "template": "core_router.j2", "filename": "r1.cfg", "config": "hostname r1\n",
+                "seconds": 0.001, "error": None},
+               {"hostname": "r1", "template": "core_router.j2", "filename": "r1.cfg", "config": "hostname r1b\n",
+                "seconds": 0.002, "error": None},
+               {"hostname": "r9", "template": "x.j2", "filename": "r9.cfg", "config": None,
+                "seconds": 0.0, "error": "TemplateNotFound: x.j2"}]
+    chunks = list(bulk_render.stream_zip(iter(results)))
+    assert len(chunks) > 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.namelist() == ["r1.cfg", "r1_2.cfg", "timing.csv"]
+    assert archive.read("r1_2.cfg") == b"hostname r1b\n"
+    timing = archive.read("timing.csv").decode().splitlines()
+    assert timing[0] == "hostname,template,render_ms,error"
+    assert timing[3] == "r9,x.j2,0.000,TemplateNotFound: x.j2"
+
+def test_hostnames_cannot_escape_the_archive(dirs):
+    template_dir, cache_dir = dirs
+    hostnames = ["../../x", "/etc/passwd", "..\\..\\win", "..", "r1 core"]
+    devices = [{"hostname": h, "interfaces": []} for h in hostnames]
+    results = list(bulk_render.render_all(devices, "core_router", max_workers=1,
+                                          template_dir=template_dir, cache_dir=cache_dir))
+    assert [r["filename"] for r in results] == ["x.cfg", "passwd.cfg", "win.cfg", "device.cfg", "r1_core.cfg"]
+    results.append(dict(results[0], filename="../evil.cfg"))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(bulk_render.stream_zip(iter(results)))))
+    assert archive.namelist() == ["x.cfg", "passwd.cfg", "win.cfg", "device.cfg", "r1_core.cfg", "evil.cfg",
+                                  "timing.csv"]
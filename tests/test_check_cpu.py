@@ -2,43 +2,62 @@ import pytest
 import builtins
 from unittest.mock import patch, MagicMock
 from pythonscripts import check_cpu
-import subprocess
+from pythonscripts import snmp_poller
+
+
+@pytest.fixture
+def snmp_agent():
+    """Local SNMP simulator with three CPU cores (30%, 50%, 40%)."""
+    mib = {
+        f"{check_cpu.CPU_OID}.{core}": (snmp_poller.INTEGER, load)
+        for core, load in [(1, 30), (2, 50), (3, 40)]
+    }
+    mib[".1.3.6.1.2.1.25.4.1.0"] = (snmp_poller.INTEGER, 1)  # Next subtree, must not be walked
+    port, stop = snmp_poller.run_simulator_in_thread(mib)
+    yield port
+    stop()
 
 
 # ---- TEST: Successful CPU usage retrieval ----
-@patch("subprocess.check_output")
-def test_get_cpu_usage_success(mock_subprocess):
-    mock_subprocess.return_value = b"""
-    HOST-RESOURCES-MIB::hrProcessorLoad.1 = INTEGER: 30
-    HOST-RESOURCES-MIB::hrProcessorLoad.2 = INTEGER: 50
-    HOST-RESOURCES-MIB::hrProcessorLoad.3 = INTEGER: 40
-    """
-
-    result = check_cpu.get_cpu_usage("10.0.100.2", "public")
+def test_get_cpu_usage_success(snmp_agent):
+    result = check_cpu.get_cpu_usage("127.0.0.1", "public", port=snmp_agent)
     # Expect average = (30 + 50 + 40) / 3 = 40.0
     assert result == pytest.approx(40.0)
 
 
 # ---- TEST: Empty SNMP output ----
-@patch("subprocess.check_output")
-def test_get_cpu_usage_empty_output(mock_subprocess):
-    mock_subprocess.return_value = b""
-    result = check_cpu.get_cpu_usage("10.0.100.3", "public")
+def test_get_cpu_usage_empty_output():
+    port, stop = snmp_poller.run_simulator_in_thread({".1.3.6.1.2.1.1.3.0": (snmp_poller.TIMETICKS, 1)})
+    try:
+        result = check_cpu.get_cpu_usage("127.0.0.1", "public", port=port)
+    finally:
+        stop()
     assert result is None
 
 
-# ---- TEST: Subprocess failure ----
-@patch("subprocess.check_output", side_effect=subprocess.CalledProcessError(1, "snmpwalk"))
-def test_get_cpu_usage_exception(mock_subprocess):
-    result = check_cpu.get_cpu_usage("10.0.100.4", "public")
-    assert result is None
+# ---- TEST: Timeout (wrong community is silently dropped) ----
+def test_get_cpu_usage_exception(snmp_agent):
+    results = check_cpu.poll_cpu_usage(
+        [{"ip": "127.0.0.1", "community": "wrong", "port": snmp_agent}], timeout=0.05, retries=1)
+    assert results[0]["avg"] is None
+    assert "timeout" in results[0]["error"]
+
+
+# ---- TEST: Concurrent poll keeps device order and reports latency ----
+def test_poll_cpu_usage_many_devices(snmp_agent):
+    devices = [{"ip": "127.0.0.1", "community": "public", "port": snmp_agent} for _ in range(20)]
+    results = check_cpu.poll_cpu_usage(devices)
+    assert len(results) == 20
+    for result in results:
+        assert result["cores"] == [30, 50, 40]
+        assert result["latency"] > 0
 
 
 # ---- TEST: Main function output with high CPU ----
-@patch("pythonscripts.check_cpu.get_cpu_usage", return_value=80)
-def test_main_high_cpu(mock_cpu, capsys):
+@patch("pythonscripts.check_cpu.poll_cpu_usage")
+def test_main_high_cpu(mock_poll, capsys):
     check_cpu.THRESHOLD = 50
-    check_cpu.DEVICES = [{"ip": "10.0.100.2", "community": "public"}]
+    mock_poll.return_value = [{"ip": "10.0.100.2", "avg": 80, "cores": [80], "latency": 0.01, "error": None}]
 
     check_cpu.main()
     captured = capsys.readouterr()
@@ -47,20 +66,21 @@ def test_main_high_cpu(mock_cpu, capsys):
 
 
 # ---- TEST: Main function output with normal CPU ----
-@patch("pythonscripts.check_cpu.get_cpu_usage", return_value=30)
-def test_main_normal_cpu(mock_cpu, capsys):
+@patch("pythonscripts.check_cpu.poll_cpu_usage")
+def test_main_normal_cpu(mock_poll, capsys):
     check_cpu.THRESHOLD = 50
-    check_cpu.DEVICES = [{"ip": "10.0.100.3", "community": "public"}]
+    mock_poll.return_value = [{"ip": "10.0.100.3", "avg": 30, "cores": [30], "latency": 0.01, "error": None}]
 
     check_cpu.main()
     captured = capsys.readouterr()
     assert "ALERT" not in captured.out
+    assert "polled in" in captured.out
 
 
 # ---- TEST: Main function output when SNMP fails ----
-@patch("pythonscripts.check_cpu.get_cpu_usage", return_value=None)
-def test_main_snmp_failure(mock_cpu, capsys):
-    check_cpu.DEVICES = [{"ip": "10.0.100.4", "community": "public"}]
+@patch("pythonscripts.check_cpu.poll_cpu_usage")
+def test_main_snmp_failure(mock_poll, capsys):
+    mock_poll.return_value = [{"ip": "10.0.100.4", "avg": None, "cores": [], "latency": 3.0, "error": "timeout"}]
 
     check_cpu.main()
     captured = capsys.readouterr()
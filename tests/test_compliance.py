@@ -0,0 +1,124 @@
+import pytest
+from pythonscripts import compliance, golden_store
+
+CONFIG = """\
+hostname r1
+!
+no aaa root
+!
+snmp-server community public rw
+snmp-server community ops-ro ro
+!
+management api http-commands
+   no shutdown
+!
+interface Ethernet1
+   no switchport
+   ip address 10.0.0.1/30
+   ip access-group ssh in
+!
+interface Ethernet2
+   no switchport
+   ip address 10.0.0.5/30
+!
+interface Ethernet3
+!
+"""
+
+RULES = [
+    {"id": "no-rw", "description": "RO only", "severity": "high", "forbid": r"^snmp-server community \S+ rw\b"},
+    {"id": "no-aaa-root", "require": "^no aaa root$"},
+    {"id": "ntp", "severity": "low", "require": "^ntp server "},
+    {"id": "eapi", "section": "management api http-commands", "require": "^no shutdown$"},
+    {"id": "acl", "section_match": r"^interface Ethernet\d", "when": "^no switchport$", "require": r"^ip access-group \S+ in$"},
+    {"id": "bgp-md5", "section": "router bgp", "require": "password"},
+    {"id": "no-telnet", "forbid": "telnet|ssh-v1"},
+]
+
+
+def test_rules_are_validated():
+    with pytest.raises(ValueError, match="exactly one"):
+        compliance.compile_rules([{"id": "x", "require": "a", "forbid": "b"}])
+    with pytest.raises(ValueError, match="invalid regex"):
+        compliance.compile_rules([{"id": "x", "require": "("}])
+    with pytest.raises(ValueError, match="Duplicate"):
+        compliance.compile_rules([{"id": "x", "require": "a"}, {"id": "x", "forbid": "b"}])
+    with pytest.raises(ValueError, match="'when' needs"):
+        compliance.compile_rules([{"id": "x", "require": "a", "when": "b"}])
+    with pytest.raises(ValueError, match="invalid regex"):
+        compliance.compile_rules([{"id": "x", "require": "a", "section_match": "("}])
+
+def test_anchored_rules_get_a_keyword():
+    rules = {r.id: r for r in compliance.compile_rules(RULES)}
+    assert rules["no-rw"].keyword == "snmp-server"
+    assert rules["no-aaa-root"].keyword == "no"
+    assert rules["no-telnet"].keyword is None
+    assert compliance.Rule({"id": "x", "require": "^ip(v6)? route"}).keyword is None
+
+def test_check_config():
+    rules = compliance.compile_rules(RULES)
+    result = compliance.check_config("r1", CONFIG, rules)
+    assert result["status"] == {"no-rw": "fail", "no-aaa-root": "pass", "ntp": "fail", "eapi": "pass",
+                                "acl": "fail", "bgp-md5": "n/a", "no-telnet": "pass"}
+    assert result["failures"] == {"no-rw": ["snmp-server community public rw"], "ntp": ["missing"],
+                                  "acl": ["interface Ethernet2"]}
+
+def test_forbid_in_section_reports_the_section():
+    rules = compliance.compile_rules([{"id": "no-shut", "section": "interface", "forbid": "^shutdown$"}])
+    config = "interface Ethernet1\n   shutdown\ninterface Ethernet2\n   no shutdown\n"
+    assert compliance.check_config("r1", config, rules)["failures"] == {"no-shut": ["interface Ethernet1 > shutdown"]}
+
+def test_section_match_selects_sections_by_regex():
+    config = ("interface Ethernet1\n   shutdown\ninterface Ethernet10\n   shutdown\n"
+              "interface Ethernet2\n   no shutdown\ninterface Loopback0\n   shutdown\n")
+    rules = compliance.compile_rules([
+        {"id": "et1x", "section_match": r"^interface Ethernet1\d*$", "forbid": "^shutdown$"},
+        {"id": "et-any", "section": "interface", "section_match": r"^interface Ethernet\d", "forbid": "^shutdown$"},
+        {"id": "none", "section_match": "^interface Port-Channel", "require": "^mtu "},
+    ])
+    result = compliance.check_config("r1", config, rules)
+    assert result["failures"]["et1x"] == ["interface Ethernet1 > shutdown", "interface Ethernet10 > shutdown"]
+    assert result["failures"]["et-any"] == ["interface Ethernet1 > shutdown", "interface Ethernet10 > shutdown"]
+    assert result["status"]["none"] == "n/a"
+    assert compliance.Rule(rules[1].to_dict()).section_match.pattern == r"^interface Ethernet\d"
+
+def test_process_pool_matches_in_process(monkeypatch):
+    rules = compliance.compile_rules(RULES)
+    configs = {f"r{i}": CONFIG.replace("hostname r1", f"hostname r{i}") + ("ntp server 10.0.0.9\n" if i % 2 else "")
+               for i in range(20)}
+    serial = compliance.run_compliance(configs, rules, max_workers=1)
+    monkeypatch.setattr(compliance, "POOL_THRESHOLD", 1)
+    pooled = compliance.run_compliance(configs, rules, max_workers=2)
+    assert pooled == serial
+    grid = compliance.matrix(pooled, rules)
+    assert list(grid) == list(configs)
+    assert grid["r1"]["ntp"] == "pass" and grid["r2"]["ntp"] == "fail"
+
+def test_matrix_csv(tmp_path):
+    rules = compliance.compile_rules(RULES)
+    results = compliance.run_compliance({"r1": CONFIG}, rules)
+    compliance.write_matrix_csv(tmp_path / "matrix.csv", results, rules)
+    assert (tmp_path / "matrix.csv").read_text().splitlines() == [
+        "Hostname,no-rw,no-aaa-root,ntp,eapi,acl,bgp-md5,no-telnet",
+        "r1,fail,pass,fail,pass,fail,n/a,pass",
+    ]
+
+def test_load_golden_configs_from_store_and_legacy_files(tmp_path):
+    store = golden_store.GoldenStore(str(tmp_path))
+    store.save("r1", "hostname r1-old\n")
+    store.save("r1", "hostname r1\n")
+    store.close()
+    (tmp_path / "r1_golden_20250101_000000.cfg").write_text("hostname ignored\n")
+    (tmp_path / "s1_golden_20250101_000000.cfg").write_text("hostname s1-old\n")
+    (tmp_path / "s1_golden_20250201_000000.cfg").write_text("hostname s1\n")
+    assert compliance.load_golden_configs(str(tmp_path)) == {"r1": "hostname r1\n", "s1": "hostname s1\n"}
+
+def test_shipped_rules_load():
+    rules = compliance.load_rules()
+    assert "snmp-no-rw-community" in [r.id for r in rules]
+
+def test_shipped_ethernet_acl_rule_covers_every_ethernet_port():
+    (rule,) = [r for r in compliance.load_rules() if r.id == "ethernet-acl"]
+    config = "".join(f"interface {name}\n   no switchport\n" for name in ("Ethernet1", "Ethernet10", "Loopback0"))
+    assert compliance.check_config("r1", config, [rule])["failures"] == {
+        "ethernet-acl": ["interface Ethernet1", "interface Ethernet10"]}
@@ -0,0 +1,84 @@
+from pythonscripts import config_diff as cd
+
+GOLDEN = """! Command: show running-config
+hostname r1
+!
+interface Ethernet1
+   description uplink
+   ip address 10.0.10.1/30
+!
+interface Ethernet2
+   shutdown
+!
+router bgp 65000
+   neighbor 10.0.10.2 remote-as 65001
+   address-family ipv4
+      neighbor 10.0.10.2 activate
+!
+end
+"""
+
+RUNNING = """hostname r1
+!
+interface Ethernet1
+   description uplink
+   ip address 10.0.10.5/30
+!
+interface Ethernet2
+   shutdown
+!
+interface Ethernet3
+   no switchport
+!
+router bgp 65000
+   neighbor 10.0.10.2 remote-as 65001
+   address-family ipv4
+      neighbor 10.0.10.2 activate
+      network 10.0.0.0/8
+!
+end
+"""
+
+
+# ------------------------------
+# Test: parsing
+# ------------------------------
+def test_parse_sections_builds_hierarchy():
+    root = cd.parse_sections(GOLDEN)
+    assert [c.line for c in root.children] == ["hostname r1", "interface Ethernet1", "interface Ethernet2",
+                                               "router bgp 65000", "end"]
+    bgp = root.children[3]
+    assert bgp.children[1].line == "address-family ipv4"
+    assert bgp.children[1].children[0].line == "neighbor 10.0.10.2 activate"
+
+def test_identical_configs_have_equal_digests():
+    assert cd.parse_sections(GOLDEN).digest == cd.parse_sections(GOLDEN.replace("!\n", "")).digest
+    assert cd.diff_configs(GOLDEN, GOLDEN) == []
+
+
+# ------------------------------
+# Test: diff
+# ------------------------------
+def test_diff_reports_changes_with_parent_context():
+    changes = cd.diff_configs(GOLDEN, RUNNING)
+    assert ("-", ("interface Ethernet1",), "ip address 10.0.10.1/30") in changes
+    assert ("+", ("interface Ethernet1",), "ip address 10.0.10.5/30") in changes
+    assert ("+", (), "interface Ethernet3") in changes
+    assert ("+", ("interface Ethernet3",), "no switchport") in changes
+    assert ("+", ("router bgp 65000", "address-family ipv4"), "network 10.0.0.0/8") in changes
+    assert not any(path == ("interface Ethernet2",) for _, path, _ in changes)
+
+def test_same_child_line_in_different_sections_is_not_confused():
+    golden = "interface Ethernet1\n   shutdown\ninterface Ethernet2\n   no shutdown\n"
+    running = "interface Ethernet1\n   no shutdown\ninterface Ethernet2\n   shutdown\n"
+    changes = cd.diff_configs(golden, running)
+    assert len(changes) == 4
+
+def test_format_diff_prints_context_once():
+    text = cd.format_diff(cd.diff_configs(GOLDEN, RUNNING))
+    assert text.splitlines()[:3] == [
+        "  interface Ethernet1",
+        "-    ip address 10.0.10.1/30",
+        "+    ip address 10.0.10.5/30",
+    ]
+    assert "  router bgp 65000\n     address-family ipv4\n+       network 10.0.0.0/8" in text
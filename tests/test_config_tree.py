@@ -0,0 +1,75 @@
+import pytest
+from pythonscripts import config_tree as ct
+
+CONFIG = """\
+hostname r1
+!
+interface Ethernet1
+   description uplink
+   ip address 10.0.0.1/30
+!
+interface Ethernet2
+   shutdown
+!
+interface Loopback0
+   ip address 1.1.1.1/32
+!
+router bgp 65000
+   router-id 1.1.1.1
+   neighbor 10.0.0.2 remote-as 65001
+   neighbor 10.0.0.2 description r2
+   neighbor 10.0.0.6 remote-as 65002
+   neighbor 10.0.0.20 remote-as 65003
+   !
+   address-family ipv4
+      neighbor 10.0.0.2 activate
+      network 1.1.1.1/32
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ct.clear_cache()
+
+
+def test_exact_path_lookup():
+    tree = ct.parse(CONFIG)
+    assert tree.children("interface Ethernet2") == ["shutdown"]
+    assert tree.children("router bgp 65000 > address-family ipv4") == ["neighbor 10.0.0.2 activate",
+                                                                      "network 1.1.1.1/32"]
+    assert tree.get(("router bgp 65000", "router-id 1.1.1.1")).children == []
+    assert "interface Ethernet9" not in tree
+    assert tree.children("interface Ethernet9") == []
+    assert tree.line_count == 17
+
+def test_keyword_lookup():
+    tree = ct.parse(CONFIG)
+    assert [s.line for s in tree.find("interface")] == ["interface Ethernet1", "interface Ethernet2",
+                                                        "interface Loopback0"]
+    assert [s.line for s in tree.find("router bgp 65000 > neighbor")] == [
+        "neighbor 10.0.0.2 remote-as 65001", "neighbor 10.0.0.2 description r2", "neighbor 10.0.0.6 remote-as 65002",
+        "neighbor 10.0.0.20 remote-as 65003"]
+    assert [s.line for s in tree.find("router bgp 65000 > neighbor 10.0.0.2")] == [
+        "neighbor 10.0.0.2 remote-as 65001", "neighbor 10.0.0.2 description r2"]
+    assert tree.find("router ospf 1 > network") == []
+
+def test_keyword_lookup_matches_whole_words():
+    tree = ct.parse(CONFIG + "interface Ethernet10\n   shutdown\ninterface Ethernet11\n")
+    assert [s.line for s in tree.find("interface Ethernet1")] == ["interface Ethernet1"]
+    assert [s.line for s in tree.find("interface Ethernet")] == []
+
+def test_nodes_are_compact():
+    node = ct.parse(CONFIG).get("interface Ethernet1")
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.extra = 1
+
+def test_parse_is_memoised_per_config():
+    tree = ct.parse(CONFIG)
+    assert ct.parse(CONFIG) is tree
+    changed = ct.parse(CONFIG.replace("shutdown", "no shutdown"))
+    assert changed is not tree and changed.digest != tree.digest
+    assert ct.parse(CONFIG, cache=False) is not tree
+
+def test_digest_ignores_comments_and_blank_lines():
+    assert ct.parse(CONFIG).digest == ct.parse(CONFIG.replace("!\n", "\n")).digest
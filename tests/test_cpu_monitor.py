@@ -0,0 +1,83 @@
+import json
+import time
+import urllib.request
+import pytest
+from unittest.mock import patch
+from pythonscripts import cpu_monitor as cm
+
+
+# ------------------------------
+# Test: RingBuffer
+# ------------------------------
+def test_ring_buffer_wraps_at_capacity():
+    buf = cm.RingBuffer(4)
+    for i in range(10):
+        buf.append(float(i), float(i * 10))
+    assert buf.count == 4
+    assert sorted(buf.values) == [60.0, 70.0, 80.0, 90.0]
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_ring_buffer_window_stats(use_numpy):
+    buf = cm.RingBuffer(100)
+    for i in range(1, 21):
+        buf.append(float(i), float(i))
+
+    with patch.object(cm, "np", cm.np if use_numpy else None):
+        if use_numpy and cm.np is None:
+            pytest.skip("numpy not installed")
+        stats = buf.stats(since=11)
+        empty = buf.stats(since=100)
+
+    assert stats == {"mean": 15.5, "p95": 19.55, "max": 20.0, "samples": 10}
+    assert empty is None
+
+def test_capacity_covers_largest_window():
+    assert cm.capacity_for({"1m": 60, "5m": 300}, 10) == 31
+
+
+# ------------------------------
+# Test: CPUStore and API
+# ------------------------------
+def test_store_keeps_device_and_core_series():
+    store = cm.CPUStore(capacity=10)
+    for t in range(5):
+        store.record("10.0.100.2", 1000.0 + t, 40.0, [30, 50])
+
+    stats = store.stats({"1m": 60}, now=1004.0)["10.0.100.2"]
+    assert stats["avg"]["1m"]["samples"] == 5
+    assert stats["cores"]["2"]["1m"]["max"] == 50.0
+
+def test_api_serves_window_stats():
+    store = cm.CPUStore(capacity=10)
+    store.record("10.0.100.2", time.time(), 40.0, [40])
+    server = cm.start_api(store, {"1m": 60, "5m": 300}, port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/stats/10.0.100.2?window=1m") as resp:
+            body = json.load(resp)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert list(body) == ["10.0.100.2"]
+    assert list(body["10.0.100.2"]["avg"]) == ["1m"]
+
+def test_run_daemon_records_each_poll():
+    results = [{"ip": "10.0.100.2", "avg": 20.0, "cores": [20.0], "latency": 0.01, "error": None}]
+    store = cm.run_daemon([{}], lambda devices: results, interval=0.01, port=0, iterations=3)
+    assert store.stats({"1m": 60})["10.0.100.2"]["avg"]["1m"]["samples"] == 3
+
+def test_run_daemon_resyncs_after_a_slow_poll():
+    import time
+    starts = []
+    results = [{"ip": "10.0.100.2", "avg": 20.0, "cores": [20.0], "latency": 0.01, "error": None}]
+
+    def poll(devices):
+        starts.append(time.monotonic())
+        if len(starts) == 1:
+            time.sleep(0.15)  # Overruns five intervals
+        return results
+
+    cm.run_daemon([{}], poll, interval=0.03, port=0, iterations=4)
+    gaps = [b - a for a, b in zip(starts[1:], starts[2:])]
+    assert min(gaps) >= 0.02  # No back-to-back catch-up polls
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+from pythonscripts import credential_store
+
+CSV = "Device,Hostname,Username,New_Password\n10.0.0.1,r1,admin,pw1\n10.0.0.10,R10,admin,pw10\n10.0.0.2,N/A,admin,pw2\n"
+
+
+@pytest.fixture
+def path(tmp_path):
+    p = tmp_path / "rotated_passwords.csv"
+    p.write_text(CSV)
+    return str(p)
+
+
+# ------------------------------
+# Test: lookups
+# ------------------------------
+def test_lookup_by_ip_and_hostname(path):
+    store = credential_store.CredentialStore(path)
+    assert store.get("10.0.0.1")["password"] == "pw1"
+    assert store.get("r10")["ip"] == "10.0.0.10"
+    assert store.get(" R1 ")["ip"] == "10.0.0.1"
+    assert store.by_hostname("r1")["ip"] == "10.0.0.1"
+    assert store.by_ip("r1") is None
+    assert store.get("N/A") is None  # placeholder hostnames are not indexed
+    assert store.get("r2") is None
+    assert [d["ip"] for d in store.devices()] == ["10.0.0.1", "10.0.0.10", "10.0.0.2"]
+
+def test_returned_records_are_copies(path):
+    store = credential_store.CredentialStore(path)
+    store.get("r1")["password"] = "changed"
+    assert store.get("r1")["password"] == "pw1"
+
+
+# ------------------------------
+# Test: reload on change
+# ------------------------------
+def test_reads_file_only_when_it_changes(path, monkeypatch):
+    store = credential_store.CredentialStore(path)
+    reads = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **kw: reads.append(a[0]) or real_open(*a, **kw))
+    for _ in range(5):
+        store.get("r1")
+    assert len(reads) == 1
+
+    with real_open(path, "w") as f:
+        f.write(CSV.replace("pw1", "rotated-and-longer"))
+    assert store.get("r1")["password"] == "rotated-and-longer"
+    assert len(reads) == 2
+
+def test_save_is_atomic_and_seen_by_other_stores(path):
+    writer = credential_store.CredentialStore(path)
+    reader = credential_store.CredentialStore(path)
+    assert reader.get("r1")["password"] == "pw1"
+    records = writer.devices()
+    records[0]["password"] = "new"
+    writer.save(records)
+    assert not os.path.exists(path + ".tmp")
+    assert reader.get("r1")["password"] == "new"
+    assert reader.get("10.0.0.2")["hostname"] == "N/A"
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        credential_store.CredentialStore(str(tmp_path / "missing.csv")).devices()
+
+def test_get_store_is_shared(path):
+    assert credential_store.get_store(path) is credential_store.get_store(path)
@@ -147,3 +147,41 @@ def test_main_no_credentials(mock_file, mock_args, capsys):
         captured = capsys.readouterr()
         assert "No credentials found" in captured.out
         mock_exit.assert_called_once_with(1)
+
+
+# ------------------------------
+# Test: output callback
+# ------------------------------
+@patch("builtins.open", new_callable=mock_open, read_data="Device,Hostname,Username,New_Password\nrouter1,router1,admin,pass123\n")
+@patch("pythonscripts.device_health_check.ConnectHandler")
+def test_run_health_check_sends_output_to_log(mock_connect, mock_file, capsys):
+    mock_conn = MagicMock()
+    mock_conn.send_command.return_value = "Success rate is 100 percent"
+    mock_connect.return_value = mock_conn
+    lines = []
+
+    assert dhc.run_health_check("router1", log=lines.append)
+    assert "✅ Ping test successful" in lines
+    assert lines[-1] == "\n✅ All tests completed for router1"
+    assert capsys.readouterr().out == ""
+
+@patch("builtins.open", new_callable=mock_open, read_data="Device,Hostname,Username,New_Password\nrouter1,router1,admin,pass123\n")
+@patch("pythonscripts.device_health_check.ConnectHandler")
+def test_collect_health_returns_structured_result(mock_connect, mock_file):
+    mock_conn = MagicMock()
+    mock_conn.send_command.side_effect = [
+        "Success rate is 100 percent", "Success rate is 100 percent",  # ping
+        "routing table output", [{"neighbor": "R2"}],                   # routes, OSPF neighbors
+        "12.5",                                                         # CPU
+    ]
+    mock_connect.return_value = mock_conn
+
+    result = dhc.collect_health("router1", log=lambda *a: None)
+    assert result["completed"] and result["healthy"]
+    assert result["ping"]["ok"]
+    assert result["routing"]["neighbors"] == [{"neighbor": "R2"}]
+    assert result["cpu"] == {"ok": True, "cpu": 12.5, "error": None}
+
+    lines = []
+    dhc.format_health(result, lines.append)
+    assert "✅ CPU utilization OK (12.50%)" in lines
@@ -0,0 +1,124 @@
+import pytest
+from netmiko import ConnectHandler
+from pythonscripts import config_tree
+from pythonscripts import device_simulator as ds
+from pythonscripts import eapi
+from pythonscripts import parsers
+
+
+@pytest.fixture
+def simulator():
+    with ds.DeviceSimulator(3, eapi=True) as sim:
+        yield sim
+
+
+def netmiko_params(device, password="admin"):
+    return {"device_type": "arista_eos", "host": device.host, "port": device.ssh_port,
+            "username": "admin", "password": password}
+
+
+def eapi_client(device, password="admin"):
+    return eapi.EAPIClient(device.host, "admin", password, transport="http", port=device.eapi_port,
+                           pool=eapi.HTTPConnectionPool(timeout=5))
+
+
+# ------------------------------
+# Test: generated device data
+# ------------------------------
+def test_generated_output_parses_and_ring_is_consistent():
+    first, second = ds.VirtualDevice(0, 3), ds.VirtualDevice(1, 3)
+    brief = parsers.parse("show ip interface brief", first.execute("show ip interface brief"), cache=None)
+    assert [r.name for r in brief] == ["Ethernet1", "Ethernet2", "Ethernet3", "Ethernet4", "Loopback0"]
+    assert parsers.parse("show ipv6 interface brief", first.execute("show ipv6 interface brief"), cache=None)
+
+    # r1 Ethernet1 and r2 Ethernet2 are the two ends of one /31
+    ospf = parsers.parse("show ip ospf neighbor", first.execute("show ip ospf neighbor"), cache=None)
+    assert ospf[0].neighbor_id == second.router_id
+    assert ospf[0].address == second.interfaces[1]["address"].split("/")[0]
+    lldp = parsers.parse("show lldp neighbors", second.execute("show lldp neighbors"), cache=None)
+    assert ("r1", "Ethernet1") in [(n.neighbor_id, n.remote_port) for n in lldp]
+
+    routes = {r.prefix: r for r in parsers.parse("show ip route", first.execute("show ip route"), cache=None)}
+    assert routes[f"{second.router_id}/32"].next_hops == (ospf[0].address,)
+
+def test_pipe_filters_and_invalid_input():
+    device = ds.VirtualDevice(0, 2)
+    assert device.execute("show interfaces description | include Lo").splitlines() == [
+        "Lo0                            up             up                 router-id"]
+    assert "Interface" not in device.execute("show ip interface brief | exclude Interface")
+    assert "0% packet loss" in device.execute("ping 8.8.8.8 repeat 2")
+    with pytest.raises(ds.CommandError):
+        device.execute("show bogus")
+    with pytest.raises(ds.CommandError) as err:
+        device.execute_json("show running-config")
+    assert err.value.code == 1003
+
+def test_cli_session_config_mode_changes_device():
+    device = ds.VirtualDevice(0, 2)
+    session = ds.CLISession(device)
+    assert session.handle("terminal length 0") == "Pagination disabled."
+    session.handle("configure terminal")
+    assert session.prompt == "r1(config)#"
+    session.handle("username admin secret 0 rotated")
+    session.handle("interface Ethernet3")
+    assert session.prompt == "r1(config-if-Et3)#"
+    session.handle("shutdown")
+    session.handle("exit")
+    session.handle("hostname core1")
+    session.handle("end")
+    assert session.prompt == "core1#"
+    assert session.handle("copy running-config startup-config") == "Copy completed successfully."
+
+    assert device.authenticate("admin", "rotated") and not device.authenticate("admin", "admin")
+    tree = config_tree.parse(device.execute("show startup-config"), cache=False)
+    assert tree.children("interface Ethernet3")[-1] == "shutdown"
+    assert "hostname core1" in tree
+
+
+# ------------------------------
+# Test: SSH and eAPI front ends
+# ------------------------------
+def test_netmiko_session_and_password_rotation(simulator):
+    device = simulator.devices[0]
+    conn = ConnectHandler(**netmiko_params(device))
+    try:
+        assert conn.find_prompt() == "r1#"
+        output = conn.send_command("show ip interface brief")
+        assert [r.name for r in parsers.parse("show ip interface brief", output, cache=None)][0] == "Ethernet1"
+        conn.send_config_set(["username admin secret newpass"])
+        conn.save_config()
+    finally:
+        conn.disconnect()
+    assert device.authenticate("admin", "newpass")
+    assert simulator.stats()["commands"] > 0
+
+def test_eapi_json_text_and_errors(simulator):
+    device = simulator.devices[1]
+    client = eapi_client(device)
+    hostname, brief = client.run_cmds(["show hostname", "show ip interface brief"])
+    assert hostname["hostname"] == "r2"
+    assert brief["interfaces"]["Ethernet1"]["interfaceAddress"]["ipAddr"]["maskLen"] == 31
+    assert "router ospf 1" in client.run_text(["show running-config"])[0]
+    with pytest.raises(eapi.EAPIError) as err:
+        client.run_cmds(["show hostname", "show bogus"])
+    assert err.value.code == 1002 and err.value.data[0]["hostname"] == "r2"
+    with pytest.raises(ConnectionError):
+        eapi_client(device, password="wrong").run("show hostname")
+
+def test_down_devices_and_dropped_requests():
+    with ds.DeviceSimulator(2, eapi=True, drop_rate=1.0) as sim:
+        sim.devices[0].down = True
+        with pytest.raises(ConnectionError):
+            eapi_client(sim.devices[0]).run("show hostname")
+        with pytest.raises(ConnectionError):
+            eapi_client(sim.devices[1]).run("show hostname")
+        stats = sim.stats()
+    assert stats["rejected"] == 1 and stats["dropped"] >= 1
+
+def test_inventory_csv(simulator, tmp_path):
+    import csv
+    path = simulator.write_inventory(str(tmp_path / "devices.csv"))
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert [r["Hostname"] for r in rows] == ["r1", "r2", "r3"]
+    assert rows[0]["Port"] == str(simulator.devices[0].ssh_port)
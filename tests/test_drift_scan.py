@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+from pythonscripts import drift_scan, golden_store
+
+GOLDEN = "hostname {name}\ninterface Ethernet1\n   ip address 10.0.10.1/30\n"
+
+
+@pytest.fixture
+def golden(tmp_path):
+    g = golden_store.GoldenStore(str(tmp_path / "golden"))
+    g.save("r1", "hostname old\n")
+    g.save("r1", GOLDEN.format(name="r1"))
+    g.save("r10", GOLDEN.format(name="r10"))
+    yield g
+    g.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = drift_scan.DriftStore(str(tmp_path / "devices.db"))
+    yield s
+    s.close()
+
+
+def device(name, ip):
+    return {"device_ip": ip, "device_name": name, "username": "admin", "password": "pw"}
+
+
+# ------------------------------
+# Test: per-device check
+# ------------------------------
+def test_check_device_statuses(golden):
+    running = {"10.0.0.1": GOLDEN.format(name="r1"),
+               "10.0.0.10": GOLDEN.format(name="r10").replace("10.0.10.1/30", "10.0.10.5/30")}
+
+    def fetch(dev):
+        if dev["device_ip"] not in running:
+            raise ConnectionError("timed out")
+        return running[dev["device_ip"]]
+
+    assert drift_scan.check_device(device("r1", "10.0.0.1"), golden, fetch)["status"] == drift_scan.IN_SYNC
+    drifted = drift_scan.check_device(device("r10", "10.0.0.10"), golden, fetch)
+    assert (drifted["status"], drifted["added"], drifted["removed"]) == (drift_scan.DRIFT, 1, 1)
+    assert "+    ip address 10.0.10.5/30" in drifted["diff"]
+    assert drift_scan.check_device(device("r2", "10.0.0.2"), golden, fetch)["status"] == drift_scan.NO_GOLDEN
+    failed = drift_scan.check_device(device("r1", "10.0.0.99"), golden, fetch)
+    assert (failed["status"], failed["error"]) == (drift_scan.ERROR, "timed out")
+
+
+# ------------------------------
+# Test: fleet scan
+# ------------------------------
+def test_run_scan_is_concurrent_and_stored(golden, store):
+    devices = [device("r1", f"10.0.1.{i}") for i in range(50)]
+
+    def slow_fetch(dev):
+        time.sleep(0.2)
+        return GOLDEN.format(name="r1")
+
+    started = time.monotonic()
+    results = drift_scan.run_scan(devices, store, golden, slow_fetch, max_workers=64)
+    assert time.monotonic() - started < 2  # 50 x 0.2s sequentially would be 10s
+    assert len(results) == 50
+
+    scan = store.last_scan()
+    assert (scan["devices"], scan["drifted"], scan["errors"]) == (50, 0, 0)
+    assert scan["finished_at"] is not None
+    stored = store.results()
+    assert len(stored) == 1  # Latest result per hostname
+    assert stored[0]["status"] == drift_scan.IN_SYNC
+
+def test_results_list_drifted_devices_first(golden, store):
+    devices = [device("r1", "10.0.0.1"), device("r10", "10.0.0.10"), device("r2", "10.0.0.2")]
+    drift_scan.run_scan(devices, store, golden, lambda dev: "hostname changed\n")
+    assert [r["status"] for r in store.results()] == [drift_scan.DRIFT, drift_scan.DRIFT, drift_scan.NO_GOLDEN]
+    assert "+ hostname changed" in store.result("R10")["diff"]
+
+def test_scanner_runs_one_scan_at_a_time(golden, store):
+    release = threading.Event()
+
+    def blocking_fetch(dev):
+        release.wait(5)
+        return GOLDEN.format(name="r1")
+
+    scanner = drift_scan.DriftScanner(store, golden, load=lambda: [device("r1", "10.0.0.1")],
+                                      fetch=blocking_fetch)
+    assert scanner.trigger()
+    assert scanner.running
+    assert not scanner.trigger()
+    release.set()
+    scanner.wait(5)
+    assert not scanner.running
+    assert store.result("r1")["status"] == drift_scan.IN_SYNC
+
+def test_back_to_back_triggers_start_one_scan(golden, store):
+    release = threading.Event()
+    fetched = []
+
+    def blocking_fetch(dev):
+        fetched.append(dev["device_name"])
+        release.wait(5)
+        return GOLDEN.format(name="r1")
+
+    scanner = drift_scan.DriftScanner(store, golden, load=lambda: [device("r1", "10.0.0.1")],
+                                      fetch=blocking_fetch)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scanner.trigger())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [False] * 7 + [True]
+    release.set()
+    scanner.wait(5)
+    assert fetched == ["r1"]
@@ -88,3 +88,85 @@ def test_collect_ipam_connection_error(mock_file, mock_read, mock_connect):
     # Should print error but not raise
     dia.collect_ipam()
     mock_connect.assert_called_once()
+
+
+# -----------------------------
+# Test: incremental collection
+# -----------------------------
+def test_collect_ipam_incremental_touches_changed_devices_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(dia, "OUTPUT_FILE", str(tmp_path / "dynamic_ipam.csv"))
+    monkeypatch.setattr(dia, "STATE_FILE", str(tmp_path / "state.json"))
+    devices = [
+        {"host": f"10.0.0.{i}", "hostname": f"r{i}", "username": "admin", "password": "pass123"}
+        for i in range(1, 4)
+    ]
+    monkeypatch.setattr(dia, "read_device_passwords", lambda: devices)
+    fingerprints = {dev["host"]: "v1" for dev in devices}
+    monkeypatch.setattr(dia, "fingerprint_devices", lambda devs: dict(fingerprints))
+
+    collected = []
+    def fake_rows(dev, pool=None):
+        collected.append(dev["host"])
+        return [[dev["hostname"], dev["host"], "Ethernet1", f"{dev['host']}/30", "IPv4"]]
+    monkeypatch.setattr(dia, "collect_device_rows", fake_rows)
+
+    dia.collect_ipam(incremental=True)
+    assert sorted(collected) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    # Nothing changed: no device is logged into
+    collected.clear()
+    dia.collect_ipam(incremental=True)
+    assert collected == []
+
+    # One interface change: only that device is re-collected, others keep their rows
+    collected.clear()
+    fingerprints["10.0.0.2"] = "v2"
+    dia.collect_ipam(incremental=True)
+    assert collected == ["10.0.0.2"]
+
+    with open(dia.OUTPUT_FILE) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "Hostname,Device,Interface,IP Address,IP Version"
+    assert [line.split(",")[1] for line in lines[1:]] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+def test_collect_ipam_incremental_keeps_rows_of_failed_device(tmp_path, monkeypatch):
+    monkeypatch.setattr(dia, "OUTPUT_FILE", str(tmp_path / "dynamic_ipam.csv"))
+    monkeypatch.setattr(dia, "STATE_FILE", str(tmp_path / "state.json"))
+    (tmp_path / "dynamic_ipam.csv").write_text(
+        "Hostname,Device,Interface,IP Address,IP Version\nr1,10.0.0.1,Ethernet1,10.0.0.1/30,IPv4\n")
+    monkeypatch.setattr(dia, "read_device_passwords", lambda: [
+        {"host": "10.0.0.1", "hostname": "r1", "username": "admin", "password": "pass123"}])
+    monkeypatch.setattr(dia, "fingerprint_devices", lambda devs: {"10.0.0.1": None})
+    monkeypatch.setattr(dia, "collect_device_rows", lambda dev, pool=None: None)
+
+    dia.collect_ipam(incremental=True)
+
+    assert "10.0.0.1/30" in (tmp_path / "dynamic_ipam.csv").read_text()
+    assert dia.load_state() == {}
+
+
+# -----------------------------
+# Test: header and separator rows are not written as data
+# -----------------------------
+@patch("pythonscripts.dynamic_ipam.ConnectHandler")
+def test_collect_device_rows_skips_table_headers(mock_connect):
+    mock_conn = MagicMock()
+    mock_conn.send_command.side_effect = [
+        "                              Address\n"
+        "Interface         IP Address            Status       Protocol           MTU    Owner\n"
+        "----------------- --------------------- ------------ -------------- ---------- -------\n"
+        "Ethernet1         10.0.0.1/30           up           up                 1500\n",
+        "   Interface       Status        MTU       IPv6 Address                     Addr State    Addr Source\n"
+        "--------------- ------------ ---------- -------------------------------- ---------------- -----------\n"
+        "   Et1             up            1500      fe80::1/64                       up            link local\n"
+        "                                           2001:db8::1/64                   up            config\n",
+        "Lo0                            up             up                 router-id\n",
+    ]
+    mock_connect.return_value = mock_conn
+
+    rows = dia.collect_device_rows({"host": "10.0.0.1", "hostname": "router1", "username": "admin", "password": "x"})
+    assert rows == [
+        ["router1", "10.0.0.1", "Ethernet1", "10.0.0.1/30", "IPv4"],
+        ["router1", "10.0.0.1", "Et1", "2001:db8::1/64", "IPv6"],
+        ["router1", "10.0.0.1", "Lo0", "Loopback", "N/A"],
+    ]
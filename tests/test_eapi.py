@@ -0,0 +1,183 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from pythonscripts import device_health_check as dhc
+from pythonscripts import dynamic_ipam as dia
+from pythonscripts import eapi
+
+JSON_OUTPUT = {
+    "show hostname": {"hostname": "r1", "fqdn": "r1"},
+    "show ip route": {"vrfs": {"default": {"routes": {"10.0.0.0/30": {}, "0.0.0.0/0": {}}}}},
+    "show ip ospf neighbor": {"vrfs": {"default": {"instList": {"1": {"ospfNeighborEntries": [
+        {"routerId": "2.2.2.2", "adjacencyState": "full"}]}}}}},
+    "show lldp neighbors": {"lldpNeighbors": []},
+    "show processes top once": {"cpuInfo": {"%Cpu(s)": {"user": 3.5, "system": 1.0, "nice": 0.5, "idle": 95.0}}},
+    "show ip interface brief": {"interfaces": {
+        "Ethernet1": {"interfaceAddress": {"ipAddr": {"address": "10.0.0.1", "maskLen": 30}}},
+        "Ethernet2": {"interfaceAddress": {"ipAddr": {"address": "0.0.0.0", "maskLen": 0}}}}},
+    "show ipv6 interface": {"interfaces": {
+        "Ethernet1": {"addresses": [{"address": "2001:db8::1", "subnet": "2001:db8::/64"}]}}},
+    "show interfaces description": {"interfaceDescriptions": {
+        "Ethernet1": {"description": "uplink"}, "Loopback0": {"description": ""}}},
+}
+TEXT_OUTPUT = {
+    "ping 198.100.100.2": "5 packets transmitted, 5 received, 0% packet loss",
+    "ping ipv6 2003:db8::1": "5 packets transmitted, 5 received, 0% packet loss",
+}
+AUTH = "Basic " + base64.b64encode(b"admin:secret").decode()
+
+
+class FakeEAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        if self.server.drop_replies:
+            # Read (and "executed") the batch, then the session dies before the reply
+            self.server.drop_replies -= 1
+            self.close_connection = True
+            return
+        if self.headers.get("Authorization") != AUTH:
+            self.send_response(401)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        params = body["params"]
+        results = []
+        reply = {"jsonrpc": "2.0", "id": body["id"]}
+        for cmd in params["cmds"]:
+            if cmd == "enable":
+                results.append({})
+            elif params["format"] == "text" and cmd in TEXT_OUTPUT:
+                results.append({"output": TEXT_OUTPUT[cmd]})
+            elif params["format"] == "json" and cmd in JSON_OUTPUT:
+                results.append(JSON_OUTPUT[cmd])
+            else:
+                reply["error"] = {"code": 1002, "message": f"CLI command {len(results) + 1} of "
+                                  f"{len(params['cmds'])} '{cmd}' failed: invalid command", "data": results}
+                break
+        else:
+            reply["result"] = results
+        data = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        # Drop the keep-alive session without telling the client, like a device idle timeout
+        self.close_connection = self.server.drop_idle
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FakeEAPIHandler)
+    srv.connections = 0
+    srv.requests = []
+    srv.drop_idle = False
+    srv.drop_replies = 0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client(server):
+    pool = eapi.HTTPConnectionPool()
+    yield eapi.EAPIClient("127.0.0.1", "admin", "secret", transport="http",
+                          port=server.server_address[1], pool=pool)
+    pool.close_all()
+
+
+# ------------------------------
+# Test: client
+# ------------------------------
+def test_batch_runs_in_one_request(client, server):
+    routes, top = client.run_cmds(["show ip route", "show processes top once"], enable=True)
+    assert "10.0.0.0/30" in routes["vrfs"]["default"]["routes"]
+    assert top["cpuInfo"]["%Cpu(s)"]["idle"] == 95.0
+    assert len(server.requests) == 1
+    assert server.requests[0]["params"]["cmds"] == ["enable", "show ip route", "show processes top once"]
+
+def test_keep_alive_connection_is_reused(client, server):
+    for _ in range(5):
+        client.run("show hostname")
+    assert server.connections == 1
+    assert client.pool.stats()["reused"] == 4
+
+def test_reconnects_when_idle_connection_was_closed(client, server):
+    server.drop_idle = True
+    client.run("show hostname")
+    server.drop_idle = False
+    assert client.run("show hostname")["hostname"] == "r1"
+    assert server.connections == 2
+
+def test_only_read_only_batches_are_resent_after_a_lost_reply(client, server):
+    client.run("show hostname")
+    server.drop_replies = 1
+    assert client.run("show hostname")["hostname"] == "r1"
+    assert len(server.requests) == 3  # Retried on a new connection
+
+    client.run("show hostname")
+    server.drop_replies = 1
+    with pytest.raises(ConnectionError):
+        client.run_cmds(["configure", "username admin secret 0 rotated"])
+    assert len(server.requests) == 5  # The config batch went out once
+
+def test_ping_batch_is_resent_after_a_lost_reply(client, server):
+    client.run("show hostname")
+    server.drop_replies = 1
+    ipv4, ipv6 = client.run_text(["ping 198.100.100.2", "ping ipv6 2003:db8::1"])
+    assert "0% packet loss" in ipv4 and "0% packet loss" in ipv6
+    assert len(server.requests) == 3
+
+def test_command_error_raises(client):
+    with pytest.raises(eapi.EAPIError) as info:
+        client.run_cmds(["show hostname", "show bogus"])
+    assert info.value.code == 1002
+    assert "show bogus" in info.value.message
+
+def test_bad_credentials(server):
+    bad = eapi.EAPIClient("127.0.0.1", "admin", "wrong", transport="http", port=server.server_address[1],
+                          pool=eapi.HTTPConnectionPool())
+    with pytest.raises(ConnectionError, match="401"):
+        bad.run("show hostname")
+
+def test_session_adapter_runs_ssh_style_checks(client):
+    session = eapi.EAPISession(client)
+    lines = []
+    ping = dhc.check_ping(session, lines.append)
+    assert ping["ok"]
+    assert session.find_prompt() == "r1#"
+
+
+# ------------------------------
+# Test: health check and IPAM over eAPI
+# ------------------------------
+def test_collect_health_eapi(client, server):
+    result = dhc.collect_health_eapi("r1", log=lambda *a: None, client=client)
+    assert result["completed"] and result["healthy"]
+    assert result["cpu"]["cpu"] == pytest.approx(5.0)
+    assert result["routing"]["neighbors"] == [{"routerId": "2.2.2.2", "adjacencyState": "full"}]
+    assert len(server.requests) == 2  # one text batch (pings), one JSON batch
+
+def test_collect_device_rows_eapi(client, server):
+    dev = {"host": "10.0.100.1", "hostname": "r1", "username": "admin", "password": "secret"}
+    rows = dia.collect_device_rows_eapi(dev, client)
+    assert rows == [
+        ["r1", "10.0.100.1", "Ethernet1", "10.0.0.1/30", "IPv4"],
+        ["r1", "10.0.100.1", "Ethernet1", "2001:db8::1/64", "IPv6"],
+        ["r1", "10.0.100.1", "Loopback0", "Loopback", "N/A"],
+    ]
+    assert len(server.requests) == 1
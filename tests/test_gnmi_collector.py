@@ -0,0 +1,134 @@
+import asyncio
+import os
+import pytest
+
+pytest.importorskip("grpc")
+pytest.importorskip("pygnmi")
+import grpc
+from pygnmi.spec.v080 import gnmi_pb2, gnmi_pb2_grpc
+from pythonscripts import gnmi_collector as gc
+
+
+class FakeGNMIServer(gnmi_pb2_grpc.gNMIServicer):
+    """Answers every Subscribe with two CPU leaves, an interface status and a sync."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def Subscribe(self, request_iterator, context):
+        request = await request_iterator.__anext__()
+        self.requests.append((request, dict(context.invocation_metadata())))
+        yield gnmi_pb2.SubscribeResponse(update=gnmi_pb2.Notification(
+            timestamp=1, prefix=gnmi_pb2.Path(),
+            update=[
+                gnmi_pb2.Update(path=gc.parse_path("components/component[name=CPU0]/cpu/utilization/state/instant"),
+                                val=gnmi_pb2.TypedValue(uint_val=30)),
+                gnmi_pb2.Update(path=gc.parse_path("components/component[name=CPU1]/cpu/utilization/state/instant"),
+                                val=gnmi_pb2.TypedValue(json_val=b"50")),
+                gnmi_pb2.Update(path=gc.parse_path("interfaces/interface[name=Ethernet1]/state/oper-status"),
+                                val=gnmi_pb2.TypedValue(string_val="UP")),
+            ]))
+        yield gnmi_pb2.SubscribeResponse(sync_response=True)
+        await asyncio.sleep(3600)
+
+
+def make_config(address, count):
+    return {
+        "username": "admin", "password": "pranav", "insecure": True,
+        "targets": {f"r{i}": {"address": address} for i in range(count)},
+        "subscriptions": {"cpu_usage": {"paths": ["components/component/cpu"], "sample-interval": "20s"}},
+    }
+
+
+# ------------------------------
+# Test: helpers
+# ------------------------------
+def test_parse_interval():
+    assert gc.parse_interval("20s") == 20_000_000_000
+    assert gc.parse_interval("500ms") == 500_000_000
+    assert gc.parse_interval(2) == 2_000_000_000
+
+def test_parse_path_round_trip():
+    path = gc.parse_path("/interfaces/interface[name=Ethernet1]/state/oper-status")
+    assert gc.path_to_str(gnmi_pb2.Path(), path) == "/interfaces/interface[name=Ethernet1]/state/oper-status"
+
+def test_load_repo_configs():
+    config = gc.load_config(os.path.join(os.path.dirname(gc.__file__), "grpcclient.yaml"))
+    request = gc.build_subscribe_request(config)
+    assert len(config["targets"]) == 8
+    assert request.subscribe.subscription[0].sample_interval == 20_000_000_000
+
+
+# ------------------------------
+# Test: streaming against a fake server
+# ------------------------------
+def test_collector_streams_from_many_targets():
+    async def scenario():
+        server = grpc.aio.server()
+        servicer = FakeGNMIServer()
+        gnmi_pb2_grpc.add_gNMIServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+
+        collector = gc.GNMICollector(make_config(f"127.0.0.1:{port}", 100))
+        runner = asyncio.create_task(collector.run())
+        for _ in range(200):
+            if all(s == "synced" for s in collector.status.values()):
+                break
+            await asyncio.sleep(0.02)
+        collector.stop()
+        await runner
+        await server.stop(None)
+        return collector, servicer
+
+    collector, servicer = asyncio.run(scenario())
+
+    assert len(servicer.requests) == 100
+    request, metadata = servicer.requests[0]
+    assert metadata["username"] == "admin"
+    assert request.subscribe.mode == gnmi_pb2.SubscriptionList.STREAM
+    assert collector.store.cpu_by_target()["r42"] == [30, 50]
+    assert collector.store.oper_status_by_target()["r0"] == {"UP": 1}
+    assert collector.store.stats()["leaves"] == 300
+
+class BadUpdateServer(gnmi_pb2_grpc.gNMIServicer):
+    """First stream sends an undecodable JSON value, later ones a valid update and a sync."""
+
+    def __init__(self):
+        self.streams = 0
+
+    async def Subscribe(self, request_iterator, context):
+        await request_iterator.__anext__()
+        self.streams += 1
+        value = gnmi_pb2.TypedValue(json_val=b"{not json" if self.streams == 1 else b"40")
+        yield gnmi_pb2.SubscribeResponse(update=gnmi_pb2.Notification(
+            timestamp=1, prefix=gnmi_pb2.Path(),
+            update=[gnmi_pb2.Update(path=gc.parse_path("components/component[name=CPU0]/cpu/utilization/state/instant"),
+                                    val=value)]))
+        yield gnmi_pb2.SubscribeResponse(sync_response=True)
+        await asyncio.sleep(3600)
+
+def test_collector_reconnects_after_non_grpc_errors(monkeypatch):
+    monkeypatch.setattr(gc, "RECONNECT_MIN", 0.05)
+
+    async def scenario():
+        server = grpc.aio.server()
+        servicer = BadUpdateServer()
+        gnmi_pb2_grpc.add_gNMIServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+
+        collector = gc.GNMICollector(make_config(f"127.0.0.1:{port}", 1))
+        runner = asyncio.create_task(collector.run())
+        for _ in range(200):
+            if collector.status["r0"] == "synced":
+                break
+            await asyncio.sleep(0.02)
+        collector.stop()
+        await runner
+        await server.stop(None)
+        return collector, servicer
+
+    collector, servicer = asyncio.run(scenario())
+    assert servicer.streams == 2
+    assert collector.store.cpu_by_target()["r0"] == [40]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from pythonscripts import golden_store
+
+CONFIG = "hostname r1\n" + "interface Ethernet1\n   description uplink\n" * 200
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = golden_store.GoldenStore(str(tmp_path))
+    yield s
+    s.close()
+
+
+def object_files(folder):
+    return [f for _, _, files in os.walk(os.path.join(folder, golden_store.OBJECTS_DIR)) for f in files]
+
+
+# ------------------------------
+# Test: save / dedupe
+# ------------------------------
+def test_identical_snapshot_is_not_stored_twice(store):
+    first, created = store.save("r1", CONFIG)
+    assert created
+    again, created = store.save("r1", CONFIG)
+    assert not created
+    assert again["id"] == first["id"]
+    assert len(store.versions("r1")) == 1
+    assert len(object_files(store.folder)) == 1
+
+def test_same_content_on_two_devices_shares_one_object(store):
+    store.save("r1", CONFIG)
+    store.save("r2", CONFIG)
+    assert len(object_files(store.folder)) == 1
+    stats = store.stats()
+    assert (stats["devices"], stats["versions"], stats["objects"]) == (2, 2, 1)
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 10  # compressed
+
+def test_reverting_to_an_old_config_adds_a_version_but_no_object(store):
+    store.save("r1", CONFIG)
+    store.save("r1", CONFIG + "ip routing\n")
+    store.save("r1", CONFIG)
+    assert len(store.versions("r1")) == 3
+    assert len(object_files(store.folder)) == 2
+
+
+# ------------------------------
+# Test: lookups
+# ------------------------------
+def test_latest_and_specific_versions(store):
+    v1, _ = store.save("r1", "hostname r1\n")
+    v2, _ = store.save("r1", CONFIG)
+    store.save("r10", "hostname r10\n")
+
+    version, config = store.get("R1")
+    assert (version["id"], config) == (v2["id"], CONFIG)
+    assert store.get("r1", v1["id"])[1] == "hostname r1\n"
+    assert store.get("r10", v1["id"]) == (None, None)  # version of another device
+    assert store.get("r3") == (None, None)
+    assert [v["id"] for v in store.versions("r1")] == [v2["id"], v1["id"]]
+
+
+# ------------------------------
+# Test: legacy import
+# ------------------------------
+def test_import_legacy_files(store):
+    folder = store.folder
+    for name, text in [("r1_golden_20251013_100000.cfg", "hostname r1\n"),
+                       ("r1_golden_20251013_205717.cfg", CONFIG),
+                       ("r10_golden_20251014_090000.cfg", "hostname r10\n"),
+                       ("notes.txt", "ignored")]:
+        with open(os.path.join(folder, name), "w") as f:
+            f.write(text)
+
+    assert store.import_legacy() == 3
+    assert store.import_legacy() == 0  # idempotent
+    version, config = store.get("r1")
+    assert (version["created_at"], config) == ("2025-10-13T20:57:17", CONFIG)
+    assert store.get("r10")[1] == "hostname r10\n"
+
+    store.import_legacy(remove=True)
+    assert sorted(f for f in os.listdir(folder) if f.endswith(".cfg")) == []
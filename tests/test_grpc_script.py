@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+pytest.importorskip("ncclient")
+from lxml import etree
+from pythonscripts import grpc_script as gs
+
+CPU_XML = """
+<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">
+  <system xmlns="http://openconfig.net/yang/system">
+    <cpus>
+      <cpu><index>0</index><state><total><instant>12</instant><avg>10</avg><min>2</min><max>40</max></total></state></cpu>
+      <cpu><index>1</index><state><total><instant>7</instant><avg>8</avg><min>1</min><max>30</max></total></state></cpu>
+    </cpus>
+  </system>
+</data>"""
+
+INTERFACE_XML = """
+<data xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">
+  <interfaces xmlns="http://openconfig.net/yang/interfaces">
+    <interface><name>Ethernet1</name><state><oper-status>UP</oper-status></state></interface>
+    <interface><name>Ethernet2</name><state><oper-status>DOWN</oper-status></state></interface>
+  </interfaces>
+</data>"""
+
+
+def reply(xml):
+    return MagicMock(data_ele=etree.fromstring(xml))
+
+
+# ------------------------------
+# Test: parsers
+# ------------------------------
+def test_parse_cpu():
+    records = gs.parse_cpu(etree.fromstring(CPU_XML))
+    assert records == [
+        {"index": "0", "instant": 12, "avg": 10, "min": 2, "max": 40},
+        {"index": "1", "instant": 7, "avg": 8, "min": 1, "max": 30},
+    ]
+
+def test_parse_interfaces():
+    records = gs.parse_interfaces(etree.fromstring(INTERFACE_XML))
+    assert records == [
+        {"name": "Ethernet1", "oper_status": "UP"},
+        {"name": "Ethernet2", "oper_status": "DOWN"},
+    ]
+
+
+# ------------------------------
+# Test: collect_device
+# ------------------------------
+@patch("pythonscripts.grpc_script.manager.connect")
+def test_collect_device_uses_one_session(mock_connect):
+    session = mock_connect.return_value.__enter__.return_value
+    session.get.side_effect = [reply(CPU_XML), Exception("storage not supported"), reply(INTERFACE_XML)]
+
+    record = gs.collect_device(gs.devices[0])
+
+    mock_connect.assert_called_once()
+    assert session.get.call_count == 3
+    assert len(record["cpu"]) == 2
+    assert record["storage"] == []
+    assert record["errors"] == {"storage": "storage not supported"}
+    assert record["interfaces"][0]["name"] == "Ethernet1"
+
+@patch("pythonscripts.grpc_script.manager.connect", side_effect=Exception("SSH failed"))
+def test_collect_all_keeps_order_on_failure(mock_connect):
+    records = gs.collect_all(gs.devices)
+    assert [r["name"] for r in records] == [d["name"] for d in gs.devices]
+    assert all("connect" in r["errors"] for r in records)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from pythonscripts import health_cache
+
+
+class FakeCheck:
+    def __init__(self, delay=0.0, completed=True):
+        self.calls = 0
+        self.delay = delay
+        self.completed = completed
+        self._lock = threading.Lock()
+
+    def __call__(self, hostname, log=print, **kwargs):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        log(f"checking {hostname}")
+        time.sleep(self.delay)
+        return {"hostname": hostname, "completed": self.completed, "run": n, "kwargs": kwargs}
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+# ------------------------------
+# Test: TTL / stale-while-revalidate
+# ------------------------------
+def test_fresh_result_is_reused():
+    check = FakeCheck()
+    cache = health_cache.HealthCache(check, ttl=60)
+    lines = []
+    first = cache.get("R1", log=lines.append, pool="p")
+    assert (first["state"], first["result"]["run"], lines) == (health_cache.MISS, 1, ["checking R1"])
+    assert first["result"]["kwargs"] == {"pool": "p"}
+    second = cache.get("r1")
+    assert second["state"] == health_cache.FRESH
+    assert second["result"]["run"] == 1
+    assert second["age"] >= 0
+    assert check.calls == 1
+
+def test_stale_result_served_while_refreshing():
+    check = FakeCheck(delay=0.1)
+    cache = health_cache.HealthCache(check, ttl=0, max_stale=60)
+    cache.get("r1", log=lambda *a: None)
+    stale = cache.get("r1")
+    assert stale["state"] == health_cache.STALE
+    assert stale["refreshing"]
+    assert stale["result"]["run"] == 1
+    assert wait_for(lambda: cache.peek("r1")[1]["run"] == 2)
+
+def test_too_old_result_runs_synchronously():
+    check = FakeCheck()
+    cache = health_cache.HealthCache(check, ttl=0, max_stale=0)
+    cache.get("r1", log=lambda *a: None)
+    time.sleep(0.01)
+    entry = cache.get("r1", log=lambda *a: None)
+    assert (entry["state"], entry["result"]["run"]) == (health_cache.MISS, 2)
+
+
+# ------------------------------
+# Test: invalidation / failures
+# ------------------------------
+def test_invalidate():
+    check = FakeCheck()
+    cache = health_cache.HealthCache(check)
+    cache.get("r1", log=lambda *a: None)
+    cache.get("r2", log=lambda *a: None)
+    cache.invalidate("R1")
+    assert cache.peek("r1") is None and cache.peek("r2") is not None
+    cache.invalidate()
+    assert cache.peek("r2") is None
+
+def test_failed_checks_are_not_cached():
+    check = FakeCheck(completed=False)
+    cache = health_cache.HealthCache(check)
+    cache.get("r1", log=lambda *a: None)
+    cache.get("r1", log=lambda *a: None)
+    assert check.calls == 2
+
+def test_concurrent_misses_share_one_check():
+    check = FakeCheck(delay=0.2)
+    cache = health_cache.HealthCache(check)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("r1", log=lambda *a: None)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert check.calls == 1
+    assert {r["result"]["run"] for r in results} == {1}
+    assert sorted(r["state"] for r in results) == [health_cache.JOINED] * 4 + [health_cache.MISS]
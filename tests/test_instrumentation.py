@@ -0,0 +1,124 @@
+import json
+import urllib.request
+from unittest.mock import MagicMock
+
+import pytest
+from pythonscripts import instrumentation
+from pythonscripts import parsers
+from pythonscripts import ssh_pool
+
+
+@pytest.fixture
+def registry():
+    instrumentation.REGISTRY.reset()
+    instrumentation.enable()
+    yield instrumentation.REGISTRY
+    instrumentation.disable()
+    instrumentation.REGISTRY.reset()
+
+
+def spans_by_name(registry):
+    return {(s["span"], tuple(sorted(s["labels"].items()))): s for s in registry.snapshot()}
+
+
+# ------------------------------
+# Test: spans and histograms
+# ------------------------------
+def test_disabled_spans_record_nothing():
+    instrumentation.REGISTRY.reset()
+    assert instrumentation.span("connect", device="r1") is instrumentation.span("parse")
+    with instrumentation.span("connect", device="r1"):
+        pass
+    instrumentation.observe("snmp_walk", 0.5, device="r1")
+    assert instrumentation.REGISTRY.snapshot() == []
+    conn = object()
+    assert instrumentation.instrument_connection(conn, "r1") is conn
+
+def test_span_counts_durations_and_errors(registry):
+    for seconds in (0.002, 0.004, 0.2):
+        registry.observe("command", seconds, device="r1", command="show version")
+    with pytest.raises(ValueError):
+        with instrumentation.span("command", device="r1", command="show version"):
+            raise ValueError("boom")
+    (s,) = registry.snapshot()
+    assert s["count"] == 4 and s["errors"] == 1
+    assert s["labels"] == {"command": "show version", "device": "r1"}
+    assert s["buckets"]["0.005"] >= 2 and s["buckets"]["+Inf"] == 4
+    assert s["min"] <= s["p50"] <= s["p90"] <= s["max"] == 0.2
+
+def test_prometheus_and_json_export(registry, tmp_path):
+    registry.observe("command", 0.01, device="r1", command='show "quoted"')
+    text = registry.to_prometheus()
+    assert "# TYPE netops_span_seconds histogram" in text
+    assert 'netops_span_seconds_count{span="command",command="show \\"quoted\\"",device="r1"} 1' in text
+    assert 'le="+Inf"' in text and "netops_span_errors_total" in text
+
+    json_path, prom_path = registry.write(str(tmp_path / "metrics" / "run.json"))
+    assert prom_path.endswith("run.prom")
+    with open(json_path) as f:
+        assert json.load(f)["spans"][0]["span"] == "command"
+    with open(prom_path) as f:
+        assert f.read() == text
+
+def test_summary_aggregates_devices(registry):
+    registry.observe("connect", 1.0, device="r1")
+    registry.observe("connect", 3.0, device="r2")
+    registry.observe("parse", 0.001, command="show ip route")
+    lines = registry.summary()
+    assert lines[0].startswith("connect") and "2x" in lines[0] and "4.000s total" in lines[0]
+
+
+# ------------------------------
+# Test: instrumented layers
+# ------------------------------
+def test_ssh_pool_connection_times_connect_and_commands(registry):
+    conn = MagicMock()
+    conn.send_command.return_value = "ok"
+    params = {"host": "10.0.0.1", "username": "admin", "password": "secret"}
+    with ssh_pool.connection(params, connect=lambda **p: conn) as session:
+        assert session.send_command("show version") == "ok"
+        session.send_config_set(["username admin secret hunter2"])
+        session.disconnect  # Other attributes pass through
+    spans = spans_by_name(registry)
+    assert ("connect", (("device", "10.0.0.1"),)) in spans
+    assert ("command", (("command", "show version"), ("device", "10.0.0.1"))) in spans
+    assert ("config", (("device", "10.0.0.1"),)) in spans
+    assert "hunter2" not in registry.to_prometheus()
+    conn.disconnect.assert_called_once()
+
+def test_parse_is_timed_on_cache_miss_only(registry):
+    cache = parsers.ParseCache()
+    output = "Ethernet1 10.0.0.1/30 up up 1500"
+    parsers.parse("show ip interface brief", output, cache=cache)
+    parsers.parse("show ip interface brief", output, cache=cache)
+    (s,) = registry.snapshot()
+    assert s["span"] == "parse" and s["count"] == 1
+
+def test_recording_writes_and_serves(tmp_path):
+    instrumentation.REGISTRY.reset()
+    with instrumentation.recording(None, None) as registry:
+        assert not registry.enabled
+
+    logged = []
+    path = str(tmp_path / "run.json")
+    with instrumentation.recording(path, log=logged.append) as registry:
+        assert registry.enabled
+        with instrumentation.span("connect", device="r1"):
+            pass
+    assert not registry.enabled
+    assert (tmp_path / "run.prom").exists()
+    assert any("Metrics written" in line for line in logged)
+
+    registry.enabled = True
+    server = instrumentation.serve(0, registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as resp:
+            assert 'span="connect"' in resp.read().decode()
+        with urllib.request.urlopen(f"{url}/metrics.json") as resp:
+            assert json.load(resp)["spans"][0]["count"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        instrumentation.disable()
+        registry.reset()
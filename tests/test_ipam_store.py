@@ -0,0 +1,110 @@
+import pytest
+from pythonscripts import ipam_store
+
+ROWS = [
+    ["s3", "10.0.100.2", "Ethernet1", "10.0.10.18/30", "IPv4"],
+    ["s3", "10.0.100.2", "Ethernet2", "10.0.10.37/30", "IPv4"],
+    ["r1", "10.0.100.9", "Ethernet2", "10.0.10.38/30", "IPv4"],
+    ["r1", "10.0.100.9", "Management0", "10.0.100.9/24", "IPv4"],
+    ["r1", "10.0.100.9", "Vlan10", "10.0.0.1/8", "IPv4"],
+    ["r1", "10.0.100.9", "Ethernet1", "2003:db8::1/64", "IPv6"],
+    ["r1", "10.0.100.9", "Loopback0", "Loopback", "N/A"],
+    ["s3", "10.0.100.2", "-----------------", "--------------------", "IPv4"],
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ipam_store.IPAMStore(str(tmp_path / "devices.db"))
+    s.bulk_load(ROWS)
+    yield s
+    s.close()
+
+
+# ------------------------------
+# Test: loading
+# ------------------------------
+def test_bulk_load_skips_separator_rows(store):
+    rows = store.rows()
+    assert len(rows) == 7
+    assert rows[-1] == {"Hostname": "r1", "Device": "10.0.100.9", "Interface": "Loopback0",
+                        "IP Address": "Loopback", "IP Version": "N/A"}
+
+
+# ------------------------------
+# Test: lookups
+# ------------------------------
+def test_owner_exact_match(store):
+    owners = store.owner("10.0.10.37")
+    assert [(r["Hostname"], r["Interface"]) for r in owners] == [("s3", "Ethernet2")]
+    assert store.owner("10.0.10.36") == []
+
+def test_longest_prefix_prefers_most_specific(store):
+    network, rows = store.longest_prefix("10.0.10.39")
+    assert str(network) == "10.0.10.36/30"
+    assert {r["Hostname"] for r in rows} == {"s3", "r1"}
+
+    network, rows = store.longest_prefix("10.200.0.1")
+    assert str(network) == "10.0.0.0/8"
+
+    assert store.longest_prefix("192.168.1.1") == (None, [])
+
+def test_contained(store):
+    inside = store.contained("10.0.10.0/24")
+    assert sorted(r["IP Address"] for r in inside) == ["10.0.10.18/30", "10.0.10.37/30", "10.0.10.38/30"]
+
+def test_ipv6_lookups(store):
+    assert store.owner("2003:db8::1")[0]["Interface"] == "Ethernet1"
+    network, _ = store.longest_prefix("2003:db8::ffff")
+    assert str(network) == "2003:db8::/64"
+    assert len(store.contained("2003:db8::/32")) == 1
+
+def test_index_sees_changes_from_other_connections(store, tmp_path):
+    other = ipam_store.IPAMStore(str(tmp_path / "devices.db"))
+    assert store.owner("10.9.9.9") == []
+    other.bulk_load([["r9", "10.0.100.10", "Ethernet1", "10.9.9.9/31", "IPv4"]])
+    other.close()
+    assert store.owner("10.9.9.9")[0]["Hostname"] == "r9"
+
+
+# ------------------------------
+# Test: filtered pages and export
+# ------------------------------
+def test_query_filters_sorts_and_pages(store):
+    rows, total = store.query({"hostname": "R1", "version": "IPv4"}, sort="address", limit=2)
+    assert total == 3
+    assert [r["IP Address"] for r in rows] == ["10.0.0.1/8", "10.0.10.38/30"]
+
+    rows, total = store.query({"hostname": "r1", "version": "IPv4"}, sort="address", limit=2, offset=2)
+    assert [r["IP Address"] for r in rows] == ["10.0.100.9/24"]
+
+def test_query_filters_match_wildcards_literally(tmp_path):
+    s = ipam_store.IPAMStore(str(tmp_path / "devices.db"))
+    s.bulk_load([["r1", "10.0.100.9", "Ethernet1_1", "10.0.1.1/30", "IPv4"],
+                 ["r1", "10.0.100.9", "Ethernet101", "10.0.1.5/30", "IPv4"],
+                 ["a%b", "10.0.100.10", "Ethernet1", "10.0.2.1/30", "IPv4"],
+                 ["axb", "10.0.100.11", "Ethernet1", "10.0.3.1/30", "IPv4"]])
+    try:
+        rows, total = s.query({"interface": "Ethernet1_1"})
+        assert (total, rows[0]["Interface"]) == (1, "Ethernet1_1")
+        rows, total = s.query({"hostname": "a%b"})
+        assert (total, rows[0]["Hostname"]) == (1, "a%b")
+        assert s.query({"hostname": "\\"})[1] == 0
+    finally:
+        s.close()
+
+def test_query_prefix_filter(store):
+    rows, total = store.query({"prefix": "10.0.10.36/30"}, sort="address", descending=True)
+    assert total == 2
+    assert [r["IP Address"] for r in rows] == ["10.0.10.38/30", "10.0.10.37/30"]
+
+def test_query_rejects_bad_prefix(store):
+    with pytest.raises(ValueError):
+        store.query({"prefix": "not-a-prefix"})
+    with pytest.raises(ValueError):
+        store.iter_rows({"prefix": "not-a-prefix"})
+
+def test_iter_rows_streams_in_batches(store):
+    rows = list(store.iter_rows({"interface": "ethernet"}, batch=2))
+    assert len(rows) == 4
+    assert rows[0] == ("s3", "10.0.100.2", "Ethernet1", "10.0.10.18/30", "IPv4")
@@ -0,0 +1,99 @@
+import threading
+import time
+
+from pythonscripts import jobs
+
+
+def wait_done(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+
+
+# ------------------------------
+# Test: runner
+# ------------------------------
+def test_job_collects_output_and_result():
+    runner = jobs.JobRunner(max_workers=2)
+
+    def task(name, log=print):
+        log(f"hello {name}\nsecond line")
+        return 42
+
+    job = runner.submit("greet", task, "r1")
+    wait_done(job)
+    assert (job.status, job.result) == (jobs.DONE, 42)
+    assert job.lines == ["hello r1", "second line"]
+    assert runner.get(job.id) is job
+    runner.shutdown()
+
+def test_failing_job_is_marked_failed():
+    runner = jobs.JobRunner(max_workers=1)
+
+    def boom(log=print):
+        log("starting")
+        raise RuntimeError("device unreachable")
+
+    job = runner.submit("boom", boom)
+    wait_done(job)
+    assert job.status == jobs.FAILED
+    assert job.lines[0] == "starting"
+    assert "device unreachable" in job.lines[1]
+    runner.shutdown()
+
+def test_jobs_run_concurrently():
+    runner = jobs.JobRunner(max_workers=4)
+    barrier = threading.Barrier(4, timeout=2)
+
+    def task(log=print):
+        barrier.wait()  # Would time out if jobs ran one after another
+        return "ok"
+
+    started = [runner.submit(f"job{i}", task) for i in range(4)]
+    for job in started:
+        wait_done(job)
+    assert [j.result for j in started] == ["ok"] * 4
+    runner.shutdown()
+
+def test_finished_jobs_expire():
+    runner = jobs.JobRunner(max_workers=1, keep=0)
+    old = runner.submit("old", lambda log=print: None)
+    wait_done(old)
+    time.sleep(0.01)
+    runner.submit("new", lambda log=print: None)
+    assert runner.get(old.id) is None
+    runner.shutdown()
+
+
+# ------------------------------
+# Test: streaming
+# ------------------------------
+def test_stream_follows_output_until_done():
+    job = jobs.Job("stream")
+    release = threading.Event()
+
+    def produce():
+        job.log("one")
+        release.wait(2)
+        job.log("two")
+        job._finish(jobs.DONE)
+
+    threading.Thread(target=produce).start()
+    lines = job.stream()
+    assert next(lines) == "one"
+    release.set()
+    assert list(lines) == ["two"]
+
+def test_stream_resumes_and_sends_keepalives():
+    job = jobs.Job("resume")
+    for line in ["a", "b", "c"]:
+        job.log(line)
+    lines = job.stream(start=2, timeout=0.01)
+    assert next(lines) == "c"
+    assert next(lines) is None  # idle
+    job._finish(jobs.DONE)
+    assert list(lines) == []
+
+def test_sse_format():
+    events = list(jobs.sse(iter(["x", None, "y"]), 5))
+    assert events == ["id: 6\ndata: x\n\n", ": keep-alive\n\n", "id: 7\ndata: y\n\n"]
@@ -0,0 +1,144 @@
+import pytest
+from pythonscripts import parsers
+
+IP_INTERFACE_BRIEF = """\
+                                                                                Address
+Interface         IP Address            Status       Protocol           MTU    Owner
+----------------- --------------------- ------------ -------------- ---------- -------
+Ethernet1         10.0.0.1/30           up           up                 1500
+Ethernet2         unassigned            admin down   down               1500
+Loopback0         1.1.1.1/32            up           up                65535
+Management1       192.168.0.10/24       up           up                 1500
+"""
+
+IPV6_INTERFACE_BRIEF = """\
+   Interface       Status        MTU       IPv6 Address                     Addr State    Addr Source
+--------------- ------------ ---------- -------------------------------- ---------------- -----------
+   Et1             up            1500      fe80::1/64                       up            link local
+                                           2001:db8::1/64                   up            config
+   Lo0             up            65535     fe80::2/64                       up            link local
+                                           2001:db8:ffff::1/128             up            config
+"""
+
+IP_ROUTE = """\
+VRF: default
+Codes: C - connected, S - static, K - kernel,
+       O - OSPF, IA - OSPF inter area, E1 - OSPF external type 1,
+       B - Other BGP Routes, B E - eBGP
+
+Gateway of last resort is not set
+
+ C        10.0.0.0/30 is directly connected, Ethernet1
+ O        10.0.1.0/24 [110/20] via 10.0.0.2, Ethernet1
+ B E      10.1.0.0/16 [200/0] via 10.0.0.6, Ethernet2
+                              via 10.0.0.10, Ethernet3
+ S        0.0.0.0/0 [1/0] via 192.168.0.1, Management1
+"""
+
+OSPF_NEIGHBOR = """\
+Neighbor ID     Instance VRF      Pri State                  Dead Time   Address         Interface
+2.2.2.2         1        default  1   FULL/DR                00:00:35    10.0.0.2        Ethernet1
+3.3.3.3         1        default  0   FULL                   00:00:31    10.0.0.6        Ethernet2
+"""
+
+LLDP_NEIGHBORS = """\
+Last table change time   : 0:12:03 ago
+Number of table inserts  : 2
+Number of table deletes  : 0
+
+Port          Neighbor Device ID       Neighbor Port ID    TTL
+---------- ------------------------ ---------------------- ---
+Et1           r2                       Ethernet1           120
+Et2           r3.lab                   Ethernet4           120
+"""
+
+INTERFACES_DESCRIPTION = """\
+Interface                      Status         Protocol           Description
+Et1                            up             up                 uplink to r2
+Et2                            admin down     down
+Lo0                            up             up
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    parsers.CACHE.clear()
+
+
+# ------------------------------
+# Test: built-in parsers
+# ------------------------------
+def test_ip_interface_brief_skips_header_and_separator():
+    records = parsers.parse("show ip interface brief", IP_INTERFACE_BRIEF)
+    assert [r.name for r in records] == ["Ethernet1", "Ethernet2", "Loopback0", "Management1"]
+    assert records[0] == parsers.Interface("Ethernet1", "10.0.0.1/30", 4, "up", "up", 1500)
+    assert records[1].address == "unassigned" and records[1].status == "admin down"
+
+def test_ip_interface_brief_minimal_columns():
+    records = parsers.parse("show ip interface brief", "Interface IP-Address\nEthernet1 10.0.0.1\nEthernet2 unassigned")
+    assert [(r.name, r.address) for r in records] == [("Ethernet1", "10.0.0.1"), ("Ethernet2", "unassigned")]
+
+def test_ipv6_interface_brief_continuation_lines():
+    records = parsers.parse("show ipv6 interface brief", IPV6_INTERFACE_BRIEF)
+    assert [(r.name, r.address) for r in records] == [
+        ("Et1", "fe80::1/64"), ("Et1", "2001:db8::1/64"),
+        ("Lo0", "fe80::2/64"), ("Lo0", "2001:db8:ffff::1/128"),
+    ]
+    assert all(r.version == 6 for r in records)
+
+def test_ip_route_with_ecmp():
+    routes = {r.prefix: r for r in parsers.parse("show ip route", IP_ROUTE)}
+    assert list(routes) == ["10.0.0.0/30", "10.0.1.0/24", "10.1.0.0/16", "0.0.0.0/0"]
+    assert routes["10.0.0.0/30"] == parsers.Route("10.0.0.0/30", "C", interfaces=("Ethernet1",))
+    assert routes["10.0.1.0/24"].distance == 110 and routes["10.0.1.0/24"].metric == 20
+    assert routes["10.1.0.0/16"].protocol == "B E"
+    assert routes["10.1.0.0/16"].next_hops == ("10.0.0.6", "10.0.0.10")
+    assert routes["10.1.0.0/16"].interfaces == ("Ethernet2", "Ethernet3")
+
+def test_ospf_and_lldp_neighbors():
+    ospf = parsers.parse("show ip ospf neighbor", OSPF_NEIGHBOR)
+    assert ospf == (parsers.Neighbor("2.2.2.2", "Ethernet1", "10.0.0.2", "FULL/DR"),
+                    parsers.Neighbor("3.3.3.3", "Ethernet2", "10.0.0.6", "FULL"))
+    lldp = parsers.parse("show lldp neighbors", LLDP_NEIGHBORS)
+    assert [(n.interface, n.neighbor_id, n.remote_port, n.protocol) for n in lldp] == [
+        ("Et1", "r2", "Ethernet1", "lldp"), ("Et2", "r3.lab", "Ethernet4", "lldp")]
+
+def test_interfaces_description_and_include_filter():
+    records = parsers.parse("show interfaces description", INTERFACES_DESCRIPTION)
+    assert [(r.name, r.status, r.description) for r in records] == [
+        ("Et1", "up", "uplink to r2"), ("Et2", "admin down", None), ("Lo0", "up", None)]
+    assert parsers.parser_for("show interfaces description | include Loopback") is parsers.parse_interfaces_description
+
+
+# ------------------------------
+# Test: cache, TextFSM and helpers
+# ------------------------------
+def test_identical_output_is_parsed_once(monkeypatch):
+    calls = []
+    monkeypatch.setitem(parsers.PARSERS, "show ip route", lambda out: calls.append(out) or parsers.parse_ip_route(out))
+    first = parsers.parse("show ip route", IP_ROUTE)
+    assert parsers.parse("show ip route", IP_ROUTE) is first
+    parsers.parse("show ip route", IP_ROUTE + " C        10.9.9.0/24 is directly connected, Ethernet9\n")
+    assert len(calls) == 2
+    assert parsers.CACHE.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+def test_cache_is_bounded():
+    cache = parsers.ParseCache(size=2)
+    for n in range(3):
+        parsers.parse("show ip interface brief", f"Ethernet{n} 10.0.0.{n}", cache=cache)
+    assert cache.stats()["entries"] == 2
+
+def test_already_parsed_output_is_returned_unchanged():
+    assert parsers.parse("show ip ospf neighbor", [{"neighbor": "R2"}]) == [{"neighbor": "R2"}]
+    assert parsers.as_dicts(parsers.parse("show ip ospf neighbor", OSPF_NEIGHBOR))[0]["neighbor_id"] == "2.2.2.2"
+
+def test_textfsm_template_compiled_once(tmp_path):
+    pytest.importorskip("textfsm")
+    (tmp_path / "arista_eos_show_clock.textfsm").write_text(
+        "Value TIME (\\S+)\nValue ZONE (\\S+)\n\nStart\n  ^${TIME}\\s+${ZONE} -> Record\n")
+    first = parsers.get_template("show clock", template_dir=str(tmp_path))
+    assert parsers.get_template("show clock", template_dir=str(tmp_path)) is first
+    assert parsers.parse_textfsm("show clock", "12:00:01 UTC\n", template_dir=str(tmp_path)) == [
+        {"time": "12:00:01", "zone": "UTC"}]
+    with pytest.raises(LookupError):
+        parsers.get_template("show nothing", template_dir=str(tmp_path))
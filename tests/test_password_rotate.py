@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from pythonscripts import password_rotate as pr
+
+CSV = "Device,Hostname,Username,New_Password\n" + "".join(
+    f"10.0.0.{i},r{i},admin,old{i}\n" for i in range(1, 7))
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    csv_path = tmp_path / "rotated_passwords.csv"
+    csv_path.write_text(CSV)
+    monkeypatch.setattr(pr, "PASSWORD_FILE", str(csv_path))
+    monkeypatch.setattr(pr, "LOG_FILE", str(tmp_path / "rotation.log"))
+    monkeypatch.setattr(pr, "CHECKPOINT_FILE", str(tmp_path / "rotation.wal"))
+    return tmp_path
+
+
+def fake_device(passwords, fail=(), delay=0.0):
+    """ConnectHandler stand-in: passwords maps host -> currently valid password."""
+    lock = threading.Lock()
+
+    def connect(**params):
+        host = params["host"]
+        time.sleep(delay)
+        if host in fail or passwords[host] != params["password"]:
+            raise ConnectionError(f"auth failed for {host}")
+        conn = MagicMock()
+        conn.find_prompt.return_value = f"r{host.rsplit('.', 1)[1]}#"
+
+        def send_config_set(commands):
+            with lock:
+                passwords[host] = commands[0].split()[-1]
+        conn.send_config_set.side_effect = send_config_set
+        return conn
+    return connect
+
+
+def read_csv(env):
+    lines = (env / "rotated_passwords.csv").read_text().splitlines()[1:]
+    return {line.split(",")[0]: line.split(",") for line in lines}
+
+
+# ------------------------------
+# Test: rotation
+# ------------------------------
+def test_rotates_concurrently_and_writes_csv(env, monkeypatch):
+    passwords = {f"10.0.0.{i}": f"old{i}" for i in range(1, 7)}
+    monkeypatch.setattr(pr, "ConnectHandler", fake_device(passwords, fail={"10.0.0.3"}, delay=0.2))
+
+    started = time.monotonic()
+    assert pr.rotate_passwords(max_workers=6, rate=0)
+    assert time.monotonic() - started < 1.0  # 6 devices x 0.2s sequentially would take 1.2s+
+
+    rows = read_csv(env)
+    for host, row in rows.items():
+        assert row[3] == passwords[host]
+    assert rows["10.0.0.3"] == ["10.0.0.3", "r3", "admin", "old3"]  # failed: old password and hostname kept
+    assert rows["10.0.0.1"][3] != "old1"
+    assert not (env / "rotation.wal").exists()
+
+def test_rotation_keeps_site_column(env, monkeypatch):
+    (env / "rotated_passwords.csv").write_text(
+        "Device,Hostname,Username,New_Password,Site\n10.0.0.1,r1,admin,old1,dc1\n10.0.0.2,r2,admin,old2,dc2\n")
+    passwords = {"10.0.0.1": "old1", "10.0.0.2": "old2"}
+    monkeypatch.setattr(pr, "ConnectHandler", fake_device(passwords))
+
+    assert pr.rotate_passwords(max_workers=2, rate=0)
+    lines = (env / "rotated_passwords.csv").read_text().splitlines()
+    assert lines[0] == "Device,Hostname,Username,New_Password,Site"
+    rows = read_csv(env)
+    assert rows["10.0.0.1"][3] == passwords["10.0.0.1"] != "old1"
+    assert [rows["10.0.0.1"][4], rows["10.0.0.2"][4]] == ["dc1", "dc2"]
+
+def test_rate_limiter_spaces_starts():
+    limiter = pr.RateLimiter(20)
+    started = time.monotonic()
+    threads = [threading.Thread(target=limiter.wait) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - started >= 0.19
+
+
+# ------------------------------
+# Test: checkpoint / resume
+# ------------------------------
+def test_unfinished_run_requires_resume(env, monkeypatch):
+    (env / "rotation.wal").write_text("")
+    monkeypatch.setattr(pr, "ConnectHandler", MagicMock(side_effect=AssertionError("must not connect")))
+    assert pr.rotate_passwords(rate=0) is False
+
+def test_resume_skips_done_and_adopts_applied_pending(env, monkeypatch):
+    passwords = {f"10.0.0.{i}": f"old{i}" for i in range(1, 7)}
+    passwords["10.0.0.1"] = "new1"      # rotated and checkpointed before the crash
+    passwords["10.0.0.2"] = "applied2"  # pushed, but the crash hit before 'done' was written
+    wal = [
+        {"device": "10.0.0.1", "status": "pending", "password": "new1"},
+        {"device": "10.0.0.1", "status": "done", "hostname": "r1", "password": "new1"},
+        {"device": "10.0.0.2", "status": "pending", "password": "applied2"},
+        {"device": "10.0.0.4", "status": "pending", "password": "never-applied"},
+    ]
+    (env / "rotation.wal").write_text("".join(json.dumps(r) + "\n" for r in wal) + '{"device": "10.0.')
+    connect = fake_device(passwords)
+    calls = []
+    monkeypatch.setattr(pr, "ConnectHandler", lambda **p: calls.append(p["host"]) or connect(**p))
+
+    assert pr.rotate_passwords(rate=0, resume=True)
+
+    rows = read_csv(env)
+    assert "10.0.0.1" not in calls
+    assert rows["10.0.0.1"][3] == "new1"
+    assert rows["10.0.0.2"][3] == "applied2" == passwords["10.0.0.2"]
+    assert rows["10.0.0.4"][3] == passwords["10.0.0.4"] != "old4"
+    assert not (env / "rotation.wal").exists()
+
+def test_checkpoint_kept_when_pending_password_unconfirmed(env, monkeypatch):
+    passwords = {f"10.0.0.{i}": f"old{i}" for i in range(1, 7)}
+    (env / "rotation.wal").write_text(json.dumps({"device": "10.0.0.5", "status": "pending",
+                                                  "password": "maybe5"}) + "\n")
+    monkeypatch.setattr(pr, "ConnectHandler", fake_device(passwords, fail={"10.0.0.5"}))
+
+    assert pr.rotate_passwords(rate=0, resume=True)
+    state = pr.Checkpoint(str(env / "rotation.wal")).load()
+    assert state["10.0.0.5"]["status"] == "pending"
+    assert state["10.0.0.5"]["password"] == "maybe5"
+
+def test_save_error_after_push_keeps_new_password(env, monkeypatch):
+    passwords = {f"10.0.0.{i}": f"old{i}" for i in range(1, 7)}
+    connect = fake_device(passwords)
+    unreachable = set()
+
+    def flaky(**params):
+        if params["host"] in unreachable:
+            raise ConnectionError("timed out")
+        conn = connect(**params)
+        if params["host"] in ("10.0.0.1", "10.0.0.2"):
+            conn.save_config.side_effect = TimeoutError("save timed out")
+            if params["host"] == "10.0.0.2":
+                unreachable.add("10.0.0.2")  # Gone before the new password can be confirmed
+        return conn
+    monkeypatch.setattr(pr, "ConnectHandler", flaky)
+
+    assert pr.rotate_passwords(rate=0)
+    rows = read_csv(env)
+    assert rows["10.0.0.1"][3] == passwords["10.0.0.1"] != "old1"  # Confirmed with the new password
+    state = pr.Checkpoint(str(env / "rotation.wal")).load()
+    assert state["10.0.0.2"]["status"] == "pending"
+    assert state["10.0.0.2"]["password"] == passwords["10.0.0.2"] != "old2"
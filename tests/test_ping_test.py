@@ -87,3 +87,82 @@ def test_main(mock_ping, mock_file, mock_load_devices, capsys):
     assert "DEVICE PING TEST" in captured.out
     assert "r1 → 10.0.0.1: ✅ Success" in captured.out
     assert "Results saved to" in captured.out
+
+# -----------------------------
+# Test: run_fleet
+# -----------------------------
+def test_run_fleet_keeps_device_order():
+    import time
+    devices = [{"ip": f"10.0.0.{i}", "hostname": f"r{i}"} for i in range(6)]
+
+    def fake_ping(device, pool=None):
+        # Later devices finish first
+        time.sleep(0.01 * (6 - int(device["hostname"][1:])))
+        return [device["hostname"]]
+
+    with patch("pythonscripts.ping_test.run_ping_on_device", side_effect=fake_ping):
+        results = list(pt.run_fleet(devices, max_workers=6, per_site=0))
+    assert results == [[f"r{i}"] for i in range(6)]
+
+def test_run_fleet_per_site_limit():
+    import threading
+    import time
+    lock = threading.Lock()
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    devices = [{"hostname": f"r{i}", "site": "a" if i % 2 else "b"} for i in range(8)]
+
+    def fake_ping(device, pool=None):
+        site = device["site"]
+        with lock:
+            active[site] += 1
+            peak[site] = max(peak[site], active[site])
+        time.sleep(0.02)
+        with lock:
+            active[site] -= 1
+        return []
+
+    with patch("pythonscripts.ping_test.run_ping_on_device", side_effect=fake_ping):
+        list(pt.run_fleet(devices, max_workers=8, per_site=2))
+    assert peak["a"] <= 2
+    assert peak["b"] <= 2
+
+def test_run_fleet_schedules_sites_listed_in_order():
+    import threading
+    import time
+    lock = threading.Lock()
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0, "total": 0}
+    started = []
+    devices = [{"hostname": f"r{i}", "site": "a" if i < 6 else "b"} for i in range(12)]
+
+    def fake_ping(device, pool=None):
+        site = device["site"]
+        with lock:
+            started.append(site)
+            active[site] += 1
+            peak[site] = max(peak[site], active[site])
+            peak["total"] = max(peak["total"], active["a"] + active["b"])
+        time.sleep(0.03)
+        with lock:
+            active[site] -= 1
+        return [device["hostname"]]
+
+    with patch("pythonscripts.ping_test.run_ping_on_device", side_effect=fake_ping):
+        results = list(pt.run_fleet(devices, max_workers=4, per_site=2))
+    assert results == [[f"r{i}"] for i in range(12)]
+    assert peak["a"] <= 2 and peak["b"] <= 2
+    assert peak["total"] > 2
+    assert sorted(started[:4]) == ["a", "a", "b", "b"]  # Site b starts while site a is at its limit
+
+def test_run_fleet_passes_pool_to_devices():
+    seen = []
+    sentinel = object()
+
+    def fake_ping(device, pool=None):
+        seen.append(pool)
+        return []
+
+    with patch("pythonscripts.ping_test.run_ping_on_device", side_effect=fake_ping):
+        list(pt.run_fleet([{"hostname": "r1"}, {"hostname": "r2"}], per_site=0, pool=sentinel))
+    assert seen == [sentinel, sentinel]
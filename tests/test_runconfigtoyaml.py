@@ -0,0 +1,116 @@
+import threading
+import time
+from pythonscripts import runconfigtoyaml as rcy
+
+CONFIG = """\
+! Command: show running-config
+hostname r1
+!
+username admin privilege 15 role network-admin secret sha512 $6$abc
+!
+management api http-commands
+   no shutdown
+!
+interface Ethernet1
+   description uplink
+   ip address 10.0.0.1/30
+!
+interface Loopback0
+   ip address 1.1.1.1/32
+!
+ip routing
+!
+ip route 0.0.0.0/0 10.0.0.2
+!
+router bgp 65000
+   neighbor 10.0.0.2 remote-as 65001
+   address-family ipv4
+      neighbor 10.0.0.2 activate
+!
+transceiver qsfp default-mode 4x10G
+!
+end
+"""
+
+
+# ------------------------------
+# Test: section tree
+# ------------------------------
+def test_config_tree_groups_sections():
+    tree = rcy.config_tree(CONFIG)
+    assert tree["interfaces"]["interface Ethernet1"] == ["description uplink", "ip address 10.0.0.1/30"]
+    assert tree["routing"]["router bgp 65000"] == [
+        "neighbor 10.0.0.2 remote-as 65001",
+        {"address-family ipv4": ["neighbor 10.0.0.2 activate"]},
+    ]
+    assert tree["routing"]["ip route 0.0.0.0/0 10.0.0.2"] == []
+    assert "ip routing" in tree["routing"]
+    assert list(tree["management"]) == ["hostname r1", "username admin privilege 15 role network-admin secret sha512 $6$abc",
+                                        "management api http-commands"]
+    assert list(tree["other"]) == ["transceiver qsfp default-mode 4x10G", "end"]
+
+def test_category_of_negated_lines():
+    assert rcy.category("no aaa root") == "management"
+    assert rcy.category("no ip routing") == "routing"
+
+def test_category_of_ospfv3_and_acls():
+    assert rcy.category("ipv6 router ospf 15") == "routing"
+    assert rcy.category("ip access-list ssh") == "routing"
+    assert rcy.category("ipv6 access-list v6-mgmt") == "routing"
+
+
+# ------------------------------
+# Test: export
+# ------------------------------
+def test_export_all_fetches_in_parallel_and_skips_unchanged(tmp_path):
+    devices = {f"r{i}": f"10.0.100.{i}" for i in range(1, 9)}
+    configs = {ip: CONFIG.replace("hostname r1", f"hostname {name}") for name, ip in devices.items()}
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def fetch(ip, username, password):
+        with lock:
+            active.append(ip)
+            peak[0] = max(peak[0], len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(ip)
+        return configs[ip]
+
+    results = rcy.export_all(devices, str(tmp_path), max_workers=8, fetch=fetch)
+    assert set(results.values()) == {"exported"}
+    assert peak[0] > 1
+
+    exported = rcy.load_export("r3", str(tmp_path))
+    assert exported["hostname"] == "r3"
+    assert exported["sha256"] == rcy.config_hash(configs["10.0.100.3"])
+    assert "interface Loopback0" in exported["config"]["interfaces"]
+
+    configs["10.0.100.3"] += "interface Ethernet9\n   shutdown\n"
+    results = rcy.export_all(devices, str(tmp_path), fetch=fetch)
+    assert results.pop("r3") == "exported"
+    assert set(results.values()) == {"unchanged"}
+    assert "interface Ethernet9" in rcy.load_export("r3", str(tmp_path))["config"]["interfaces"]
+
+def test_write_error_fails_one_device_and_keeps_state(tmp_path, monkeypatch):
+    write_export = rcy.write_export
+
+    def flaky(name, *args, **kwargs):
+        if name == "r2":
+            raise OSError("No space left on device")
+        return write_export(name, *args, **kwargs)
+
+    monkeypatch.setattr(rcy, "write_export", flaky)
+    devices = {"r1": "10.0.100.1", "r2": "10.0.100.2"}
+    assert rcy.export_all(devices, str(tmp_path), fetch=lambda *a: CONFIG) == {"r1": "exported", "r2": "failed"}
+    assert list(rcy.load_state(str(tmp_path))) == ["r1"]
+
+def test_failed_device_is_exported_again_next_run(tmp_path):
+    def broken(ip, username, password):
+        raise ConnectionError("timed out")
+
+    assert rcy.export_all({"r1": "10.0.100.9"}, str(tmp_path), fetch=broken) == {"r1": "failed"}
+    assert rcy.load_state(str(tmp_path)) == {}
+    assert rcy.export_all({"r1": "10.0.100.9"}, str(tmp_path), fetch=lambda *a: CONFIG) == {"r1": "exported"}
+    assert rcy.export_all({"r1": "10.0.100.9"}, str(tmp_path), fetch=lambda *a: CONFIG, force=True) == {"r1": "exported"}
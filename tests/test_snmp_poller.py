@@ -0,0 +1,68 @@
+import asyncio
+import pytest
+from pythonscripts import snmp_poller as sp
+
+
+# ------------------------------
+# Test: BER round trip
+# ------------------------------
+def test_message_round_trip():
+    varbinds = [
+        (sp.parse_oid(".1.3.6.1.2.1.25.3.3.1.2.196608"), sp.INTEGER, -5),
+        (sp.parse_oid("1.3.6.1.2.1.1.3.0"), sp.TIMETICKS, 4294967295),
+        (sp.parse_oid("1.3.6.1.2.1.31.1.1.1.6.1"), sp.COUNTER64, 2 ** 64 - 1),
+        (sp.parse_oid("1.3.6.1.2.1.1.5.0"), sp.OCTET_STRING, "r1" * 100),
+        (sp.parse_oid("1.3.6.1.2.1.1.6.0"), sp.END_OF_MIB_VIEW, None),
+    ]
+    data = sp.encode_message("public", sp.RESPONSE, 12345, varbinds)
+    community, pdu_type, request_id, _, _, decoded = sp.decode_message(data)
+
+    assert (community, pdu_type, request_id) == ("public", sp.RESPONSE, 12345)
+    assert decoded[0] == varbinds[0]
+    assert decoded[1] == varbinds[1]
+    assert decoded[2] == varbinds[2]
+    assert decoded[3][2] == b"r1" * 100
+    assert decoded[4][1] == sp.END_OF_MIB_VIEW
+
+def test_truncated_packet_raises():
+    data = sp.encode_message("public", sp.GET, 1, [(sp.parse_oid("1.3.6.1"), sp.NULL, None)])
+    with pytest.raises(sp.SNMPError):
+        sp.decode_message(data[:-3])
+
+
+# ------------------------------
+# Test: engine against the simulator
+# ------------------------------
+def test_bulk_walk_spans_several_round_trips():
+    mib = {f".1.3.6.1.2.1.2.2.1.10.{i}": (sp.COUNTER32, i * 10) for i in range(1, 61)}
+    port, stop = sp.run_simulator_in_thread(mib)
+
+    async def walk():
+        engine = sp.SNMPEngine(timeout=0.5)
+        try:
+            return await engine.bulk_walk("127.0.0.1", "public", ".1.3.6.1.2.1.2.2.1.10",
+                                          max_repetitions=7, port=port)
+        finally:
+            engine.close()
+
+    try:
+        rows = asyncio.run(walk())
+    finally:
+        stop()
+    assert [value for _, value in rows] == [i * 10 for i in range(1, 61)]
+
+def test_get_reports_missing_objects_as_none():
+    port, stop = sp.run_simulator_in_thread({".1.3.6.1.2.1.1.3.0": (sp.TIMETICKS, 42)})
+
+    async def get():
+        engine = sp.SNMPEngine(timeout=0.5)
+        try:
+            return await engine.get("127.0.0.1", "public", [".1.3.6.1.2.1.1.3.0", ".1.3.6.1.2.1.1.5.0"], port=port)
+        finally:
+            engine.close()
+
+    try:
+        values = asyncio.run(get())
+    finally:
+        stop()
+    assert values == {".1.3.6.1.2.1.1.3.0": 42, ".1.3.6.1.2.1.1.5.0": None}
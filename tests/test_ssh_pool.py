@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import MagicMock
+from pythonscripts import ssh_pool
+
+PARAMS = {"device_type": "arista_eos", "host": "10.0.0.1", "username": "admin", "password": "pass123"}
+
+
+def make_pool(**kwargs):
+    connect = MagicMock(side_effect=lambda **params: MagicMock())
+    return ssh_pool.SSHSessionPool(connect=connect, **kwargs), connect
+
+
+# ------------------------------
+# Test: reuse and counters
+# ------------------------------
+def test_session_reused_for_same_device():
+    pool, connect = make_pool()
+    with pool.session(PARAMS) as first:
+        pass
+    with pool.session(PARAMS) as second:
+        pass
+
+    assert first is second
+    connect.assert_called_once_with(**PARAMS)
+    stats = pool.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["idle"] == 1
+
+def test_different_credentials_get_different_sessions():
+    pool, connect = make_pool()
+    with pool.session(PARAMS):
+        pass
+    with pool.session(dict(PARAMS, password="other")):
+        pass
+    assert connect.call_count == 2
+
+def test_concurrent_checkouts_get_separate_sessions():
+    pool, connect = make_pool()
+    with pool.session(PARAMS) as first:
+        with pool.session(PARAMS) as second:
+            assert first is not second
+    assert pool.stats()["idle"] == 2
+
+
+# ------------------------------
+# Test: eviction
+# ------------------------------
+def test_broken_session_is_replaced():
+    pool, connect = make_pool()
+    with pool.session(PARAMS) as first:
+        first.is_alive.return_value = False
+    with pool.session(PARAMS) as second:
+        pass
+
+    assert second is not first
+    first.disconnect.assert_called_once()
+    assert pool.stats()["broken"] == 1
+
+def test_exception_in_block_discards_session():
+    pool, connect = make_pool()
+    with pytest.raises(RuntimeError):
+        with pool.session(PARAMS) as conn:
+            raise RuntimeError("channel hung")
+    conn.disconnect.assert_called_once()
+    assert pool.stats()["idle"] == 0
+
+def test_idle_sessions_expire():
+    pool, connect = make_pool(idle_timeout=0)
+    with pool.session(PARAMS) as conn:
+        pass
+    assert pool.evict_idle() == 1
+    conn.disconnect.assert_called_once()
+
+def test_discard_closes_idle_sessions():
+    pool, connect = make_pool()
+    with pool.session(PARAMS) as conn:
+        pass
+    pool.discard(PARAMS)
+    conn.disconnect.assert_called_once()
+    assert pool.stats()["idle"] == 0
+
+
+# ------------------------------
+# Test: connection helper
+# ------------------------------
+def test_connection_without_pool_disconnects():
+    conn = MagicMock()
+    connect = MagicMock(return_value=conn)
+    with ssh_pool.connection(PARAMS, None, connect=connect) as c:
+        assert c is conn
+    conn.disconnect.assert_called_once()